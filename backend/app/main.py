@@ -1,8 +1,65 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import clone
+from routers import batch, clone, crawl, metrics
+from services.browser_pool import browser_pool
+from services.job_scheduler import job_scheduler
+from services.pipeline import clone_pipeline
+from services.batch_runner import batch_runner
+from services.site_crawler import crawl_manager
+from services.ai_cloner import website_cloner
+from services.http_client import http_client
+from services.job_store import job_store
 
-app = FastAPI(title="Website Cloner API", version="1.0.0")
+# Uvicorn only sets up its own loggers; this one covers the services' debug output
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "WARNING").upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+async def refresh_job_leases():
+    """Renew this worker's claim on its jobs, then take over jobs whose worker has gone away"""
+    try:
+        job_store.heartbeat([
+            *job_scheduler.active_job_ids(),
+            *batch_runner.active_job_ids(),
+            *crawl_manager.active_job_ids()
+        ])
+    except Exception as e:
+        print(f"⚠️ Failed to renew job leases: {e}")
+    try:
+        # Not just at startup: a sibling worker can die at any time
+        await clone.recover_interrupted_jobs()
+    except Exception as e:
+        print(f"⚠️ Failed to recover interrupted jobs: {e}")
+
+async def renew_job_leases():
+    while True:
+        await asyncio.sleep(job_store.lease_seconds / 4)
+        await refresh_job_leases()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep Chromium warm for the lifetime of the app instead of per job
+    try:
+        await browser_pool.start()
+    except Exception as e:
+        print(f"⚠️ Browser pool unavailable, scraping will launch browsers per job: {e}")
+    await http_client.start()
+    await clone_pipeline.start()
+    await job_scheduler.start()
+    await clone.recover_interrupted_jobs()
+    lease_task = asyncio.create_task(renew_job_leases())
+    yield
+    lease_task.cancel()
+    await job_scheduler.stop()
+    await clone_pipeline.stop()
+    await browser_pool.stop()
+    await http_client.stop()
+    website_cloner.shutdown()
+    job_store.close()
+
+app = FastAPI(title="Website Cloner API", version="1.0.0", lifespan=lifespan)
 
 # Add CORS middleware to allow frontend connections
 app.add_middleware(
@@ -15,6 +72,9 @@ app.add_middleware(
 
 # Include the clone router
 app.include_router(clone.router)
+app.include_router(batch.router)
+app.include_router(crawl.router)
+app.include_router(metrics.router)
 
 @app.get("/")
 def read_root():
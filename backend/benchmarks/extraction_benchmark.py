@@ -0,0 +1,82 @@
+"""Compare the five per-pass page.evaluate calls against the single extraction bundle.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.extraction_benchmark --iterations 20
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from benchmarks.legacy_extraction import legacy_extraction
+from services.scraper import LayoutAwareScraper
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+async def _time_runs(extract, iterations: int) -> List[float]:
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await extract()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _summarize(timings: List[float]) -> Dict:
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "max_ms": round(max(timings), 3)
+    }
+
+
+async def run_benchmark(iterations: int, fixtures: List[Path]) -> Dict:
+    results = []
+    async with LayoutAwareScraper() as scraper:
+        for fixture in fixtures:
+            await scraper.page.goto(fixture.resolve().as_uri(), wait_until="load")
+
+            legacy_output = await legacy_extraction(scraper.page)
+            bundle_output = await scraper._extract_page_bundle()
+
+            # Warm up both paths before timing
+            await _time_runs(lambda: legacy_extraction(scraper.page), 2)
+            await _time_runs(scraper._extract_page_bundle, 2)
+
+            legacy = _summarize(await _time_runs(lambda: legacy_extraction(scraper.page), iterations))
+            bundle = _summarize(await _time_runs(scraper._extract_page_bundle, iterations))
+
+            results.append({
+                "fixture": fixture.name,
+                "outputs_match": legacy_output == bundle_output,
+                "legacy": legacy,
+                "bundle": bundle,
+                "speedup": round(legacy["median_ms"] / bundle["median_ms"], 2) if bundle["median_ms"] else None
+            })
+
+    return {"iterations": iterations, "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--fixture", action="append", help="Fixture file name (default: all)")
+    args = parser.parse_args()
+
+    if args.fixture:
+        fixtures = [FIXTURES_DIR / name for name in args.fixture]
+    else:
+        fixtures = sorted(FIXTURES_DIR.glob("*.html"))
+
+    report = asyncio.run(run_benchmark(args.iterations, fixtures))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""End-to-end throughput of the scrape, generate and validate pipeline, fully offline.
+
+Saved pages are served from a local HTTP server and generation uses the
+deterministic stub model, so runs are comparable between commits. Jobs run
+the way the app runs them: queued on a JobScheduler and processed by
+process_clone through the clone pipeline's stages, against an in-memory
+job store.
+
+Run from the backend directory:
+
+    uv run python -m benchmarks.pipeline_benchmark --concurrency 1,2,4,8 --jobs 24 --output bench.json
+
+Use --scraper http to skip Chromium and time the HTTP fallback scraper instead.
+Use --model-failure-rate and --model-slow-rate to see how retries, hedging and
+the circuit breaker hold up against a flaky model.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import redirect_stdout
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.stub_model import StubModel
+
+# Throwaway stores, set before the services create their shared instances
+os.environ.setdefault("JOB_STORE", "memory")
+os.environ.setdefault("JOB_BLOB_DIR", tempfile.mkdtemp(prefix="clone-bench-"))
+os.environ.setdefault("GENERATION_CACHE_DB", "")
+os.environ.pop("RESULT_CACHE_DIR", None)
+
+# Services print while importing and running; keep stdout for the JSON report
+with redirect_stdout(sys.stderr):
+    import routers.clone as clone_router
+    from services.ai_cloner import website_cloner
+    from services.browser_pool import browser_pool
+    from services.generation_cache import GenerationCache
+    from services.http_client import http_client
+    from services.job_scheduler import JobScheduler
+    from services.job_store import job_store
+    from services.metrics import add_stage_listener, remove_stage_listener
+    from services.pipeline import clone_pipeline
+    from services.scraper import LayoutAwareScraper
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer:
+    """Serves the fixture directory on an ephemeral localhost port"""
+
+    def __init__(self, directory: Path):
+        handler = functools.partial(_QuietHandler, directory=str(directory))
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def _tree_rss_bytes() -> Optional[int]:
+    """Resident memory of this process and its children (Chromium), Linux only"""
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+    children = defaultdict(list)
+    for stat_path in proc.glob("[0-9]*/stat"):
+        try:
+            fields = stat_path.read_text().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        children[int(fields[1])].append(int(stat_path.parent.name))
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    pending = [os.getpid()]
+    while pending:
+        pid = pending.pop()
+        try:
+            total += int((proc / str(pid) / "statm").read_text().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            pass
+        pending.extend(children.get(pid, ()))
+    return total
+
+
+class RssSampler:
+    """Tracks the peak resident memory of the process tree while a level runs"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.peak_bytes = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            rss = _tree_rss_bytes()
+            if rss is not None:
+                self.peak_bytes = max(self.peak_bytes, rss)
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> int:
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        if not self.peak_bytes:
+            # ru_maxrss is in KiB on Linux; covers this process only
+            self.peak_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return self.peak_bytes
+
+
+def _percentiles(samples: List[float]) -> Dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def rank(p: float) -> float:
+        index = max(0, min(len(ordered) - 1, round(p / 100 * len(ordered) + 0.5) - 1))
+        return round(ordered[index] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": rank(50),
+        "p95_ms": rank(95),
+        "p99_ms": rank(99),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3)
+    }
+
+
+async def _http_scrape(url: str, **_) -> Dict:
+    """Stands in for scrape_website_data in --scraper http runs"""
+    return await LayoutAwareScraper()._fallback_scrape(url)
+
+
+async def run_level(concurrency: int, jobs: int, urls: List[str]) -> Dict:
+    # Sized the way the app sizes itself from SCRAPE_CONCURRENCY and GENERATE_CONCURRENCY
+    scheduler = JobScheduler(max_queue_size=jobs, stage_limits={"scrape": concurrency, "generate": concurrency})
+    clone_pipeline.set_workers("fetch", scheduler.stage_limits["scrape"])
+    clone_pipeline.set_workers("generate", scheduler.stage_limits["generate"])
+    stage_samples: Dict[str, List[float]] = defaultdict(list)
+    job_samples: List[float] = []
+    outcomes = {"succeeded": 0, "failed": 0, "fallbacks": 0}
+    listener = lambda stage, seconds: stage_samples[stage].append(seconds)
+    fallbacks_before = website_cloner.fallbacks_built
+
+    async def run_job(job_id: str, url: str, done: asyncio.Future):
+        started = time.perf_counter()
+        try:
+            await clone_router.process_clone(job_id, url)
+            job = job_store.get(job_id)
+            if job is None or job["status"] != "completed":
+                outcomes["failed"] += 1
+                return
+            outcomes["succeeded"] += 1
+            job_samples.append(time.perf_counter() - started)
+        finally:
+            done.set_result(None)
+
+    sampler = RssSampler()
+    add_stage_listener(listener)
+    await clone_pipeline.start()
+    await scheduler.start()
+    sampler.start()
+    started = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        waiters = []
+        for index in range(jobs):
+            # A unique query string per job keeps the result and generation caches out of the measurement
+            url = f"{urls[index % len(urls)]}?job={concurrency}-{index}"
+            job_id = f"bench-{concurrency}-{index}"
+            job_store.create(job_id, url)
+            done = loop.create_future()
+            waiters.append(done)
+            scheduler.submit(job_id, functools.partial(run_job, job_id, url, done))
+        await asyncio.gather(*waiters)
+    finally:
+        wall_seconds = time.perf_counter() - started
+        peak_rss = await sampler.stop()
+        await scheduler.stop()
+        await clone_pipeline.stop()
+        remove_stage_listener(listener)
+    outcomes["fallbacks"] = website_cloner.fallbacks_built - fallbacks_before
+
+    return {
+        "concurrency": concurrency,
+        "jobs": jobs,
+        **outcomes,
+        "wall_seconds": round(wall_seconds, 3),
+        "jobs_per_second": round(outcomes["succeeded"] / wall_seconds, 3) if wall_seconds else None,
+        "latency": {
+            "job": _percentiles(job_samples),
+            "stages": {stage: _percentiles(samples) for stage, samples in sorted(stage_samples.items())}
+        },
+        "peak_rss_bytes": peak_rss
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(levels: List[int], jobs: int, fixtures: List[Path], scraper_mode: str,
+                        first_token_ms: float, total_ms: float, failure_rate: float = 0.0,
+                        slow_rate: float = 0.0, slow_ms: float = 0.0) -> Dict:
+    model = StubModel(first_token_ms=first_token_ms, total_ms=total_ms, failure_rate=failure_rate,
+                      slow_rate=slow_rate, slow_ms=slow_ms, seed=0)
+    website_cloner.model = model
+    website_cloner.cache = GenerationCache(db_path="")
+    if scraper_mode == "http":
+        clone_router.scrape_website_data = _http_scrape
+    results = []
+
+    with FixtureServer(FIXTURES_DIR) as server:
+        urls = [f"{server.base_url}/{fixture.name}" for fixture in fixtures]
+        await http_client.start()
+        if scraper_mode == "browser":
+            browser_pool.size = max(1, min(max(levels), 4))
+            await browser_pool.start()
+        try:
+            # One untimed job warms the browser, HTTP connections and code paths
+            await run_level(1, 1, urls)
+            for concurrency in levels:
+                results.append(await run_level(concurrency, jobs, urls))
+        finally:
+            await browser_pool.stop()
+            await http_client.stop()
+            website_cloner.shutdown()
+
+    return {
+        "benchmark": "pipeline",
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "scraper": scraper_mode,
+            "jobs_per_level": jobs,
+            "fixtures": [fixture.name for fixture in fixtures],
+            "stub_model": {"first_token_ms": first_token_ms, "total_ms": total_ms, "failure_rate": failure_rate,
+                           "slow_rate": slow_rate, "slow_ms": slow_ms}
+        },
+        "levels": results,
+        "model_client": {**website_cloner.client.stats(), "model_calls": model.calls,
+                         "injected_failures": model.failures}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--jobs", type=int, default=24, help="Jobs per concurrency level")
+    parser.add_argument("--fixture", action="append", help="Fixture file name (default: all)")
+    parser.add_argument("--scraper", choices=["browser", "http"], default="browser")
+    parser.add_argument("--model-first-token-ms", type=float, default=300)
+    parser.add_argument("--model-total-ms", type=float, default=1500)
+    parser.add_argument("--model-failure-rate", type=float, default=0.0, help="Share of model calls that fail with a 503")
+    parser.add_argument("--model-slow-rate", type=float, default=0.0, help="Share of model calls that start late")
+    parser.add_argument("--model-slow-ms", type=float, default=3000, help="How much later slow calls start")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    if args.fixture:
+        fixtures = [FIXTURES_DIR / name for name in args.fixture]
+    else:
+        fixtures = sorted(FIXTURES_DIR.glob("*.html"))
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    with redirect_stdout(sys.stderr):
+        report = asyncio.run(run_benchmark(
+            levels, args.jobs, fixtures, args.scraper, args.model_first_token_ms, args.model_total_ms,
+            args.model_failure_rate, args.model_slow_rate, args.model_slow_ms
+        ))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Deterministic stand-in for the Gemini model, for benchmarks and offline runs.
+
+The response depends only on the prompt, passes the cloner's structure
+checks, and is streamed in fixed-size chunks with configurable latency.
+Failures and slow responses can be injected at a given rate to exercise
+retries, hedging and the circuit breaker; a seed makes them repeatable.
+"""
+import asyncio
+import hashlib
+import random
+import re
+import time
+from typing import List, Optional
+
+PALETTES = [
+    ("#1f2937", "#f9fafb", "#ec4899"),
+    ("#0f172a", "#f1f5f9", "#0ea5e9"),
+    ("#111827", "#fffbeb", "#f59e0b"),
+    ("#1e1b4b", "#eef2ff", "#6366f1"),
+]
+
+
+class StubModelError(Exception):
+    """An injected API failure; carries an HTTP status like google.api_core errors do"""
+
+    def __init__(self, code: int):
+        super().__init__(f"{code} injected stub model failure")
+        self.code = code
+
+
+class _StubChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _StubResponse:
+    """Mimics both the buffered and the streamed Gemini response"""
+
+    def __init__(self, text: str, chunks: List[str], chunk_delay: float):
+        self.text = text
+        self._chunks = chunks
+        self._chunk_delay = chunk_delay
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            if self._chunk_delay:
+                await asyncio.sleep(self._chunk_delay)
+            yield _StubChunk(chunk)
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if self._chunk_delay:
+                time.sleep(self._chunk_delay)
+            yield _StubChunk(chunk)
+
+
+class StubModel:
+    model_name = "stub"
+
+    def __init__(self, first_token_ms: float = 300, total_ms: float = 1500, chunk_chars: int = 400,
+                 failure_rate: float = 0.0, failure_code: int = 503, slow_rate: float = 0.0,
+                 slow_ms: float = 0.0, seed: Optional[int] = None):
+        self.first_token_ms = first_token_ms
+        self.total_ms = total_ms
+        self.chunk_chars = chunk_chars
+        # Share of calls that fail with failure_code, and share that take slow_ms longer to start
+        self.failure_rate = failure_rate
+        self.failure_code = failure_code
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.failures = 0
+
+    def render(self, prompt: str) -> str:
+        digest = hashlib.sha256(prompt.encode()).hexdigest()
+        text, background, accent = PALETTES[int(digest[:2], 16) % len(PALETTES)]
+        title_match = re.search(r"recreates (\S+)", prompt)
+        title = title_match.group(1) if title_match else "Cloned page"
+
+        sections = "\n".join(
+            f"""        <section class="card">
+            <h2>Section {index + 1}</h2>
+            <p>Deterministic placeholder copy {digest[index:index + 12]} for benchmarking the pipeline.</p>
+            <a class="button" href="#section-{index + 1}">Learn more</a>
+        </section>"""
+            for index in range(12)
+        )
+        return f"""```html
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>{title}</title>
+    <style>
+        body {{ margin: 0; font-family: system-ui, sans-serif; color: {text}; background: {background}; }}
+        header {{ display: flex; justify-content: space-between; padding: 1rem 2rem; }}
+        main {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(240px, 1fr)); gap: 1.5rem; padding: 2rem; }}
+        .card {{ padding: 1.5rem; border-radius: 12px; background: white; }}
+        .button {{ color: white; background: {accent}; padding: 0.5rem 1rem; border-radius: 8px; }}
+    </style>
+</head>
+<body>
+    <header>
+        <nav><a href="/">Home</a> <a href="/about">About</a> <a href="/contact">Contact</a></nav>
+    </header>
+    <main>
+{sections}
+    </main>
+    <footer><p>Generated by the stub model</p></footer>
+</body>
+</html>
+```"""
+
+    def _respond(self, prompt: str):
+        self.calls += 1
+        text = self.render(prompt)
+        chunks = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)]
+        streaming_ms = max(0.0, self.total_ms - self.first_token_ms)
+        first_token_ms = self.first_token_ms
+        if self.slow_rate and self._random.random() < self.slow_rate:
+            first_token_ms += self.slow_ms
+        error = None
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            self.failures += 1
+            error = StubModelError(self.failure_code)
+        return text, chunks, streaming_ms / 1000 / max(1, len(chunks)), first_token_ms / 1000, error
+
+    async def generate_content_async(self, prompt: str, generation_config=None, stream: bool = False):
+        text, chunks, chunk_delay, first_token_delay, error = self._respond(prompt)
+        await asyncio.sleep(first_token_delay)
+        if error:
+            raise error
+        if stream:
+            return _StubResponse(text, chunks, chunk_delay)
+        await asyncio.sleep(chunk_delay * len(chunks))
+        return _StubResponse(text, chunks, 0)
+
+    def generate_content(self, prompt: str, generation_config=None, stream: bool = False):
+        text, chunks, chunk_delay, first_token_delay, error = self._respond(prompt)
+        time.sleep(first_token_delay)
+        if error:
+            raise error
+        if stream:
+            return _StubResponse(text, chunks, chunk_delay)
+        time.sleep(chunk_delay * len(chunks))
+        return _StubResponse(text, chunks, 0)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, HttpUrl
-from typing import Optional
+from pydantic import BaseModel, Field, HttpUrl, model_validator
+from typing import Dict, List, Literal, Optional
 from enum import Enum
 
 class CloneStatus(str, Enum):
@@ -8,8 +8,48 @@ class CloneStatus(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
+class SettleOptions(BaseModel):
+    """Per-request overrides for how long to wait for the page to stabilize"""
+    max_wait_ms: Optional[int] = Field(None, ge=0, le=30000)
+    network_idle_ms: Optional[int] = Field(None, ge=0, le=10000)
+    max_inflight_requests: Optional[int] = Field(None, ge=0)
+    dom_quiet_ms: Optional[int] = Field(None, ge=0, le=10000)
+    layout_stable_ms: Optional[int] = Field(None, ge=0, le=10000)
+    wait_for_fonts: Optional[bool] = None
+    wait_for_images: Optional[bool] = None
+
+class ScreenshotClip(BaseModel):
+    x: float = Field(0, ge=0)
+    y: float = Field(0, ge=0)
+    width: float = Field(..., gt=0, le=4096)
+    height: float = Field(..., gt=0, le=16384)
+
+class ScreenshotOptions(BaseModel):
+    """Screenshot capture settings; a screenshot is only taken when these are sent"""
+    mode: Literal["viewport", "full", "clip"] = "viewport"
+    clip: Optional[ScreenshotClip] = None
+    format: Literal["png", "jpeg", "webp"] = "jpeg"
+    quality: int = Field(80, ge=1, le=100)
+    max_height: int = Field(4000, ge=100, le=16384)
+
+    @model_validator(mode="after")
+    def _clip_required(self):
+        if self.mode == "clip" and self.clip is None:
+            raise ValueError("clip mode needs a clip rectangle")
+        return self
+
 class CloneRequest(BaseModel):
     url: HttpUrl
+    settle: Optional[SettleOptions] = None
+    screenshot: Optional[ScreenshotOptions] = None
+    # Which requests the scraping browser skips; defaults to SCRAPE_INTERCEPTION_PROFILE
+    interception_profile: Optional[Literal["structure-only", "styles", "full"]] = None
+    # Serve the layout-aware fallback if the model takes longer than this, then swap in the
+    # AI result when it arrives; defaults to CLONE_LATENCY_SLO_SECONDS (off when unset)
+    latency_slo_seconds: Optional[float] = Field(None, gt=0, le=300)
+    # "sections" generates the header, groups of sections and the footer as concurrent model
+    # calls; "auto" does so for long pages only. Defaults to GENERATION_MODE
+    generation_mode: Optional[Literal["single", "sections", "auto"]] = None
     
 class CloneResponse(BaseModel):
     job_id: str
@@ -21,4 +61,82 @@ class CloneResult(BaseModel):
     status: CloneStatus
     original_url: str
     cloned_html: Optional[str] = None
-    error_message: Optional[str] = None
\ No newline at end of file
+    error_message: Optional[str] = None
+    # A fallback served under the latency SLO; the AI result may still replace it
+    provisional: bool = False
+    queue_position: Optional[int] = None
+    queue_depth: Optional[int] = None
+
+class CloneJobStatus(BaseModel):
+    """Job metadata without the generated HTML, cheap enough to poll"""
+    job_id: str
+    status: CloneStatus
+    original_url: str
+    stage: Optional[str] = None
+    error_message: Optional[str] = None
+    has_html: bool = False
+    html_length: int = 0
+    cache_hit: bool = False
+    provisional: bool = False
+    queue_position: Optional[int] = None
+    queue_depth: Optional[int] = None
+    created_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+class BatchCloneRequest(BaseModel):
+    """Many URLs cloned with the same options; pages from one origin share a browser context"""
+    urls: List[HttpUrl] = Field(..., min_length=1, max_length=200)
+    settle: Optional[SettleOptions] = None
+    screenshot: Optional[ScreenshotOptions] = None
+    interception_profile: Optional[Literal["structure-only", "styles", "full"]] = None
+    latency_slo_seconds: Optional[float] = Field(None, gt=0, le=300)
+    generation_mode: Optional[Literal["single", "sections", "auto"]] = None
+    # Jobs of this batch running at once, across all of its origins (default BATCH_CONCURRENCY)
+    concurrency: Optional[int] = Field(None, ge=1, le=16)
+    # Most job starts per second for this batch (default BATCH_RATE_PER_SECOND, unlimited when unset)
+    rate_per_second: Optional[float] = Field(None, gt=0, le=100)
+
+class BatchCloneResponse(BaseModel):
+    batch_id: str
+    job_ids: List[str]
+    total: int
+    cached: int
+    message: str
+
+class BatchStatus(BaseModel):
+    batch_id: str
+    status: CloneStatus
+    total: int
+    counts: Dict[str, int]
+    progress: float
+    cache_hits: int = 0
+    created_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    jobs: List[CloneJobStatus] = []
+
+class CrawlRequest(BaseModel):
+    """Clone a site by following same-origin navigation links from a start page"""
+    url: HttpUrl
+    max_depth: int = Field(1, ge=0, le=3)
+    # Defaults to CRAWL_MAX_PAGES
+    max_pages: Optional[int] = Field(None, ge=1, le=50)
+    include_footer: bool = True
+    respect_robots: bool = True
+    # Defaults to CRAWL_CONCURRENCY and CRAWL_DELAY_MS
+    concurrency: Optional[int] = Field(None, ge=1, le=8)
+    delay_ms: Optional[int] = Field(None, ge=0, le=60000)
+    settle: Optional[SettleOptions] = None
+    screenshot: Optional[ScreenshotOptions] = None
+    interception_profile: Optional[Literal["structure-only", "styles", "full"]] = None
+    latency_slo_seconds: Optional[float] = Field(None, gt=0, le=300)
+    generation_mode: Optional[Literal["single", "sections", "auto"]] = None
+
+class CrawlResponse(BaseModel):
+    crawl_id: str
+    root_job_id: str
+    status: CloneStatus
+    message: str
+
+class CrawlStatus(BatchStatus):
+    root_url: str
+    running: bool = False
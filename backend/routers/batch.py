@@ -0,0 +1,93 @@
+from fastapi import APIRouter, HTTPException
+from models.schemas import BatchCloneRequest, BatchCloneResponse, BatchStatus, CloneStatus
+from routers.clone import build_job_status, clone_options, process_clone, serve_from_cache
+from services.batch_runner import batch_runner
+from services.job_scheduler import QueueFullError
+from services.job_store import job_store, FINISHED_STATUSES
+from typing import Dict, List
+import uuid
+
+router = APIRouter(prefix="/api", tags=["batch"])
+
+
+@router.post("/batch", response_model=BatchCloneResponse)
+async def start_batch(request: BatchCloneRequest):
+    """Clone many URLs as one batch"""
+    batch_id = str(uuid.uuid4())
+    options = clone_options(request)
+    # Batch limits are kept with each job so the batch can be inspected later
+    options["batch"] = {"concurrency": request.concurrency, "rate_per_second": request.rate_per_second}
+
+    print(f"📦 Starting batch {batch_id} with {len(request.urls)} URLs")
+
+    job_ids = []
+    queued = []
+    cached = 0
+    for url in request.urls:
+        job_id = str(uuid.uuid4())
+        job_store.create(job_id, str(url), options=options, batch_id=batch_id)
+        job_ids.append(job_id)
+        if await serve_from_cache(job_id, str(url), options):
+            cached += 1
+        else:
+            queued.append((job_id, str(url)))
+
+    if queued:
+        try:
+            origins = batch_runner.submit(
+                batch_id,
+                queued,
+                lambda job_id, url, context: process_clone(job_id, url, options, context=context),
+                concurrency=request.concurrency,
+                rate_per_second=request.rate_per_second
+            )
+        except QueueFullError as e:
+            for job_id in job_ids:
+                job_store.delete(job_id)
+            print(f"🚦 Queue full, rejecting batch {batch_id}")
+            raise HTTPException(
+                status_code=503,
+                detail="Too many clone jobs in progress, please retry later",
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        message = f"Queued {len(queued)} URLs from {origins} origin(s), {cached} served from cache"
+    else:
+        message = f"All {cached} URLs served from cache"
+
+    return BatchCloneResponse(batch_id=batch_id, job_ids=job_ids, total=len(job_ids), cached=cached, message=message)
+
+
+@router.get("/batch/{batch_id}", response_model=BatchStatus)
+async def get_batch_status(batch_id: str, include_jobs: bool = True):
+    """Aggregate progress of a batch, optionally with every job's status"""
+    jobs = job_store.list_batch(batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return BatchStatus(**batch_summary(batch_id, jobs, include_jobs))
+
+
+def batch_summary(batch_id: str, jobs: List[Dict], include_jobs: bool = True) -> Dict:
+    """Status counts and progress over a group of jobs, such as a batch or a crawl"""
+    counts = {status.value: 0 for status in CloneStatus}
+    for job in jobs:
+        counts[job["status"]] = counts.get(job["status"], 0) + 1
+    finished = sum(counts[status] for status in FINISHED_STATUSES)
+
+    if finished == len(jobs):
+        status = CloneStatus.COMPLETED
+    elif counts[CloneStatus.PENDING.value] == len(jobs):
+        status = CloneStatus.PENDING
+    else:
+        status = CloneStatus.PROCESSING
+
+    return {
+        "batch_id": batch_id,
+        "status": status,
+        "total": len(jobs),
+        "counts": counts,
+        "progress": round(finished / len(jobs), 3),
+        "cache_hits": sum(1 for job in jobs if job["cache_hit"]),
+        "created_at": jobs[0]["created_at"],
+        "finished_at": max(job["finished_at"] for job in jobs) if status == CloneStatus.COMPLETED else None,
+        "jobs": [build_job_status(job["job_id"], job) for job in jobs] if include_jobs else []
+    }
@@ -1,16 +1,35 @@
-from fastapi import APIRouter, HTTPException
-from models.schemas import CloneRequest, CloneResponse, CloneResult, CloneStatus
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+from models.schemas import CloneRequest, CloneResponse, CloneResult, CloneStatus, CloneJobStatus
 from services.scraper import scrape_website_data
 from services.ai_cloner import website_cloner
-from typing import Dict, List, Optional
+from services.browser_pool import browser_pool
+from services.job_scheduler import job_scheduler, QueueFullError
+from services.pipeline import clone_pipeline
+from services.result_cache import result_cache
+from services.request_blocking import resolve_profile
+from services.generation_cache import generation_cache
+from services.design_system_cache import design_system_cache
+from services.job_store import job_store, FINISHED_STATUSES
+from services.job_events import job_events, latest_stage, format_sse
+from services.compression import choose_encoding
+from services.metrics import metrics
+from typing import Callable, Dict, List, Optional
 import uuid
 import asyncio
 import traceback
 
 router = APIRouter(prefix="/api", tags=["clone"])
 
-# In-memory storage for demo (in production, use a database)
-clone_jobs = {}
+# How often an idle progress stream sends a keepalive and re-checks the job store
+SSE_KEEPALIVE_SECONDS = 15
+
+JOBS_FINISHED = metrics.counter("clone_jobs_finished_total", "Clone jobs by final status", ["status"])
+SPECULATIVE_RESULTS = metrics.counter(
+    "clone_speculative_results_total",
+    "Jobs with a latency SLO: AI result in time, fallback served, and whether the AI result replaced it",
+    ["outcome"]
+)
 
 @router.post("/clone", response_model=CloneResponse)
 async def start_clone(request: CloneRequest):
@@ -19,127 +38,236 @@ async def start_clone(request: CloneRequest):
         # Generate unique job ID
         job_id = str(uuid.uuid4())
         
-        print(f"🚀 Starting clone for: {request.url}")
-        print(f"🆔 Job ID: {job_id}")
+        print(f"🚀 Starting clone for: {request.url} (Job: {job_id})")
         
-        # Store job info
-        clone_jobs[job_id] = {
-            "status": CloneStatus.PENDING,
-            "original_url": str(request.url),
-            "cloned_html": None,
-            "error_message": None,
-            "scraped_data": None,
-            "created_at": asyncio.get_event_loop().time()
-        }
+        # Store job info; large payloads go to the job store's blob storage.
+        # Options are persisted so an interrupted job can be requeued as submitted.
+        options = clone_options(request)
+        job_store.create(job_id, str(request.url), options=options)
+        
+        # Repeated URLs are served straight from the result cache
+        if await serve_from_cache(job_id, str(request.url), options):
+            return CloneResponse(
+                job_id=job_id,
+                status=CloneStatus.COMPLETED,
+                message=f"Served cached clone for {request.url}"
+            )
         
-        # Start background cloning task
-        asyncio.create_task(process_clone(job_id, str(request.url)))
+        # Queue the cloning job; the scheduler bounds how many run at once
+        try:
+            position = job_scheduler.submit(job_id, lambda: process_clone(job_id, str(request.url), options))
+        except QueueFullError as e:
+            job_store.delete(job_id)
+            print(f"🚦 Queue full, rejecting clone for: {request.url}")
+            raise HTTPException(
+                status_code=503,
+                detail="Too many clone jobs in progress, please retry later",
+                headers={"Retry-After": str(e.retry_after)}
+            )
         
         return CloneResponse(
             job_id=job_id,
             status=CloneStatus.PENDING,
-            message=f"Cloning started for {request.url}"
+            message=f"Cloning queued for {request.url} (position {position})"
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Error starting clone: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/clone/{job_id}", response_model=CloneResult)
-async def get_clone_result(job_id: str):
-    """Get cloning result by job ID"""
-    print(f"🔍 Looking for job ID: {job_id}")
+async def get_clone_result(job_id: str, request: Request):
+    """Get cloning result by job ID
     
-    if job_id not in clone_jobs:
-        print(f"❌ Job {job_id} not found")
+    Finished results are serialized and compressed once, then served with an
+    ETag so repeat requests get a 304 instead of the full HTML again.
+    """
+    job_data = job_store.get(job_id)
+    if job_data is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job_data = clone_jobs[job_id]
-    print(f"✅ Found job {job_id} with status: {job_data['status']}")
+    if job_data["status"] not in FINISHED_STATUSES:
+        return build_clone_result(job_id, job_data)
     
-    return CloneResult(
-        job_id=job_id,
-        status=job_data["status"],
-        original_url=job_data["original_url"],
-        cloned_html=job_data["cloned_html"],
-        error_message=job_data["error_message"]
+    # Jobs finished before results were frozen (or by an older worker) are frozen on first read
+    etag = job_data.get("result_etag") or await freeze_result(job_id, job_data)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    encoding = choose_encoding(request.headers.get("accept-encoding"))
+    body = job_store.load_result(job_id, encoding) if encoding else None
+    if body is None:
+        encoding = None
+        body = job_store.load_result(job_id)
+    if body is None:
+        return build_clone_result(job_id, job_data)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/clone/{job_id}/status", response_model=CloneJobStatus)
+async def get_clone_status(job_id: str):
+    """Job status without the generated HTML"""
+    job_data = job_store.get(job_id)
+    if job_data is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return build_job_status(job_id, job_data)
+
+@router.get("/clone/{job_id}/events")
+async def stream_clone_events(job_id: str, request: Request, html: bool = False):
+    """Stream stage transitions and the final result as Server-Sent Events
+    
+    With ?html=true the generated HTML is also streamed in "html" events as the
+    model writes it; the "result" event carries the validated document. A result
+    marked provisional is a fallback served under the latency SLO: the stream then
+    stays open and ends with an "upgraded" event carrying the AI result, or a
+    "final" event if the fallback stays.
+    """
+    if job_store.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    def settled(job_data: Dict) -> bool:
+        return job_data["status"] in FINISHED_STATUSES and not job_data["provisional"]
+    
+    def closing_event(job_data: Dict, provisional_sent: bool) -> str:
+        if not provisional_sent:
+            return "result"
+        return "upgraded" if "upgraded" in job_data["stage_times"] else "final"
+    
+    async def event_stream():
+        # Subscribe before reading the snapshot so no transition is missed in between
+        async with job_events.subscribe(job_id) as queue:
+            job_data = job_store.get(job_id)
+            if job_data is None:
+                return
+            stage = latest_stage(job_data["stage_times"])
+            yield format_sse("stage", {**stage_event(job_id, stage), "original_url": job_data["original_url"]})
+            if html:
+                partial = job_events.partial_html(job_id)
+                if partial:
+                    yield format_sse("html", {"html": partial})
+            
+            provisional_sent = False
+            while not settled(job_data):
+                if job_data["status"] in FINISHED_STATUSES and not provisional_sent:
+                    # Joined after the fallback was served, or it was served by another worker
+                    yield format_sse("result", build_clone_result(job_id, job_data).model_dump(mode="json"))
+                    provisional_sent = True
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    # Jobs run by another worker process only show up in the job store
+                    job_data = job_store.get(job_id)
+                    if job_data is None:
+                        return
+                    current_stage = latest_stage(job_data["stage_times"])
+                    if current_stage != stage:
+                        stage = current_stage
+                        yield format_sse("stage", stage_event(job_id, stage))
+                    else:
+                        yield ": keepalive\n\n"
+                    continue
+                
+                if event == "result":
+                    yield format_sse("result", data)
+                    if not data.get("provisional"):
+                        return
+                    provisional_sent = True
+                    continue
+                if event in ("upgraded", "final"):
+                    yield format_sse(event, data)
+                    return
+                if event == "html":
+                    if html:
+                        yield format_sse("html", data)
+                    continue
+                stage = data["stage"]
+                yield format_sse("stage", data)
+            
+            event = closing_event(job_data, provisional_sent)
+            yield format_sse(event, build_clone_result(job_id, job_data).model_dump(mode="json"))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/clone/{job_id}/screenshot")
+async def get_clone_screenshot(job_id: str):
+    """Screenshot captured while scraping, for jobs that asked for one"""
+    job_data = job_store.get(job_id)
+    if job_data is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    info = (job_data.get("scrape_summary") or {}).get("screenshot")
+    screenshot = job_store.load_screenshot(job_id) if info else None
+    if not screenshot:
+        raise HTTPException(status_code=404, detail="No screenshot for this job")
+    
+    return Response(
+        content=screenshot,
+        media_type=f"image/{info['format']}",
+        headers={"Cache-Control": "private, max-age=3600"}
     )
 
 @router.get("/clone/{job_id}/debug")
 async def get_debug_info(job_id: str):
     """Get detailed debug information"""
-    if job_id not in clone_jobs:
+    job_data = job_store.get(job_id)
+    if job_data is None:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    job_data = clone_jobs[job_id]
-    scraped_data = job_data.get("scraped_data", {})
-    
     debug_info = {
         "job_id": job_id,
         "status": job_data["status"],
         "original_url": job_data["original_url"],
-        "has_scraped_data": bool(scraped_data),
-        "cloned_html_length": len(job_data.get("cloned_html", "")),
-        "error_message": job_data.get("error_message")
+        "has_scraped_data": job_data["has_scraped_data"],
+        "cloned_html_length": job_data["html_length"],
+        "error_message": job_data.get("error_message"),
+        "cache_hit": job_data.get("cache_hit", False),
+        "created_at": job_data.get("created_at"),
+        "stage_times": job_data.get("stage_times", {})
     }
     
-    if scraped_data:
-        debug_info.update({
-            "scraping_method": scraped_data.get("method", "unknown"),
-            "scraping_success": scraped_data.get("success", False),
-            "data_summary": {
-                "has_content": bool(scraped_data.get("content")),
-                "has_colors": bool(scraped_data.get("colors")),
-                "has_visual": bool(scraped_data.get("visual")),
-                "has_screenshot": bool(scraped_data.get("screenshot"))
-            }
-        })
-        
-        # Add content summary if available
-        content = scraped_data.get("content", {})
-        if content:
-            debug_info["content_summary"] = {
-                "title": content.get("title", ""),
-                "headings_count": len(content.get("headings", [])),
-                "paragraphs_count": len(content.get("paragraphs", []))
-            }
-        
-        # Add color summary if available
-        colors = scraped_data.get("colors", {})
-        if colors:
-            debug_info["color_summary"] = {
-                "background_colors": colors.get("backgrounds", [])[:3],
-                "text_colors": colors.get("texts", [])[:3],
-                "accent_colors": colors.get("accents", [])[:3]
-            }
+    # Summary captured when the scraped data was stored, so no payload is loaded here
+    debug_info.update(job_data.get("scrape_summary", {}))
+    if job_data.get("prompt_summary"):
+        debug_info["prompt_tokens"] = job_data["prompt_summary"]
     
     return debug_info
 
 @router.get("/debug/jobs")
 async def list_jobs():
     """List all jobs for debugging"""
+    jobs = job_store.list_jobs()
     return {
-        "total_jobs": len(clone_jobs),
+        "total_jobs": len(jobs),
         "jobs": [
             {
-                "job_id": job_id,
+                "job_id": data["job_id"],
                 "status": data["status"],
                 "url": data["original_url"],
-                "has_html": bool(data.get("cloned_html")),
-                "html_length": len(data.get("cloned_html", "")),
+                "has_html": data["has_html"],
+                "html_length": data["html_length"],
                 "error": data.get("error_message"),
+                "cache_hit": data.get("cache_hit", False),
                 "created_at": data.get("created_at")
             }
-            for job_id, data in clone_jobs.items()
+            for data in jobs
         ]
     }
 
 @router.delete("/debug/jobs/clear")
 async def clear_jobs():
     """Clear all jobs"""
-    global clone_jobs
-    job_count = len(clone_jobs)
-    clone_jobs = {}
+    job_count = job_store.clear()
     return {"message": f"Cleared {job_count} jobs"}
 
 @router.get("/health")
@@ -150,8 +278,15 @@ async def health_check():
             "status": "healthy",
             "service": "website_cloner",
             "ai_service": "available" if hasattr(website_cloner, 'model') else "unavailable",
-            "active_jobs": len([j for j in clone_jobs.values() if j["status"] == CloneStatus.PROCESSING]),
-            "total_jobs": len(clone_jobs)
+            "active_jobs": job_store.count(CloneStatus.PROCESSING),
+            "total_jobs": job_store.count(),
+            "browser_pool": browser_pool.stats(),
+            "scheduler": job_scheduler.stats(),
+            "pipeline": clone_pipeline.stats(),
+            "model_client": website_cloner.client.stats(),
+            "result_cache": result_cache.stats(),
+            "generation_cache": generation_cache.stats(),
+            "design_system_cache": design_system_cache.stats()
         }
     except Exception as e:
         return {
@@ -159,78 +294,358 @@ async def health_check():
             "error": str(e)
         }
 
-async def process_clone(job_id: str, url: str):
-    """Background task to process website cloning"""
+def clone_options(request) -> Dict:
+    """Per-job options from a clone or batch request, in the form they are persisted"""
+    return {
+        "settle": request.settle.model_dump(exclude_none=True) if request.settle else None,
+        "screenshot": request.screenshot.model_dump(exclude_none=True) if request.screenshot else None,
+        "interception_profile": request.interception_profile,
+        "latency_slo_seconds": request.latency_slo_seconds,
+        "generation_mode": request.generation_mode
+    }
+
+def cache_variant(options: Dict) -> Dict:
+    """Options besides the URL that change the result, so jobs only share cached results when they match"""
+    profile = options.get("interception_profile")
+    if profile is None and options.get("screenshot") is not None:
+        # Same rule the scraper applies: screenshot jobs load everything unless told otherwise
+        profile = "full"
+    return {
+        # A structure-only scrape blocks stylesheets, so its design system is not the page's real one
+        "interception_profile": resolve_profile(profile),
+        "generation_mode": options.get("generation_mode") or website_cloner.generation_mode
+    }
+
+async def serve_from_cache(job_id: str, url: str, options: Dict) -> bool:
+    """Complete a job from the result cache; the cache keeps no screenshots, so those jobs always run"""
+    if options.get("screenshot") is not None:
+        return False
+    cached = await result_cache.get(url, cache_variant(options))
+    if not cached:
+        return False
+    print(f"⚡ Serving cached clone for: {url}")
+    job_store.save_scraped_data(job_id, cached["scraped_data"])
+    job_store.save_html(job_id, cached["cloned_html"])
+    job_store.update(job_id, status=CloneStatus.COMPLETED, cache_hit=True)
+    await report_result(job_id)
+    return True
+
+def build_job_status(job_id: str, job_data: Dict) -> CloneJobStatus:
+    return CloneJobStatus(
+        job_id=job_id,
+        status=job_data["status"],
+        original_url=job_data["original_url"],
+        stage=latest_stage(job_data["stage_times"]),
+        error_message=job_data["error_message"],
+        has_html=job_data["has_html"],
+        html_length=job_data["html_length"],
+        cache_hit=job_data["cache_hit"],
+        provisional=job_data["provisional"],
+        queue_position=job_scheduler.position(job_id),
+        queue_depth=job_scheduler.queue_depth,
+        created_at=job_data["created_at"],
+        finished_at=job_data["finished_at"]
+    )
+
+def build_clone_result(job_id: str, job_data: Dict) -> CloneResult:
+    """Result for a job; the generated HTML is only included once the job has finished"""
+    finished = job_data["status"] in FINISHED_STATUSES
+    return CloneResult(
+        job_id=job_id,
+        status=job_data["status"],
+        original_url=job_data["original_url"],
+        cloned_html=job_store.load_html(job_id) if finished and job_data["has_html"] else None,
+        error_message=job_data["error_message"],
+        provisional=job_data["provisional"],
+        queue_position=job_scheduler.position(job_id),
+        queue_depth=job_scheduler.queue_depth
+    )
+
+def stage_event(job_id: str, stage: str) -> Dict:
+    event = {"job_id": job_id, "stage": stage}
+    if stage == "queued":
+        event["queue_position"] = job_scheduler.position(job_id)
+        event["queue_depth"] = job_scheduler.queue_depth
+    return event
+
+def report_stage(job_id: str, stage: str) -> None:
+    """Record a progress stage and push it to any open progress streams"""
+    job_store.mark_stage(job_id, stage)
+    job_events.publish(job_id, "stage", stage_event(job_id, stage))
+
+async def freeze_result(job_id: str, job_data: Dict) -> str:
+    """Serialize and compress a finished job's result once; returns its ETag"""
+    body = build_clone_result(job_id, job_data).model_dump_json().encode()
+    # Brotli at quality 9 takes long enough on a big page to stall every other request
+    return await asyncio.to_thread(job_store.save_result, job_id, body)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Proxies that re-encode responses may weaken the tag
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+async def report_result(job_id: str) -> None:
+    """Freeze the final result and push it to open progress streams once the job has finished"""
+    job_data = job_store.get(job_id)
+    if job_data is None or job_data["status"] not in FINISHED_STATUSES:
+        return
+    JOBS_FINISHED.inc(status=job_data["status"])
+    result = build_clone_result(job_id, job_data)
+    await asyncio.to_thread(job_store.save_result, job_id, result.model_dump_json().encode())
+    job_events.publish(job_id, "result", result.model_dump(mode="json"))
+
+async def process_clone(job_id: str, url: str, options: Optional[Dict] = None, context=None,
+                        design_system: Optional[Dict] = None,
+                        on_scraped: Optional[Callable[[Dict], None]] = None):
+    """Background task to process website cloning
+    
+    The work itself runs in the clone pipeline's stages (fetch, extract, prompt, generate, validate).
+    A browser context passed in (e.g. by a batch) is shared with other jobs instead of leasing a fresh one.
+    A design system passed in (e.g. by a crawl) is reused instead of extracted again, and on_scraped
+    sees the scraped data before generation starts.
+    """
+    job = {
+        "job_id": job_id,
+        "url": url,
+        "options": options or {},
+        "context": context,
+        "design_system": design_system,
+        "on_scraped": on_scraped
+    }
     try:
         print(f"🌐 Processing clone for: {url} (Job: {job_id})")
         
         # Update status to processing
-        if job_id in clone_jobs:
-            clone_jobs[job_id]["status"] = CloneStatus.PROCESSING
-            print(f"📝 Updated job {job_id} status to PROCESSING")
+        if job_id in job_store:
+            job_store.update(job_id, status=CloneStatus.PROCESSING)
         else:
             print(f"❌ Job {job_id} not found when updating status")
             return
         
-        # Step 1: Scrape the website
-        print("📡 Starting website scraping...")
-        try:
-            scraped_data = await scrape_website_data(url)
-        except Exception as scrape_error:
-            print(f"❌ Scraping error: {scrape_error}")
-            clone_jobs[job_id]["status"] = CloneStatus.FAILED
-            clone_jobs[job_id]["error_message"] = f"Scraping failed: {str(scrape_error)}"
-            return
-        
-        if not scraped_data.get("success", False):
-            error_msg = scraped_data.get("error", "Unknown scraping error")
-            print(f"❌ Scraping failed: {error_msg}")
-            clone_jobs[job_id]["status"] = CloneStatus.FAILED
-            clone_jobs[job_id]["error_message"] = f"Scraping failed: {error_msg}"
-            return
-        
-        # Store scraped data
-        clone_jobs[job_id]["scraped_data"] = scraped_data
-        print("✅ Scraping completed successfully")
-        
-        # Step 2: Generate clone using AI
-        print("🤖 Starting AI cloning...")
-        try:
-            cloned_html = await website_cloner.clone_website(scraped_data, url)
-        except Exception as ai_error:
-            print(f"❌ AI cloning error: {ai_error}")
-            # Create a basic fallback HTML
-            cloned_html = create_emergency_fallback(url, scraped_data)
-        
-        # Validate result
-        if not cloned_html or len(cloned_html) < 100:
-            print("⚠️ Generated insufficient content, creating emergency fallback")
-            cloned_html = create_emergency_fallback(url, scraped_data)
-        
-        # Success!
-        clone_jobs[job_id]["status"] = CloneStatus.COMPLETED
-        clone_jobs[job_id]["cloned_html"] = cloned_html
-        
-        print(f"🎉 Cloning completed successfully!")
-        print(f"📄 Generated HTML: {len(cloned_html)} characters")
+        await clone_pipeline.run(job)
         
     except Exception as e:
         print(f"❌ Critical error in cloning (Job: {job_id}): {e}")
         traceback.print_exc()
         
         # Emergency error handling
-        if job_id in clone_jobs:
-            clone_jobs[job_id]["status"] = CloneStatus.FAILED
-            clone_jobs[job_id]["error_message"] = f"Processing error: {str(e)}"
+        if job_id in job_store:
+            job_store.update(job_id, status=CloneStatus.FAILED, error_message=f"Processing error: {str(e)}")
             
             # Try to create emergency fallback
             try:
                 emergency_html = create_emergency_fallback(url, {})
-                clone_jobs[job_id]["cloned_html"] = emergency_html
-                clone_jobs[job_id]["status"] = CloneStatus.COMPLETED
+                job_store.save_html(job_id, emergency_html)
+                job_store.update(job_id, status=CloneStatus.COMPLETED)
                 print("🚑 Created emergency fallback HTML")
             except Exception as fallback_error:
                 print(f"❌ Emergency fallback also failed: {fallback_error}")
+    finally:
+        # Streams receive the final result exactly once, whichever path finished the job
+        if not job.get("result_reported"):
+            await report_result(job_id)
+
+async def fetch_stage(job: Dict) -> bool:
+    """Load and extract the page; the browser context is given back before the job moves on"""
+    job_id, options = job["job_id"], job["options"]
+    report_stage(job_id, "scraping")
+    try:
+        job["scraped_data"] = await scrape_website_data(
+            job["url"],
+            settle_options=options.get("settle"),
+            on_stage=lambda stage: report_stage(job_id, stage),
+            screenshot_options=options.get("screenshot"),
+            interception_profile=options.get("interception_profile"),
+            context=job["context"],
+            design_system=job["design_system"]
+        )
+    except Exception as scrape_error:
+        print(f"❌ Scraping error: {scrape_error}")
+        job_store.update(job_id, status=CloneStatus.FAILED, error_message=f"Scraping failed: {str(scrape_error)}")
+        return False
+    return True
+
+async def extract_stage(job: Dict) -> bool:
+    """Check and store the scraped data, then hand it to the job's callback"""
+    job_id, scraped_data = job["job_id"], job["scraped_data"]
+    if not scraped_data.get("success", False):
+        error_msg = scraped_data.get("error", "Unknown scraping error")
+        print(f"❌ Scraping failed: {error_msg}")
+        job_store.update(job_id, status=CloneStatus.FAILED, error_message=f"Scraping failed: {error_msg}")
+        return False
+    
+    job_store.save_scraped_data(job_id, scraped_data)
+    if job["on_scraped"]:
+        try:
+            job["on_scraped"](scraped_data)
+        except Exception as callback_error:
+            print(f"⚠️ Scraped-data callback failed for job {job_id}: {callback_error}")
+    return True
+
+async def prompt_stage(job: Dict) -> bool:
+    job["prompt"], job["parts"] = None, None
+    if not website_cloner.model:
+        # Generation goes straight to the layout-aware fallback
+        return True
+    try:
+        if website_cloner.use_sections(job["scraped_data"], job["options"].get("generation_mode")):
+            composed = website_cloner.compose_section_prompts(job["scraped_data"], job["url"])
+            job["parts"] = composed["parts"]
+        else:
+            composed = website_cloner.compose_prompt(job["scraped_data"], job["url"])
+            job["prompt"] = composed["prompt"]
+        job_store.update(job["job_id"], prompt_summary=composed["tokens"])
+    except Exception as prompt_error:
+        # The generate stage tries again and falls back the way it always has
+        print(f"⚠️ Prompt build failed for job {job['job_id']}: {prompt_error}")
+    return True
+
+async def generate_stage(job: Dict) -> bool:
+    """Run the model; under a latency SLO the fallback is served first if the model is too slow"""
+    job_id, url, scraped_data = job["job_id"], job["url"], job["scraped_data"]
+    slo = job["options"].get("latency_slo_seconds") or website_cloner.latency_slo
+    report_stage(job_id, "generating")
+    generation = asyncio.create_task(run_generation(job_id, url, scraped_data, job["prompt"], job["parts"]))
+    try:
+        if slo is None or not website_cloner.model or not website_cloner.client.available():
+            result = await generation
+            job["cloned_html"], job["cacheable"] = result["html"], result["cacheable"]
+            return True
+        
+        # Built while the model works, so it is ready the moment the SLO runs out
+        fallback = asyncio.create_task(asyncio.to_thread(website_cloner.build_fallback, scraped_data, url))
+        done, _ = await asyncio.wait({generation}, timeout=slo)
+        if done:
+            fallback.cancel()
+            SPECULATIVE_RESULTS.inc(outcome="in_time")
+            result = generation.result()
+            job["cloned_html"], job["cacheable"] = result["html"], result["cacheable"]
+            return True
+        
+        print(f"⏱️ Model missed the {slo}s latency SLO for job {job_id}, serving the layout-aware fallback")
+        SPECULATIVE_RESULTS.inc(outcome="fallback_served")
+        await complete_clone(job_id, url, scraped_data, await fallback, cacheable=False, options=job["options"],
+                             provisional=True)
+        await report_result(job_id)
+        job["result_reported"] = True
+        
+        # The job keeps its model slot until the AI result is in, then swaps it in
+        try:
+            result = await generation
+            if result["fallback"] or not result["html"] or len(result["html"]) < 100:
+                SPECULATIVE_RESULTS.inc(outcome="not_upgraded")
+            elif job_id in job_store:
+                await upgrade_result(job_id, url, scraped_data, result["html"], job["options"])
+                SPECULATIVE_RESULTS.inc(outcome="upgraded")
+        except Exception as upgrade_error:
+            print(f"⚠️ Could not upgrade job {job_id} to the AI result: {upgrade_error}")
+        finally:
+            # Clients keep listening while the result is provisional, so always tell them it's settled
+            job_data = job_store.get(job_id)
+            if job_data is not None and job_data["provisional"]:
+                await settle_result(job_id, "final")
+        return False
+    finally:
+        generation.cancel()
+
+async def run_generation(job_id: str, url: str, scraped_data: Dict, prompt: Optional[str],
+                         parts: Optional[List[Dict]] = None) -> Dict:
+    """Stream the model's output for a job; reports the final HTML and whether it is a fallback
+    
+    With page parts the page is generated section by section instead of in one call.
+    """
+    result = {"html": None, "fallback": False, "cacheable": True}
+    if parts:
+        events = website_cloner.stream_sectioned_clone(scraped_data, url, parts=parts)
+    else:
+        events = website_cloner.stream_clone_website(scraped_data, url, prompt=prompt)
+    try:
+        # Chunks reach open progress streams while the model is still writing
+        async for event in events:
+            if event["type"] == "chunk":
+                job_events.append_html(job_id, event["html"])
+            else:
+                result["html"], result["fallback"] = event["html"], event["fallback"]
+                # A fallback served because the model was down must not outlive the outage in the cache
+                result["cacheable"] = not event["fallback"] or not website_cloner.model
+    except Exception as ai_error:
+        print(f"❌ AI cloning error: {ai_error}")
+        # Create a basic fallback HTML
+        result.update(html=create_emergency_fallback(url, scraped_data), fallback=True, cacheable=False)
+    finally:
+        job_events.clear_html(job_id)
+    return result
+
+async def validate_stage(job: Dict) -> bool:
+    report_stage(job["job_id"], "validating")
+    await complete_clone(job["job_id"], job["url"], job["scraped_data"], job["cloned_html"], job["cacheable"], job["options"])
+    return True
+
+async def complete_clone(job_id: str, url: str, scraped_data: Dict, cloned_html: Optional[str], cacheable: bool,
+                   options: Optional[Dict] = None, provisional: bool = False) -> None:
+    if not cloned_html or len(cloned_html) < 100:
+        print("⚠️ Generated insufficient content, creating emergency fallback")
+        cloned_html = create_emergency_fallback(url, scraped_data)
+        cacheable = False
+    
+    # Success!
+    job_store.save_html(job_id, cloned_html)
+    job_store.update(job_id, status=CloneStatus.COMPLETED, provisional=provisional)
+    if cacheable:
+        await result_cache.put(url, scraped_data, cloned_html, cache_variant(options or {}))
+    
+    print(f"🎉 Cloning completed for job {job_id}: {len(cloned_html)} characters")
+
+async def upgrade_result(job_id: str, url: str, scraped_data: Dict, cloned_html: str, options: Dict) -> None:
+    """Replace a fallback that was already served with the AI result, and push the new result"""
+    job_store.save_html(job_id, cloned_html)
+    await result_cache.put(url, scraped_data, cloned_html, cache_variant(options))
+    report_stage(job_id, "upgraded")
+    await settle_result(job_id, "upgraded")
+    print(f"⬆️ Upgraded job {job_id} to the AI result: {len(cloned_html)} characters")
+
+async def settle_result(job_id: str, event: str) -> None:
+    """Mark a provisional result final and end open progress streams with an "upgraded" or "final" event"""
+    job_store.update(job_id, provisional=False)
+    job_data = job_store.get(job_id)
+    if job_data is None:
+        return
+    result = build_clone_result(job_id, job_data)
+    # A new body means a new ETag, so clients holding the fallback fetch the settled result
+    await asyncio.to_thread(job_store.save_result, job_id, result.model_dump_json().encode())
+    job_events.publish(job_id, event, result.model_dump(mode="json"))
+
+# Chromium and the model each get their own worker pool, sized by the scheduler's stage limits
+clone_pipeline.add_stage("fetch", fetch_stage, workers=job_scheduler.stage_limits["scrape"])
+clone_pipeline.add_stage("extract", extract_stage)
+clone_pipeline.add_stage("prompt", prompt_stage)
+clone_pipeline.add_stage("generate", generate_stage, workers=job_scheduler.stage_limits["generate"])
+clone_pipeline.add_stage("validate", validate_stage)
+
+async def recover_interrupted_jobs() -> int:
+    """Requeue jobs whose worker died before finishing them"""
+    recovered = 0
+    for job in job_store.claim_interrupted_jobs():
+        job_id = job["job_id"]
+        report_stage(job_id, "queued")
+        try:
+            job_scheduler.submit(
+                job_id,
+                lambda job_id=job_id, url=job["original_url"], options=job.get("options"):
+                    process_clone(job_id, url, options)
+            )
+        except QueueFullError:
+            job_store.update(job_id, status=CloneStatus.FAILED, error_message="Interrupted and could not be requeued")
+            await report_result(job_id)
+            continue
+        recovered += 1
+    if recovered:
+        print(f"♻️ Requeued {recovered} interrupted clone jobs")
+    return recovered
 
 def create_emergency_fallback(url: str, scraped_data: Dict = None) -> str:
     """Emergency fallback that always works"""
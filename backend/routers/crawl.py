@@ -0,0 +1,120 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+from models.schemas import CloneStatus, CrawlRequest, CrawlResponse, CrawlStatus
+from routers.batch import batch_summary
+from routers.clone import clone_options, process_clone
+from services.job_scheduler import QueueFullError
+from services.job_store import job_store
+from services.site_crawler import SiteCrawl, crawl_manager, link_pages, nav_links, normalize_link, page_file_name
+from typing import Dict, List
+import asyncio
+import io
+import uuid
+import zipfile
+
+router = APIRouter(prefix="/api", tags=["crawl"])
+
+
+@router.post("/crawl", response_model=CrawlResponse)
+async def start_crawl(request: CrawlRequest):
+    """Clone a start page and the same-origin pages its navigation links to"""
+    crawl_id = str(uuid.uuid4())
+    options = clone_options(request)
+    options["crawl"] = {
+        "max_depth": request.max_depth,
+        "max_pages": request.max_pages or crawl_manager.default_max_pages
+    }
+    crawl = SiteCrawl(
+        crawl_id,
+        str(request.url),
+        options,
+        max_depth=request.max_depth,
+        max_pages=options["crawl"]["max_pages"],
+        concurrency=request.concurrency or crawl_manager.default_concurrency,
+        delay_seconds=request.delay_ms / 1000 if request.delay_ms is not None else crawl_manager.default_delay_seconds,
+        respect_robots=request.respect_robots,
+        include_footer=request.include_footer
+    )
+    root_job_id = crawl.create_root_job()
+
+    print(f"🕸️ Starting crawl {crawl_id} from {crawl.root_url}")
+
+    try:
+        position = crawl_manager.submit(
+            crawl,
+            lambda job_id, url, page_options, context, design_system, on_scraped: process_clone(
+                job_id, url, page_options, context=context, design_system=design_system, on_scraped=on_scraped
+            )
+        )
+    except QueueFullError as e:
+        job_store.delete(root_job_id)
+        print(f"🚦 Queue full, rejecting crawl of {crawl.root_url}")
+        raise HTTPException(
+            status_code=503,
+            detail="Too many clone jobs in progress, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    return CrawlResponse(
+        crawl_id=crawl_id,
+        root_job_id=root_job_id,
+        status=CloneStatus.PENDING,
+        message=f"Crawl of {crawl.root_url} queued (position {position})"
+    )
+
+
+@router.get("/crawl/{crawl_id}", response_model=CrawlStatus)
+async def get_crawl_status(crawl_id: str, include_jobs: bool = True):
+    """Pages found so far and their progress"""
+    jobs = job_store.list_batch(crawl_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Crawl not found")
+
+    summary = batch_summary(crawl_id, jobs, include_jobs)
+    running = crawl_id in crawl_manager.running_crawl_ids()
+    if running and summary["status"] == CloneStatus.COMPLETED:
+        # Pages are still being discovered
+        summary["status"], summary["finished_at"] = CloneStatus.PROCESSING, None
+    return CrawlStatus(**summary, root_url=jobs[0]["original_url"], running=running)
+
+
+@router.get("/crawl/{crawl_id}/site")
+async def download_crawled_site(crawl_id: str):
+    """Zip of every cloned page, with navigation between them pointing at the local files"""
+    jobs = job_store.list_batch(crawl_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Crawl not found")
+    pages = [job for job in jobs if job["has_html"]]
+    if not pages:
+        raise HTTPException(status_code=409, detail="No pages have finished yet")
+
+    archive = await asyncio.to_thread(build_site_archive, jobs[0]["original_url"], pages)
+    return Response(
+        content=archive,
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="site-{crawl_id[:8]}.zip"'}
+    )
+
+
+def build_site_archive(root_url: str, pages: List[Dict]) -> bytes:
+    """Link the generated pages to each other and pack them into a zip"""
+    taken = set()
+    page_files = {}
+    link_texts: Dict[str, str] = {}
+    for job in pages:
+        url = normalize_link(job["original_url"], job["original_url"]) or job["original_url"]
+        page_files[url] = page_file_name(url, root_url, taken)
+        scraped_data = job_store.load_scraped_data(job["job_id"]) or {}
+        for link in nav_links(scraped_data):
+            target = normalize_link(link.get("href", ""), url)
+            text = " ".join((link.get("text") or "").split()).lower()
+            if target and text:
+                link_texts.setdefault(text, target)
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for job in pages:
+            url = normalize_link(job["original_url"], job["original_url"]) or job["original_url"]
+            html = job_store.load_html(job["job_id"]) or ""
+            archive.writestr(page_files[url], link_pages(html, url, page_files, link_texts))
+    return buffer.getvalue()
@@ -0,0 +1,67 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from services.ai_cloner import website_cloner
+from services.metrics import metrics
+from services.model_client import CLOSED, HALF_OPEN, OPEN
+from services.browser_pool import browser_pool
+from services.job_scheduler import job_scheduler
+from services.pipeline import clone_pipeline
+from services.result_cache import result_cache
+from services.generation_cache import generation_cache
+from services.design_system_cache import design_system_cache
+from services.job_events import job_events
+from services.batch_runner import batch_runner
+from services.site_crawler import crawl_manager
+
+router = APIRouter(tags=["metrics"])
+
+CACHES = {"result": result_cache, "generation": generation_cache, "design_system": design_system_cache}
+
+
+def _per_cache(field: str):
+    return lambda: {(name,): cache.stats()[field] for name, cache in CACHES.items()}
+
+
+# Service state is read when /metrics is scraped, straight from the owning objects
+metrics.gauge("clone_queue_depth", "Jobs waiting for a worker", lambda: job_scheduler.queue_depth)
+metrics.gauge("clone_running_jobs", "Jobs currently running", lambda: job_scheduler.stats()["running_jobs"])
+metrics.gauge(
+    "clone_stage_active", "Jobs being worked on in each pipeline stage",
+    lambda: {(stage,): info["active"] for stage, info in clone_pipeline.stats()["stages"].items()},
+    ["stage"]
+)
+metrics.gauge(
+    "clone_stage_queued", "Jobs waiting for each pipeline stage",
+    lambda: {(stage,): info["queued"] for stage, info in clone_pipeline.stats()["stages"].items()},
+    ["stage"]
+)
+metrics.gauge("clone_model_circuit_state", "Model circuit breaker: 0 closed, 1 half-open, 2 open",
+              lambda: {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}[website_cloner.client.state])
+metrics.gauge(
+    "clone_model_hedge_delay_seconds", "Wait for a model response (whole call or first chunk) before a hedged duplicate",
+    lambda: {(kind,): website_cloner.client.hedge_delay(kind) or 0 for kind in website_cloner.client.latencies},
+    ["kind"]
+)
+metrics.callback_counter("clone_jobs_completed_total", "Jobs the scheduler has finished running",
+                         lambda: job_scheduler.completed_jobs)
+metrics.callback_counter("clone_jobs_rejected_total", "Jobs rejected because the queue was full",
+                         lambda: job_scheduler.rejected_jobs)
+metrics.gauge("clone_active_batches", "Batches with jobs still to run in this process", batch_runner.active_batches)
+metrics.gauge("clone_active_crawls", "Site crawls queued or running in this process", crawl_manager.active_crawls)
+metrics.gauge("browser_pool_utilization", "Share of browser context slots in use",
+              lambda: browser_pool.stats()["utilization"])
+metrics.gauge("browser_pool_active_contexts", "Browser contexts currently leased",
+              lambda: browser_pool.stats()["active_contexts"])
+metrics.gauge("browser_pool_capacity", "Browser context slots in the pool", lambda: browser_pool.stats()["capacity"])
+metrics.callback_counter("browser_pool_recycles_total", "Browsers restarted after crashes or page limits",
+                         lambda: browser_pool.recycle_count)
+metrics.callback_counter("cache_hits_total", "Cache lookups that found an entry", _per_cache("hits"), ["cache"])
+metrics.callback_counter("cache_misses_total", "Cache lookups that found nothing", _per_cache("misses"), ["cache"])
+metrics.gauge("cache_hit_ratio", "Hits divided by lookups since startup", _per_cache("hit_rate"), ["cache"])
+metrics.gauge("progress_stream_subscribers", "Open job progress streams", job_events.subscriber_count)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text exposition of latency histograms and service gauges"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
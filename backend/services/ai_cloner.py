@@ -1,79 +1,463 @@
 import google.generativeai as genai
 import os
 from dotenv import load_dotenv
-from typing import Dict, Optional, List
+from typing import Any, AsyncIterator, Dict, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import json
+import logging
 import re
 import asyncio
+import threading
+import time
+
+from services.generation_cache import GenerationCache, generation_cache
+from services.html_stream import IncrementalHtmlCleaner, IncrementalStructureCheck
+from services.metrics import observe_stage, span
+from services.model_client import ModelClient, ModelUnavailableError
+from services.prompt_budget import PROMPT_TOKENS, compact_page_content, estimate_tokens
+from services.section_generation import (
+    SECTION_PARTS, base_stylesheet, drop_page_wide_rules, fallback_fragment, merge_stylesheets, part_inputs, plan_parts,
+    section_count, split_fragment, stitch_document
+)
 
 load_dotenv()
 
+# Per-request progress goes to the debug log; set LOG_LEVEL=DEBUG to see it
+logger = logging.getLogger(__name__)
+
+# Bump whenever the prompt or its formatting changes so cached results are invalidated
+PROMPT_VERSION = "2"
+
+GENERATION_CONFIG = {
+    "temperature": 0.1,
+    "top_p": 0.9,
+    "top_k": 40,
+    "max_output_tokens": 16384,
+}
+
 class LayoutAwareCloner:
-    def __init__(self):
+    def __init__(self, model: Any = None, timeout: Optional[float] = None, max_workers: Optional[int] = None,
+                 cache: Optional[GenerationCache] = None, client: Optional[ModelClient] = None):
+        self.cache = cache or generation_cache
+        # Retries, hedging, circuit breaker and rate limits for every model request
+        self.client = client or ModelClient()
+        # Pages served from the layout-aware fallback instead of the model
+        self.fallbacks_built = 0
+        self.generation_timeout = timeout or float(os.getenv("GEMINI_TIMEOUT_SECONDS", "90"))
+        # Estimated prompt size the builder fills up to, instructions included
+        self.prompt_token_budget = int(os.getenv("PROMPT_TOKEN_BUDGET", "2000"))
+        # "single" writes the page in one call, "sections" in concurrent calls per page part,
+        # "auto" switches to sections for pages with at least section_min_sections sections
+        self.generation_mode = os.getenv("GENERATION_MODE", "single")
+        self.section_min_sections = int(os.getenv("SECTION_MIN_SECTIONS", "6"))
+        self.sections_per_part = int(os.getenv("SECTIONS_PER_PART", "3"))
+        self.section_max_parts = int(os.getenv("SECTION_MAX_PARTS", "6"))
+        # Jobs serve the fallback once generation has taken this long; off when unset
+        self.latency_slo = float(os.getenv("CLONE_LATENCY_SLO_SECONDS", "0")) or None
+        # Only used for models without an async API; bounds the threads a slow model can tie up
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or int(os.getenv("GEMINI_MAX_WORKERS", "4")),
+            thread_name_prefix="gemini"
+        )
+        
+        if model is not None:
+            # Injected model (e.g. a local stub for tests and benchmarks)
+            self.model = model
+            return
+        
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
-            print("âš ï¸ GEMINI_API_KEY not found in environment variables")
+            print("⚠️ GEMINI_API_KEY not found in environment variables")
             self.model = None
         else:
             genai.configure(api_key=api_key)
             self.model = genai.GenerativeModel('gemini-1.5-flash')
-            print("âœ… Gemini AI service initialized for layout-aware cloning")
+            print("✅ Gemini AI service initialized for layout-aware cloning")
+    
+    def shutdown(self):
+        """Release the executor threads; called on app shutdown"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _cache_key(self, prompt: str) -> str:
+        model_name = getattr(self.model, "model_name", type(self.model).__name__)
+        return self.cache.make_key(prompt, GENERATION_CONFIG, model_name)
+    
+    async def _remember(self, prompt: str, response_text: str) -> None:
+        """Cache a response once the caller has validated it, so a broken one is never replayed"""
+        await self.cache.put(self._cache_key(prompt), response_text)
+    
+    async def _generate(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """Run the model call without blocking the event loop; the caller caches the response if it is usable"""
+        
+        # Identical prompts (mirrors, query-string variants) reuse the earlier response
+        cached = await self.cache.get(self._cache_key(prompt))
+        if cached is not None:
+            logger.debug("Reusing cached AI response for identical prompt")
+            return cached
+        
+        def request():
+            # Called once per attempt; retries and hedges each need a fresh call
+            if hasattr(self.model, "generate_content_async"):
+                return self.model.generate_content_async(prompt, generation_config=GENERATION_CONFIG)
+            return asyncio.get_running_loop().run_in_executor(
+                self._executor,
+                functools.partial(self.model.generate_content, prompt, generation_config=GENERATION_CONFIG)
+            )
+        
+        # Cancelling the caller (or hitting the timeout) cancels the pending call
+        with span("model_call"):
+            response = await self.client.call(
+                request, timeout=timeout or self.generation_timeout, tokens=estimate_tokens(prompt)
+            )
+        return response.text
     
-    async def clone_website(self, scraped_data: Dict, url: str) -> str:
+    async def clone_website(self, scraped_data: Dict, url: str, timeout: Optional[float] = None) -> str:
         """Generate layout-aware website clone with proper structure and flow"""
         
         if not self.model:
-            print("âš ï¸ AI model not available, using layout-aware fallback")
+            logger.debug("AI model not available, using layout-aware fallback")
             return self._create_layout_aware_fallback(scraped_data, url)
         
         try:
-            # Extract structured data
-            layout_structure = scraped_data.get("layout_structure", {})
-            content_sections = scraped_data.get("content_sections", {})
-            design_system = scraped_data.get("design_system", {})
             structured_content = scraped_data.get("structured_content", {})
-            navigation_analysis = scraped_data.get("navigation_analysis", {})
-            
-            print(f"ðŸ—ï¸ Layout type: {layout_structure.get('page_type', 'unknown')}")
-            print(f"ðŸ“‘ Content sections: {len(content_sections.get('main_content', {}).get('sections', []))}")
-            print(f"ðŸ§­ Navigation items: {len(navigation_analysis.get('primary_nav', []))}")
-            
-            # Build layout-aware prompt
-            prompt = self._build_layout_aware_prompt(
-                layout_structure, content_sections, design_system, 
-                structured_content, navigation_analysis, url
-            )
+            prompt = self.build_prompt(scraped_data, url)
             
-            print("ðŸ¤– Generating layout-aware clone with AI...")
+            logger.debug("Generating layout-aware clone with AI")
             
             # Generate with structure-focused settings
-            response = self.model.generate_content(
-                prompt,
-                generation_config={
-                    "temperature": 0.1,
-                    "top_p": 0.9,
-                    "top_k": 40,
-                    "max_output_tokens": 16384,
-                }
-            )
+            response_text = await self._generate(prompt, timeout)
             
             # Extract and validate HTML
-            html_result = self._extract_clean_html(response.text)
+            with span("html_cleanup"):
+                html_result = self._extract_clean_html(response_text)
+            
+            with span("validation"):
+                well_structured = self._is_well_structured_html(html_result, structured_content)
             
-            if self._is_well_structured_html(html_result, structured_content):
-                print("âœ… Generated well-structured HTML clone")
+            if well_structured:
+                logger.debug("Generated well-structured HTML clone")
+                await self._remember(prompt, response_text)
                 return html_result
             else:
-                print("âš ï¸ AI result not well-structured, using layout-aware fallback")
+                logger.debug("AI result not well-structured, using layout-aware fallback")
                 return self._create_layout_aware_fallback(scraped_data, url)
                 
+        except ModelUnavailableError as e:
+            logger.debug(f"{e}, using layout-aware fallback")
+            return self._create_layout_aware_fallback(scraped_data, url)
+        except asyncio.TimeoutError:
+            logger.debug(f"AI generation timed out after {timeout or self.generation_timeout}s, using layout-aware fallback")
+            return self._create_layout_aware_fallback(scraped_data, url)
         except Exception as e:
-            print(f"âŒ Layout-aware AI cloning failed: {e}")
+            logger.debug(f"Layout-aware AI cloning failed: {e}")
             return self._create_layout_aware_fallback(scraped_data, url)
     
-    def _build_layout_aware_prompt(self, layout_structure: Dict, content_sections: Dict, 
-                                 design_system: Dict, structured_content: Dict, 
-                                 navigation_analysis: Dict, url: str) -> str:
+    async def stream_clone_website(self, scraped_data: Dict, url: str, timeout: Optional[float] = None,
+                                   prompt: Optional[str] = None) -> AsyncIterator[Dict]:
+        """Streaming variant of clone_website
+        
+        Yields {"type": "chunk", "html": ...} as cleaned HTML arrives, then one
+        {"type": "done", "html": ..., "fallback": bool} with the final document.
+        If the model fails or the streamed HTML fails validation, the final
+        document is the layout-aware fallback and replaces the chunks.
+        A prompt built ahead of time (see build_prompt) is used as is.
+        """
+        
+        if not self.model:
+            logger.debug("AI model not available, using layout-aware fallback")
+            yield {"type": "done", "html": self._create_layout_aware_fallback(scraped_data, url), "fallback": True}
+            return
+        
+        cleaner = IncrementalHtmlCleaner()
+        check = IncrementalStructureCheck(scraped_data.get("structured_content", {}))
+        parts = []
+        # Raw model text, cached only if the finished page passes validation
+        raw = []
+        # Cleanup and validation are spread across chunks, so their time is summed
+        timings = {"html_cleanup": 0.0, "validation": 0.0}
+        
+        def accept(cleaned: str) -> None:
+            started = time.perf_counter()
+            check.feed(cleaned)
+            timings["validation"] += time.perf_counter() - started
+            parts.append(cleaned)
+        
+        try:
+            prompt = prompt or self.build_prompt(scraped_data, url)
+            logger.debug("Streaming layout-aware clone from AI")
+            
+            async for text in self._generate_stream(prompt, timeout):
+                raw.append(text)
+                started = time.perf_counter()
+                cleaned = cleaner.feed(text)
+                timings["html_cleanup"] += time.perf_counter() - started
+                if cleaned:
+                    accept(cleaned)
+                    yield {"type": "chunk", "html": cleaned}
+            
+            started = time.perf_counter()
+            tail = cleaner.flush()
+            timings["html_cleanup"] += time.perf_counter() - started
+            if tail:
+                accept(tail)
+                yield {"type": "chunk", "html": tail}
+                
+        except ModelUnavailableError as e:
+            logger.debug(f"{e}, using layout-aware fallback")
+            yield {"type": "done", "html": self._create_layout_aware_fallback(scraped_data, url), "fallback": True}
+            return
+        except asyncio.TimeoutError:
+            logger.debug(f"AI generation timed out after {timeout or self.generation_timeout}s, using layout-aware fallback")
+            yield {"type": "done", "html": self._create_layout_aware_fallback(scraped_data, url), "fallback": True}
+            return
+        except Exception as e:
+            logger.debug(f"Layout-aware AI cloning failed: {e}")
+            yield {"type": "done", "html": self._create_layout_aware_fallback(scraped_data, url), "fallback": True}
+            return
+        
+        for stage, seconds in timings.items():
+            observe_stage(stage, seconds)
+        
+        if check.passed():
+            logger.debug("Generated well-structured HTML clone")
+            await self._remember(prompt, "".join(raw))
+            yield {"type": "done", "html": "".join(parts), "fallback": False}
+        else:
+            logger.debug("AI result not well-structured, using layout-aware fallback")
+            yield {"type": "done", "html": self._create_layout_aware_fallback(scraped_data, url), "fallback": True}
+    
+    async def stream_sectioned_clone(self, scraped_data: Dict, url: str, parts: Optional[List[Dict]] = None,
+                                     timeout: Optional[float] = None) -> AsyncIterator[Dict]:
+        """Generate the header, groups of sections and the footer as concurrent model calls, then stitch them
+        
+        Yields the same final "done" event as stream_clone_website. Parts finish out of order, so
+        there are no chunk events. A part the model fails on is rendered from the scraped data instead.
+        """
+        
+        if not self.model:
+            logger.debug("AI model not available, using layout-aware fallback")
+            yield {"type": "done", "html": self._create_layout_aware_fallback(scraped_data, url), "fallback": True}
+            return
+        
+        if not self.client.available():
+            # Every part would be turned away, so skip straight to the whole-page fallback
+            logger.debug("Model circuit breaker is open, using layout-aware fallback")
+            yield {"type": "done", "html": self._create_layout_aware_fallback(scraped_data, url), "fallback": True}
+            return
+        
+        parts = parts or self.compose_section_prompts(scraped_data, url)["parts"]
+        logger.debug(f"Generating {len(parts)} page parts in parallel")
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(self._generate(part["prompt"], timeout) for part in parts), return_exceptions=True
+        )
+        observe_stage("sectioned_generation", time.perf_counter() - started)
+        
+        fragments, sheets, failed = {}, [], []
+        with span("html_cleanup"):
+            for part, response in zip(parts, responses):
+                css, fragment = ("", "") if isinstance(response, BaseException) else split_fragment(response)
+                if "<" not in fragment:
+                    reason = response if isinstance(response, BaseException) else "no markup"
+                    logger.debug(f"Page part {part['name']} failed ({reason}), rendering it from the scraped data")
+                    failed.append(part["name"])
+                    css, fragment = "", fallback_fragment(part, scraped_data)
+                SECTION_PARTS.inc(source="fallback" if part["name"] in failed else "model")
+                fragments[part["name"]] = fragment
+                sheets.append(drop_page_wide_rules(css))
+        
+        if len(failed) == len(parts):
+            logger.debug("Every page part failed, using layout-aware fallback")
+            yield {"type": "done", "html": self._create_layout_aware_fallback(scraped_data, url), "fallback": True}
+            return
+        
+        layout_structure = scraped_data.get("layout_structure") or {}
+        stylesheet = merge_stylesheets([
+            base_stylesheet(scraped_data.get("design_system") or {},
+                            (layout_structure.get("container_info") or {}).get("maxWidth")),
+            *sheets
+        ])
+        html = stitch_document(scraped_data, parts, fragments, stylesheet)
+        
+        with span("validation"):
+            well_structured = self._is_well_structured_html(html, scraped_data.get("structured_content", {}))
+        if well_structured:
+            logger.debug(f"Stitched {len(parts)} generated page parts")
+            for part, response in zip(parts, responses):
+                if part["name"] not in failed:
+                    await self._remember(part["prompt"], response)
+            yield {"type": "done", "html": html, "fallback": False}
+        else:
+            logger.debug("Stitched result not well-structured, using layout-aware fallback")
+            yield {"type": "done", "html": self._create_layout_aware_fallback(scraped_data, url), "fallback": True}
+    
+    async def _generate_stream(self, prompt: str, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """Yield raw response text as the model produces it; the timeout covers the whole response
+        
+        Like _generate, the response is not cached here; the caller does that once it passes validation.
+        """
+        
+        cached = await self.cache.get(self._cache_key(prompt))
+        if cached is not None:
+            logger.debug("Reusing cached AI response for identical prompt")
+            yield cached
+            return
+        
+        deadline = time.monotonic() + (timeout or self.generation_timeout)
+        
+        def remaining() -> float:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                raise asyncio.TimeoutError()
+            return left
+        
+        def open_stream() -> AsyncIterator[str]:
+            if hasattr(self.model, "generate_content_async"):
+                return self._stream_async(prompt, remaining)
+            return self._stream_in_executor(prompt, remaining)
+        
+        chunks = self.client.stream(
+            open_stream, timeout=deadline - time.monotonic(), tokens=estimate_tokens(prompt)
+        ).__aiter__()
+        
+        # Only time spent waiting on the model counts; the consumer's work between chunks does not
+        received = []
+        model_seconds = 0.0
+        started = time.perf_counter()
+        try:
+            while True:
+                waiting_since = time.perf_counter()
+                try:
+                    text = await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+                finally:
+                    model_seconds += time.perf_counter() - waiting_since
+                if not received:
+                    observe_stage("model_first_chunk", time.perf_counter() - started)
+                received.append(text)
+                yield text
+        finally:
+            observe_stage("model_call", model_seconds)
+    
+    async def _stream_async(self, prompt: str, remaining) -> AsyncIterator[str]:
+        response = await asyncio.wait_for(
+            self.model.generate_content_async(prompt, generation_config=GENERATION_CONFIG, stream=True),
+            timeout=remaining()
+        )
+        chunks = response.__aiter__()
+        while True:
+            try:
+                chunk = await asyncio.wait_for(chunks.__anext__(), timeout=remaining())
+            except StopAsyncIteration:
+                break
+            yield chunk.text
+    
+    async def _stream_in_executor(self, prompt: str, remaining) -> AsyncIterator[str]:
+        """Drive a blocking streaming model from the executor, handing chunks back to the loop"""
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        finished = object()
+        
+        def produce():
+            try:
+                for chunk in self.model.generate_content(prompt, generation_config=GENERATION_CONFIG, stream=True):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk.text)
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+            except Exception as e:
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+        
+        producer = loop.run_in_executor(self._executor, produce)
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), timeout=remaining())
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # A blocking call can't be interrupted, but the thread stops at its next chunk
+            stop.set()
+            producer.cancel()
+    
+    def build_prompt(self, scraped_data: Dict, url: str) -> str:
+        """Build the generation prompt from scraped data"""
+        return self.compose_prompt(scraped_data, url)["prompt"]
+    
+    def compose_prompt(self, scraped_data: Dict, url: str, token_budget: Optional[int] = None) -> Dict:
+        """Generation prompt filled up to the token budget, with its estimated token counts"""
+        budget = token_budget or self.prompt_token_budget
+        with span("prompt_build"):
+            layout_structure = scraped_data.get("layout_structure") or {}
+            design_system = scraped_data.get("design_system") or {}
+            # Instructions, layout and design system are always sent; page content fills the rest
+            fixed_tokens = estimate_tokens(self._build_layout_aware_prompt(layout_structure, design_system, url, "", ""))
+            compacted = compact_page_content(
+                scraped_data.get("content_sections") or {},
+                scraped_data.get("structured_content") or {},
+                scraped_data.get("navigation_analysis") or {},
+                budget - fixed_tokens,
+                fold_px=(layout_structure.get("viewport") or {}).get("height")
+            )
+            prompt = self._build_layout_aware_prompt(
+                layout_structure, design_system, url, compacted["content"], compacted["navigation"]
+            )
+        
+        tokens = {"budget": budget, "fixed_tokens": fixed_tokens, **compacted["report"],
+                  "prompt_tokens": estimate_tokens(prompt)}
+        PROMPT_TOKENS.observe(tokens["prompt_tokens"])
+        return {"prompt": prompt, "tokens": tokens}
+    
+    def use_sections(self, scraped_data: Dict, mode: Optional[str] = None) -> bool:
+        """Whether a page is generated part by part instead of in one call"""
+        mode = mode or self.generation_mode
+        sections = section_count(scraped_data)
+        if mode == "sections":
+            return sections >= 2
+        if mode == "auto":
+            return sections >= self.section_min_sections
+        return False
+    
+    def compose_section_prompts(self, scraped_data: Dict, url: str, token_budget: Optional[int] = None) -> Dict:
+        """One prompt per page part, each sharing the design system and filled up to the token budget"""
+        budget = token_budget or self.prompt_token_budget
+        layout_structure = scraped_data.get("layout_structure") or {}
+        design_block = self._format_design_system(scraped_data.get("design_system") or {})
+        fold_px = (layout_structure.get("viewport") or {}).get("height")
+        parts = plan_parts(scraped_data, self.sections_per_part, self.section_max_parts)
+        
+        with span("prompt_build"):
+            for part in parts:
+                content_sections, structured_content, navigation_analysis = part_inputs(part, scraped_data)
+                fixed_tokens = estimate_tokens(self._build_part_prompt(part, url, design_block, ""))
+                compacted = compact_page_content(
+                    content_sections, structured_content, navigation_analysis, budget - fixed_tokens, fold_px=fold_px
+                )
+                body = compacted["content"] if part["kind"] == "sections" else compacted["navigation"]
+                part["prompt"] = self._build_part_prompt(part, url, design_block, body)
+                part["tokens"] = estimate_tokens(part["prompt"])
+                PROMPT_TOKENS.observe(part["tokens"])
+        
+        tokens = {
+            "budget": budget,
+            "mode": "sections",
+            "parts": {part["name"]: part["tokens"] for part in parts},
+            "prompt_tokens": sum(part["tokens"] for part in parts)
+        }
+        return {"parts": parts, "tokens": tokens}
+    
+    def build_fallback(self, scraped_data: Dict, url: str) -> str:
+        """Deterministic layout-aware page built from the scraped data alone, without the model"""
+        with span("fallback_build"):
+            return self._create_layout_aware_fallback(scraped_data, url)
+    
+    def _build_layout_aware_prompt(self, layout_structure: Dict, design_system: Dict, url: str,
+                                 content_structure: str, navigation_system: str) -> str:
         """Build prompt focused on proper layout structure and content flow"""
         
         prompt = f"""Create a well-structured, professional website that recreates {url} with proper layout flow and visual hierarchy.
@@ -91,10 +475,10 @@ Layout Flow: {layout_structure.get('layout_flow', 'vertical')}
 Container Width: {layout_structure.get('container_info', {}).get('maxWidth', '1200px')}
 
 CONTENT STRUCTURE:
-{self._format_content_structure(content_sections, structured_content)}
+{content_structure}
 
 NAVIGATION SYSTEM:
-{self._format_navigation_system(navigation_analysis)}
+{navigation_system or "Standard navigation structure"}
 
 DESIGN SYSTEM:
 {self._format_design_system(design_system)}
@@ -135,90 +519,38 @@ Generate a complete, well-structured HTML page that flows naturally and looks pr
 
         return prompt
     
-    def _format_content_structure(self, content_sections: Dict, structured_content: Dict) -> str:
-        """Format content structure for AI prompt"""
-        
-        structure_info = []
-        
-        # Page title and main heading
-        page_title = structured_content.get('page_title', 'Website')
-        main_heading = structured_content.get('main_heading', page_title)
-        
-        structure_info.append(f"Page Title: {page_title}")
-        structure_info.append(f"Main Heading: {main_heading}")
-        
-        # Meta description
-        meta_desc = structured_content.get('meta_description', '')
-        if meta_desc:
-            structure_info.append(f"Description: {meta_desc}")
-        
-        # Content sections in order
-        main_content = content_sections.get('main_content', {})
-        sections = main_content.get('sections', [])
-        
-        if sections:
-            structure_info.append("CONTENT SECTIONS (in order):")
-            for i, section in enumerate(sections[:8]):  # Limit sections
-                section_type = section.get('type', 'content')
-                heading = section.get('heading', {})
-                content = section.get('content', [])
-                
-                if heading:
-                    structure_info.append(f"  {i+1}. {heading.get('level', 'h2').upper()}: {heading.get('text', 'Section Heading')}")
-                
-                if content:
-                    for content_item in content[:2]:  # Limit content per section
-                        if len(content_item) > 50:
-                            structure_info.append(f"     Content: {content_item[:100]}...")
-        
-        # Text content
-        text_content = structured_content.get('text_content', [])
-        if text_content:
-            structure_info.append("ADDITIONAL TEXT CONTENT:")
-            for text in text_content[:3]:  # Limit additional text
-                structure_info.append(f"  - {text[:80]}...")
-        
-        # Buttons
-        buttons = structured_content.get('buttons', [])
-        if buttons:
-            structure_info.append("BUTTONS/ACTIONS:")
-            for button in buttons[:5]:  # Limit buttons
-                structure_info.append(f"  - {button.get('text', 'Button')}")
-        
-        return '\n'.join(structure_info)
-    
-    def _format_navigation_system(self, navigation_analysis: Dict) -> str:
-        """Format navigation system for AI prompt"""
-        
-        nav_info = []
+    def _build_part_prompt(self, part: Dict, url: str, design_system: str, content: str) -> str:
+        """Prompt for one part of a page generated in sections"""
+        
+        prefix = f"part-{part['name']}"
+        if part["kind"] == "header":
+            task = "the site header: logo/brand and the primary navigation, laid out with Flexbox"
+            wrapper = "It is placed inside the page's <header>; return its inner markup, starting with a <nav> if there is navigation"
+        elif part["kind"] == "footer":
+            task = "the site footer: secondary links and site information"
+            wrapper = "It is placed inside the page's <footer>; return its inner markup only"
+        else:
+            task = "these content sections of the main page body, in the order given"
+            wrapper = "It is placed inside the page's <main>; return one <section> element per content section"
         
-        # Primary navigation
-        primary_nav = navigation_analysis.get('primary_nav', [])
-        if primary_nav:
-            nav_info.append("PRIMARY NAVIGATION:")
-            for nav_item in primary_nav[:8]:  # Limit nav items
-                text = nav_item.get('text', 'Link')
-                is_current = nav_item.get('is_current', False)
-                current_indicator = " (CURRENT)" if is_current else ""
-                nav_info.append(f"  - {text}{current_indicator}")
-        
-        # Navigation style
-        nav_style = navigation_analysis.get('nav_style', 'horizontal')
-        nav_info.append(f"Navigation Style: {nav_style}")
-        
-        # Breadcrumbs
-        breadcrumbs = navigation_analysis.get('breadcrumbs', [])
-        if breadcrumbs:
-            nav_info.append(f"Breadcrumbs: {' > '.join(breadcrumbs)}")
-        
-        # Footer navigation
-        footer_nav = navigation_analysis.get('footer_nav', [])
-        if footer_nav:
-            nav_info.append("FOOTER NAVIGATION:")
-            for footer_item in footer_nav[:6]:  # Limit footer nav
-                nav_info.append(f"  - {footer_item.get('text', 'Footer Link')}")
-        
-        return '\n'.join(nav_info) if nav_info else "Standard navigation structure"
+        return f"""Create one part of a website that recreates {url}: {task}.
+Other parts of the page are generated separately and combined with this one.
+
+CRITICAL REQUIREMENTS:
+- Return ONLY a <style> block followed by the part's HTML (no explanations, no markdown blocks)
+- Do NOT include <!DOCTYPE>, <html>, <head> or <body>
+- {wrapper}
+- Start every class name you define with "{prefix}-" so styles of other parts can't clash
+- Don't style html, body, :root or bare element selectors; page-wide styles already come from the design system
+- Use CSS Grid/Flexbox and keep the design consistent with the design system below
+
+PART CONTENT:
+{content or "Use the page title as the brand name"}
+
+DESIGN SYSTEM:
+{design_system}
+
+Generate the {part["kind"]} part now:"""
     
     def _format_design_system(self, design_system: Dict) -> str:
         """Format design system for AI prompt"""
@@ -304,44 +636,21 @@ Generate a complete, well-structured HTML page that flows naturally and looks pr
     def _is_well_structured_html(self, html: str, structured_content: Dict) -> bool:
         """Check if HTML has proper structure and content"""
         
-        if len(html) < 2000:  # Minimum length for substantial content
-            return False
-        
-        quality_checks = [
-            '<!DOCTYPE html>' in html,
-            '<html>' in html and '</html>' in html,
-            '<head>' in html and '</head>' in html,
-            '<body>' in html and '</body>' in html,
-            '<header>' in html or '<nav>' in html,  # Has navigation
-            '<main>' in html or '<section>' in html,  # Has main content
-            '<style>' in html,  # Has styling
-            'display:' in html or 'flex' in html or 'grid' in html,  # Uses modern layout
-            html.count('<') > 40,  # Multiple elements
-        ]
-        
-        # Check if it contains actual content
-        main_heading = structured_content.get('main_heading', '')
-        if main_heading:
-            content_match = main_heading.lower()[:30] in html.lower()
-            quality_checks.append(content_match)
-        
-        buttons = structured_content.get('buttons', [])
-        if buttons:
-            button_texts = [b.get('text', '')[:20] for b in buttons[:2]]
-            button_match = any(text.lower() in html.lower() for text in button_texts if text)
-            quality_checks.append(button_match)
-        
-        return sum(quality_checks) >= 8
+        # Same checks the streaming path runs chunk by chunk
+        check = IncrementalStructureCheck(structured_content)
+        check.feed(html)
+        return check.passed()
     
     def _create_layout_aware_fallback(self, scraped_data: Dict, url: str) -> str:
         """Create a well-structured fallback with proper layout"""
         
+        self.fallbacks_built += 1
         # Extract all data
-        layout_structure = scraped_data.get("layout_structure", {})
-        content_sections = scraped_data.get("content_sections", {})
-        design_system = scraped_data.get("design_system", {})
-        structured_content = scraped_data.get("structured_content", {})
-        navigation_analysis = scraped_data.get("navigation_analysis", {})
+        layout_structure = scraped_data.get("layout_structure") or {}
+        content_sections = scraped_data.get("content_sections") or {}
+        design_system = scraped_data.get("design_system") or {}
+        structured_content = scraped_data.get("structured_content") or {}
+        navigation_analysis = scraped_data.get("navigation_analysis") or {}
         
         # Basic info
         page_title = structured_content.get("page_title", "Website")
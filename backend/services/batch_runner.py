@@ -0,0 +1,136 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+from services.browser_pool import BrowserPool, browser_pool
+from services.job_scheduler import JobScheduler, QueueFullError, job_scheduler
+
+load_dotenv()
+
+# Runs one job: (job_id, url, shared browser context or None)
+BatchJobRunner = Callable[[str, str, Optional[object]], Awaitable]
+
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def group_by_origin(jobs: List[Tuple[str, str]]) -> "OrderedDict[str, List[Tuple[str, str]]]":
+    """Group (job_id, url) pairs by origin, keeping submission order within and across groups"""
+    groups: "OrderedDict[str, List[Tuple[str, str]]]" = OrderedDict()
+    for job_id, url in jobs:
+        groups.setdefault(origin_of(url), []).append((job_id, url))
+    return groups
+
+
+@asynccontextmanager
+async def shared_browser_context(pool: BrowserPool):
+    """One pooled context for several jobs, or None when they have to lease their own"""
+    if not pool.started:
+        # Without the pool every job launches its own browser, as single clones do
+        yield None
+        return
+    lease = pool.context()
+    try:
+        context = await lease.__aenter__()
+    except Exception as e:
+        print(f"⚠️ No shared browser context, jobs will lease their own: {e}")
+        yield None
+        return
+    try:
+        yield context
+    finally:
+        await lease.__aexit__(None, None, None)
+
+
+class RateLimiter:
+    """Spaces job starts at least 1/rate_per_second apart"""
+
+    def __init__(self, rate_per_second: Optional[float] = None):
+        self.interval = 1 / rate_per_second if rate_per_second else 0.0
+        self._next_start = 0.0
+
+    async def wait(self, interval: Optional[float] = None) -> None:
+        """Wait for a start slot; interval overrides the limiter's own spacing after this start"""
+        interval = self.interval if interval is None else interval
+        # Reserve a start time before sleeping so concurrent callers queue up behind each other
+        now = time.monotonic()
+        start_at = max(now, self._next_start)
+        self._next_start = start_at + interval
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+    def idle(self) -> bool:
+        """True once nobody is waiting and the last start's spacing has passed"""
+        return time.monotonic() >= self._next_start
+
+
+class BatchRunner:
+    """Schedules a batch's jobs per origin so each origin's pages share one browser context"""
+
+    def __init__(self, scheduler: Optional[JobScheduler] = None, pool: Optional[BrowserPool] = None,
+                 default_concurrency: Optional[int] = None, default_rate: Optional[float] = None):
+        self.scheduler = scheduler or job_scheduler
+        self.pool = pool or browser_pool
+        self.default_concurrency = default_concurrency or int(os.getenv("BATCH_CONCURRENCY", "2"))
+        self.default_rate = default_rate or float(os.getenv("BATCH_RATE_PER_SECOND", "0")) or None
+        # batch_id -> jobs this process still has to run
+        self._pending: Dict[str, Set[str]] = {}
+
+    def active_job_ids(self) -> List[str]:
+        return [job_id for job_ids in self._pending.values() for job_id in job_ids]
+
+    def active_batches(self) -> int:
+        return len(self._pending)
+
+    def submit(self, batch_id: str, jobs: List[Tuple[str, str]], run_job: BatchJobRunner,
+               concurrency: Optional[int] = None, rate_per_second: Optional[float] = None) -> int:
+        """Queue one scheduler job per origin and return how many were queued; all or nothing"""
+        groups = group_by_origin(jobs)
+        if len(groups) > self.scheduler.free_slots:
+            self.scheduler.rejected_jobs += 1
+            raise QueueFullError(self.scheduler.retry_after())
+
+        # Limits apply to the batch as a whole, across all of its origins
+        slots = asyncio.Semaphore(concurrency or self.default_concurrency)
+        limiter = RateLimiter(rate_per_second or self.default_rate)
+        self._pending[batch_id] = {job_id for job_id, _ in jobs}
+
+        for origin, group in groups.items():
+            self.scheduler.submit(
+                f"batch:{batch_id}:{origin}",
+                lambda group=group: self._run_group(batch_id, group, run_job, slots, limiter)
+            )
+        return len(groups)
+
+    async def _run_group(self, batch_id: str, group: List[Tuple[str, str]], run_job: BatchJobRunner,
+                         slots: asyncio.Semaphore, limiter: RateLimiter) -> None:
+        pending = self._pending.get(batch_id, set())
+
+        async def run_one(job_id: str, url: str, context) -> None:
+            try:
+                async with slots:
+                    await limiter.wait()
+                    await run_job(job_id, url, context)
+            finally:
+                pending.discard(job_id)
+
+        try:
+            async with shared_browser_context(self.pool) as context:
+                await asyncio.gather(*(run_one(job_id, url, context) for job_id, url in group))
+        finally:
+            for job_id, _ in group:
+                pending.discard(job_id)
+            if not pending:
+                self._pending.pop(batch_id, None)
+
+
+# Shared batch runner, feeding the app-wide job scheduler
+batch_runner = BatchRunner()
@@ -0,0 +1,238 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+from playwright.async_api import async_playwright, Browser, BrowserContext
+
+load_dotenv()
+
+CHROMIUM_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-accelerated-2d-canvas',
+    '--no-first-run',
+    '--no-zygote',
+    '--disable-gpu'
+]
+
+DEFAULT_CONTEXT_OPTIONS = {
+    "viewport": {'width': 1280, 'height': 720},
+    "user_agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class PooledBrowser:
+    """A single Chromium process owned by the pool"""
+
+    def __init__(self, slot: int):
+        self.slot = slot
+        self.browser: Optional[Browser] = None
+        self.active_contexts = 0
+        self.pages_served = 0
+        self.launched_at = 0.0
+        self.crashed = False
+
+    @property
+    def healthy(self) -> bool:
+        return self.browser is not None and not self.crashed and self.browser.is_connected()
+
+    def _on_page(self, _page) -> None:
+        self.pages_served += 1
+
+
+class BrowserPool:
+    """Long-lived Chromium pool that hands out one isolated context per job"""
+
+    def __init__(self, size: Optional[int] = None, contexts_per_browser: Optional[int] = None,
+                 max_pages_per_browser: Optional[int] = None, health_check_interval: Optional[float] = None):
+        self.size = size or int(os.getenv("BROWSER_POOL_SIZE", "2"))
+        self.contexts_per_browser = contexts_per_browser or int(os.getenv("BROWSER_CONTEXTS_PER_BROWSER", "4"))
+        self.max_pages_per_browser = max_pages_per_browser or int(os.getenv("BROWSER_MAX_PAGES", "50"))
+        self.health_check_interval = health_check_interval or float(os.getenv("BROWSER_HEALTH_CHECK_INTERVAL", "30"))
+
+        self.started = False
+        self.recycle_count = 0
+        self._playwright = None
+        self._browsers: List[PooledBrowser] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Launch the pool's browsers; called from the app lifespan"""
+        if self.started:
+            return
+
+        self._playwright = await async_playwright().start()
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.size * self.contexts_per_browser)
+        self._browsers = [PooledBrowser(slot) for slot in range(self.size)]
+
+        try:
+            for pooled in self._browsers:
+                await self._launch(pooled)
+        except Exception:
+            await self.stop()
+            raise
+
+        self._health_task = asyncio.create_task(self._health_loop())
+        self.started = True
+        print(f"🧭 Browser pool started with {self.size} browser(s)")
+
+    async def stop(self) -> None:
+        """Close every browser and the Playwright driver"""
+        self.started = False
+
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+        for pooled in self._browsers:
+            await self._close(pooled)
+        self._browsers = []
+
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    @asynccontextmanager
+    async def context(self, **context_options):
+        """Lease an isolated browser context for the duration of one job"""
+        if not self.started:
+            raise RuntimeError("Browser pool is not started")
+
+        async with self._slots:
+            pooled = await self._checkout()
+            context: Optional[BrowserContext] = None
+            try:
+                context = await pooled.browser.new_context(**{**DEFAULT_CONTEXT_OPTIONS, **context_options})
+                context.on("page", pooled._on_page)
+                yield context
+            finally:
+                if context:
+                    try:
+                        await context.close()
+                    except Exception:
+                        pass
+                await self._checkin(pooled)
+
+    def stats(self) -> Dict:
+        """Pool utilization snapshot for health and metrics endpoints"""
+        capacity = self.size * self.contexts_per_browser
+        active = sum(pooled.active_contexts for pooled in self._browsers)
+        return {
+            "started": self.started,
+            "size": self.size,
+            "capacity": capacity,
+            "active_contexts": active,
+            "utilization": round(active / capacity, 3) if capacity else 0.0,
+            "recycle_count": self.recycle_count,
+            "browsers": [
+                {
+                    "slot": pooled.slot,
+                    "healthy": pooled.healthy,
+                    "active_contexts": pooled.active_contexts,
+                    "pages_served": pooled.pages_served
+                }
+                for pooled in self._browsers
+            ]
+        }
+
+    async def _checkout(self) -> PooledBrowser:
+        async with self._lock:
+            for pooled in self._browsers:
+                if pooled.active_contexts == 0 and (not pooled.healthy or self._exhausted(pooled)):
+                    await self._recycle(pooled, "crashed" if not pooled.healthy else "page limit")
+
+            candidates = [p for p in self._browsers if p.healthy and not self._exhausted(p)]
+            if not candidates:
+                # Every browser is draining towards its page limit; keep serving
+                # from the least loaded one until it can be recycled.
+                candidates = [p for p in self._browsers if p.healthy]
+            if not candidates:
+                raise RuntimeError("No healthy browsers available in pool")
+
+            pooled = min(candidates, key=lambda p: p.active_contexts)
+            pooled.active_contexts += 1
+            return pooled
+
+    async def _checkin(self, pooled: PooledBrowser) -> None:
+        async with self._lock:
+            pooled.active_contexts -= 1
+            if pooled.active_contexts == 0 and self.started:
+                if not pooled.healthy:
+                    await self._recycle(pooled, "crashed")
+                elif self._exhausted(pooled):
+                    await self._recycle(pooled, "page limit")
+
+    def _exhausted(self, pooled: PooledBrowser) -> bool:
+        return pooled.pages_served >= self.max_pages_per_browser
+
+    async def _launch(self, pooled: PooledBrowser) -> None:
+        browser = await self._playwright.chromium.launch(headless=True, args=CHROMIUM_ARGS)
+        browser.on("disconnected", lambda _: self._on_disconnected(pooled, browser))
+        pooled.browser = browser
+        pooled.pages_served = 0
+        pooled.crashed = False
+        pooled.launched_at = time.monotonic()
+
+    def _on_disconnected(self, pooled: PooledBrowser, browser: Browser) -> None:
+        if pooled.browser is browser:
+            pooled.crashed = True
+
+    async def _close(self, pooled: PooledBrowser) -> None:
+        browser, pooled.browser = pooled.browser, None
+        if browser:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+
+    async def _recycle(self, pooled: PooledBrowser, reason: str) -> None:
+        print(f"♻️ Recycling browser {pooled.slot} ({reason})")
+        await self._close(pooled)
+        try:
+            await self._launch(pooled)
+            self.recycle_count += 1
+        except Exception as e:
+            pooled.crashed = True
+            print(f"❌ Browser {pooled.slot} relaunch failed: {e}")
+
+    async def _probe(self, pooled: PooledBrowser) -> bool:
+        """Round-trip a CDP command to make sure the browser still responds"""
+        try:
+            session = await asyncio.wait_for(pooled.browser.new_browser_cdp_session(), timeout=5)
+            try:
+                await asyncio.wait_for(session.send("Browser.getVersion"), timeout=5)
+            finally:
+                await session.detach()
+            return True
+        except Exception:
+            return False
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                async with self._lock:
+                    for pooled in self._browsers:
+                        if pooled.active_contexts > 0:
+                            continue
+                        if not pooled.healthy or not await self._probe(pooled):
+                            await self._recycle(pooled, "failed health check")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Browser pool health check error: {e}")
+
+
+# Shared pool, started with the FastAPI app lifespan
+browser_pool = BrowserPool()
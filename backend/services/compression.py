@@ -0,0 +1,43 @@
+import gzip
+from typing import Dict, Iterable, Optional
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Preferred first when the client accepts several
+ENCODINGS = ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """Every encoding we can serve, compressed once up front"""
+    variants = {"gzip": gzip.compress(body, compresslevel=6, mtime=0)}
+    if BROTLI_AVAILABLE:
+        variants["br"] = brotli.compress(body, quality=9)
+    return variants
+
+
+def choose_encoding(accept_encoding: Optional[str], available: Iterable[str] = ENCODINGS) -> Optional[str]:
+    """Encoding the client weights highest among those we support, or None for identity"""
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value.strip())
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    # The client's weights decide; our preference order breaks ties
+    weights = [(accepted.get(encoding, accepted.get("*", 0.0)), encoding) for encoding in available]
+    best = max(weights, key=lambda weight: weight[0], default=(0.0, None))
+    return best[1] if best[0] > 0 else None
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from services.extraction_bundle import EXTRACTION_VERSION
+from services.lru_cache import SizedLRUCache
+
+load_dotenv()
+
+# Identifies the stylesheets a page uses: linked sheets by URL plus a hash of their
+# rules when readable (cross-origin sheets are not), inline <style> blocks by content.
+STYLESHEET_FINGERPRINT_SCRIPT = """
+    () => {
+        const hash = (text) => {
+            let h = 0x811c9dc5;
+            for (let i = 0; i < text.length; i++) {
+                h ^= text.charCodeAt(i);
+                h = Math.imul(h, 0x01000193);
+            }
+            return (h >>> 0).toString(16);
+        };
+        return Array.from(document.styleSheets).map(sheet => {
+            const owner = sheet.ownerNode;
+            if (!sheet.href) {
+                return ['inline', hash(owner ? owner.textContent || '' : '')];
+            }
+            let rules = '';
+            try {
+                rules = Array.from(sheet.cssRules, rule => rule.cssText).join('\\n');
+            } catch (e) {
+                // Cross-origin sheet; its URL has to stand in for its content
+            }
+            return [sheet.href, rules ? hash(rules) : '', sheet.media ? sheet.media.mediaText : ''];
+        });
+    }
+"""
+
+
+class DesignSystemCache:
+    """Design systems per origin and stylesheet fingerprint, so pages sharing a stylesheet skip extraction"""
+
+    def __init__(self, max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        max_bytes = max_bytes or int(os.getenv("DESIGN_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+        ttl_seconds = ttl_seconds or float(os.getenv("DESIGN_CACHE_TTL_SECONDS", "3600"))
+        self.memory = SizedLRUCache(max_bytes, ttl_seconds=ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(origin: str, stylesheets: List) -> Optional[str]:
+        # Pages styled only inline have nothing to share
+        if not stylesheets:
+            return None
+        fingerprint = json.dumps(
+            {"origin": origin.lower(), "extraction": EXTRACTION_VERSION, "stylesheets": stylesheets},
+            sort_keys=True
+        )
+        return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+    def get(self, key: Optional[str]) -> Optional[Dict]:
+        if key is None:
+            return None
+        value = self.memory.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def put(self, key: Optional[str], design_system: Dict) -> None:
+        if key is None or not design_system:
+            return
+        self.memory.set(key, json.dumps(design_system).encode())
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.current_bytes
+        }
+
+
+# Shared design-system cache
+design_system_cache = DesignSystemCache()
@@ -0,0 +1,410 @@
+# Bump whenever the shape or semantics of the extracted data changes
+EXTRACTION_VERSION = "1"
+
+# One page.evaluate program that produces the layout, content section, design
+# system, structured content and navigation results in a single round trip.
+# Shared selectors are queried once and computed styles are memoized per element.
+EXTRACTION_BUNDLE_SCRIPT = """
+    (opts = {}) => {
+        const styleCache = new Map();
+        const styleOf = (element) => {
+            let styles = styleCache.get(element);
+            if (!styles) {
+                styles = window.getComputedStyle(element);
+                styleCache.set(element, styles);
+            }
+            return styles;
+        };
+
+        const rectCache = new Map();
+        const rectOf = (element) => {
+            let rect = rectCache.get(element);
+            if (!rect) {
+                rect = element.getBoundingClientRect();
+                rectCache.set(element, rect);
+            }
+            return rect;
+        };
+
+        const queryCache = new Map();
+        const queryOne = (selector) => {
+            if (!queryCache.has(selector)) {
+                queryCache.set(selector, document.querySelector(selector));
+            }
+            return queryCache.get(selector);
+        };
+
+        const queryAllCache = new Map();
+        const queryAll = (selector) => {
+            if (!queryAllCache.has(selector)) {
+                queryAllCache.set(selector, Array.from(document.querySelectorAll(selector)));
+            }
+            return queryAllCache.get(selector);
+        };
+
+        const body = document.body;
+        const mainElement = queryOne('main, .main, #main, [role="main"]');
+        const main = mainElement || body;
+        const header = queryOne('header, .header, #header, [role="banner"]');
+        const nav = queryOne('nav, .nav, .navigation, [role="navigation"]');
+        const footer = queryOne('footer, .footer, #footer, [role="contentinfo"]');
+        const sidebar = queryOne('aside, .sidebar, [role="complementary"]');
+
+        const allHeadings = queryAll('h1, h2, h3, h4, h5, h6');
+        const firstHeading = {};
+        allHeadings.forEach(heading => {
+            const tag = heading.tagName.toLowerCase();
+            if (!firstHeading[tag]) firstHeading[tag] = heading;
+        });
+
+        const designButtonSelector = 'button, .btn, .button, input[type="button"], a[class*="btn"]';
+        const allButtons = queryAll('button, .btn, .button, input[type="button"], input[type="submit"], a[class*="btn"]');
+
+        const boundsOf = (element) => {
+            const rect = rectOf(element);
+            return { x: rect.x, y: rect.y, width: rect.width, height: rect.height };
+        };
+
+        // ---- Layout structure ----
+        const layout = {
+            page_type: 'unknown',
+            main_sections: [],
+            layout_flow: 'vertical',
+            container_info: {},
+            viewport: {
+                width: window.innerWidth,
+                height: window.innerHeight
+            }
+        };
+
+        if (header && nav && main && footer) {
+            layout.page_type = 'full_layout';
+        } else if (main) {
+            layout.page_type = 'content_focused';
+        } else {
+            layout.page_type = 'simple';
+        }
+
+        const mainRect = rectOf(main);
+        const mainStyles = styleOf(main);
+        layout.container_info = {
+            width: mainRect.width,
+            maxWidth: mainStyles.maxWidth,
+            margin: mainStyles.margin,
+            padding: mainStyles.padding,
+            display: mainStyles.display,
+            flexDirection: mainStyles.flexDirection,
+            gridTemplateColumns: mainStyles.gridTemplateColumns
+        };
+
+        if (mainStyles.display === 'flex' && mainStyles.flexDirection === 'row') {
+            layout.layout_flow = 'horizontal';
+        } else if (mainStyles.display === 'grid' && mainStyles.gridTemplateColumns !== 'none') {
+            layout.layout_flow = 'grid';
+        } else {
+            layout.layout_flow = 'vertical';
+        }
+
+        const layoutSections = [];
+        if (header) {
+            layoutSections.push({
+                type: 'header',
+                bounds: boundsOf(header),
+                styles: {
+                    background: styleOf(header).backgroundColor,
+                    position: styleOf(header).position
+                }
+            });
+        }
+        if (nav && nav !== header) {
+            layoutSections.push({ type: 'navigation', bounds: boundsOf(nav) });
+        }
+        main.querySelectorAll('section, article, .section, .content-section').forEach((section, index) => {
+            if (rectOf(section).height > 50) {
+                layoutSections.push({ type: 'content', index: index, bounds: boundsOf(section) });
+            }
+        });
+        if (sidebar) {
+            layoutSections.push({ type: 'sidebar', bounds: boundsOf(sidebar) });
+        }
+        if (footer) {
+            layoutSections.push({ type: 'footer', bounds: boundsOf(footer) });
+        }
+        layout.main_sections = layoutSections;
+
+        // ---- Content sections ----
+        const sections = {
+            header_content: {},
+            navigation_content: {},
+            main_content: {},
+            sidebar_content: {},
+            footer_content: {}
+        };
+
+        if (header) {
+            const headerTitle = header.querySelector('h1, .logo, .brand');
+            const headerNav = header.querySelector('nav, .nav');
+            sections.header_content = {
+                title: headerTitle ? headerTitle.textContent.trim() : '',
+                has_navigation: !!headerNav,
+                background_color: styleOf(header).backgroundColor
+            };
+        }
+
+        if (nav) {
+            const navLinks = Array.from(nav.querySelectorAll('a')).map(link => ({
+                text: link.textContent.trim(),
+                href: link.href,
+                is_active: link.classList.contains('active') || link.getAttribute('aria-current') === 'page'
+            })).filter(link => link.text);
+            sections.navigation_content = {
+                links: navLinks,
+                layout: styleOf(nav).display,
+                position: styleOf(nav).position
+            };
+        }
+
+        const mainSections = [];
+        let currentSection = null;
+        main.querySelectorAll('h1, h2, h3, section, article, .section, .content-block, .hero').forEach(element => {
+            const rect = rectOf(element);
+            if (rect.height < 20) return;
+
+            if (element.matches('h1, h2, h3')) {
+                if (currentSection) {
+                    mainSections.push(currentSection);
+                }
+                const styles = styleOf(element);
+                currentSection = {
+                    type: 'text_section',
+                    heading: {
+                        level: element.tagName.toLowerCase(),
+                        text: element.textContent.trim(),
+                        styles: {
+                            fontSize: styles.fontSize,
+                            color: styles.color,
+                            fontWeight: styles.fontWeight
+                        }
+                    },
+                    content: [],
+                    bounds: { y: rect.y, height: rect.height }
+                };
+            } else if (element.matches('section, article, .section')) {
+                const sectionHeading = element.querySelector('h1, h2, h3, h4');
+                const sectionContent = Array.from(element.querySelectorAll('p, div')).map(p => p.textContent.trim()).filter(text => text && text.length > 20);
+                mainSections.push({
+                    type: 'content_section',
+                    heading: sectionHeading ? {
+                        level: sectionHeading.tagName.toLowerCase(),
+                        text: sectionHeading.textContent.trim()
+                    } : null,
+                    content: sectionContent.slice(0, 3),
+                    bounds: { y: rect.y, height: rect.height }
+                });
+            }
+        });
+        if (currentSection) {
+            mainSections.push(currentSection);
+        }
+        mainSections.sort((a, b) => a.bounds.y - b.bounds.y);
+        sections.main_content = {
+            sections: mainSections,
+            total_sections: mainSections.length
+        };
+
+        // ---- Design system ----
+        const design = {
+            colors: {},
+            typography: {},
+            spacing: {},
+            components: {}
+        };
+        // Skipped when the caller already has the site's design system
+        if (!opts.skip_design_system) {
+            const bodyStyles = styleOf(body);
+            design.colors.primary = {
+                background: bodyStyles.backgroundColor,
+                text: bodyStyles.color,
+                font_family: bodyStyles.fontFamily
+            };
+
+            const headingStyles = {};
+            ['h1', 'h2', 'h3', 'h4'].forEach(tag => {
+                const element = firstHeading[tag];
+                if (element) {
+                    const styles = styleOf(element);
+                    headingStyles[tag] = {
+                        fontSize: styles.fontSize,
+                        fontWeight: styles.fontWeight,
+                        color: styles.color,
+                        marginTop: styles.marginTop,
+                        marginBottom: styles.marginBottom,
+                        lineHeight: styles.lineHeight
+                    };
+                }
+            });
+            design.typography.headings = headingStyles;
+
+            const designButton = allButtons.find(button => button.matches(designButtonSelector));
+            if (designButton) {
+                const buttonStyles = styleOf(designButton);
+                design.components.button = {
+                    backgroundColor: buttonStyles.backgroundColor,
+                    color: buttonStyles.color,
+                    border: buttonStyles.border,
+                    borderRadius: buttonStyles.borderRadius,
+                    padding: buttonStyles.padding,
+                    fontSize: buttonStyles.fontSize,
+                    fontWeight: buttonStyles.fontWeight
+                };
+            }
+
+            const firstLink = queryOne('a:not([class*="btn"])');
+            if (firstLink) {
+                const linkStyles = styleOf(firstLink);
+                design.components.link = {
+                    color: linkStyles.color,
+                    textDecoration: linkStyles.textDecoration,
+                    fontWeight: linkStyles.fontWeight
+                };
+            }
+
+            const marginCounts = {};
+            const paddingCounts = {};
+            queryAll('section, article, .section, h1, h2, h3, p').forEach(element => {
+                const styles = styleOf(element);
+                [parseInt(styles.marginTop) || 0, parseInt(styles.marginBottom) || 0].forEach(margin => {
+                    if (margin > 0) marginCounts[margin] = (marginCounts[margin] || 0) + 1;
+                });
+                [parseInt(styles.paddingTop) || 0, parseInt(styles.paddingBottom) || 0].forEach(padding => {
+                    if (padding > 0) paddingCounts[padding] = (paddingCounts[padding] || 0) + 1;
+                });
+            });
+            design.spacing = {
+                common_margins: Object.keys(marginCounts).sort((a, b) => marginCounts[b] - marginCounts[a]).slice(0, 3),
+                common_paddings: Object.keys(paddingCounts).sort((a, b) => paddingCounts[b] - paddingCounts[a]).slice(0, 3)
+            };
+        }
+
+        // ---- Structured content ----
+        const content = {
+            page_title: document.title,
+            meta_description: '',
+            main_heading: '',
+            headings_hierarchy: [],
+            text_content: [],
+            buttons: [],
+            images: [],
+            lists: []
+        };
+
+        const metaDesc = queryOne('meta[name="description"]');
+        if (metaDesc) {
+            content.meta_description = metaDesc.getAttribute('content');
+        }
+
+        if (firstHeading.h1) {
+            content.main_heading = firstHeading.h1.textContent.trim();
+        }
+
+        allHeadings.forEach((heading, index) => {
+            const text = heading.textContent.trim();
+            if (text) {
+                content.headings_hierarchy.push({
+                    level: parseInt(heading.tagName.substring(1)),
+                    text: text,
+                    order: index
+                });
+            }
+        });
+
+        queryAll('p, div[class*="text"], div[class*="content"]').forEach(element => {
+            const text = element.textContent.trim();
+            if (text && text.length > 30 && text.length < 500) {
+                const hasBlockChildren = element.querySelector('div, p, h1, h2, h3, h4, h5, h6');
+                if (!hasBlockChildren) {
+                    content.text_content.push(text);
+                }
+            }
+        });
+
+        allButtons.forEach(button => {
+            const text = button.textContent.trim() || button.value || button.getAttribute('aria-label');
+            if (text) {
+                content.buttons.push({
+                    text: text,
+                    type: button.tagName.toLowerCase(),
+                    href: button.href || '',
+                    classes: button.className || ''
+                });
+            }
+        });
+
+        queryAll('img').forEach(img => {
+            if (img.src && img.alt) {
+                content.images.push({
+                    alt: img.alt,
+                    src: img.src,
+                    width: img.naturalWidth || img.width,
+                    height: img.naturalHeight || img.height
+                });
+            }
+        });
+
+        queryAll('ul, ol').forEach(list => {
+            const items = Array.from(list.querySelectorAll('li')).map(li => li.textContent.trim()).filter(text => text);
+            if (items.length > 0) {
+                content.lists.push({
+                    type: list.tagName.toLowerCase(),
+                    items: items
+                });
+            }
+        });
+
+        // ---- Navigation ----
+        const navigation = {
+            primary_nav: [],
+            secondary_nav: [],
+            breadcrumbs: [],
+            footer_nav: [],
+            nav_style: 'horizontal'
+        };
+
+        const primaryNav = queryOne('nav, .nav, .navigation, header nav');
+        if (primaryNav) {
+            navigation.primary_nav = Array.from(primaryNav.querySelectorAll('a')).map(link => ({
+                text: link.textContent.trim(),
+                href: link.href,
+                is_current: link.getAttribute('aria-current') === 'page' || link.classList.contains('active')
+            })).filter(link => link.text && link.text.length < 50);
+
+            const navStyles = styleOf(primaryNav);
+            if (navStyles.flexDirection === 'column' || navStyles.display === 'block') {
+                navigation.nav_style = 'vertical';
+            } else {
+                navigation.nav_style = 'horizontal';
+            }
+        }
+
+        const breadcrumbs = queryOne('.breadcrumbs, .breadcrumb, nav[aria-label*="breadcrumb"]');
+        if (breadcrumbs) {
+            navigation.breadcrumbs = Array.from(breadcrumbs.querySelectorAll('a, span')).map(crumb => crumb.textContent.trim());
+        }
+
+        const footerElement = queryOne('footer');
+        if (footerElement) {
+            navigation.footer_nav = Array.from(footerElement.querySelectorAll('a')).map(link => ({
+                text: link.textContent.trim(),
+                href: link.href
+            })).filter(link => link.text && link.text.length < 50).slice(0, 10);
+        }
+
+        return {
+            layout_structure: layout,
+            content_sections: sections,
+            design_system: opts.skip_design_system ? null : design,
+            structured_content: content,
+            navigation_analysis: navigation
+        };
+    }
+"""
@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from services.lru_cache import SizedLRUCache
+
+load_dotenv()
+
+
+class SQLiteGenerationStore:
+    """Persistent prompt -> response store, evicted by least recent use past a byte budget or by age
+
+    Every call commits, so callers run them off the event loop.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: float):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS generations (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_generations_last_used ON generations (last_used)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at FROM generations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM generations WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE generations SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key: str, response: str) -> None:
+        now = time.time()
+        size = len(response.encode())
+        with self._lock:
+            # Storing a response again keeps its original age, so a popular entry still expires
+            self._conn.execute(
+                """INSERT INTO generations (key, response, size, created_at, last_used) VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT(key) DO UPDATE SET response = excluded.response, size = excluded.size,
+                                                  last_used = excluded.last_used""",
+                (key, response, size, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM generations WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM generations").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM generations ORDER BY last_used ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM generations WHERE key = ?", (key,))
+            total -= size
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM generations").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class GenerationCache:
+    """Caches model responses by prompt fingerprint so identical prompts skip the model"""
+
+    def __init__(self, max_bytes: Optional[int] = None, db_path: Optional[str] = None,
+                 db_max_bytes: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        max_bytes = max_bytes or int(os.getenv("GENERATION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+        db_path = db_path if db_path is not None else os.getenv("GENERATION_CACHE_DB", ".cache/generations.sqlite3")
+        db_max_bytes = db_max_bytes or int(os.getenv("GENERATION_CACHE_DB_MAX_BYTES", str(512 * 1024 * 1024)))
+        # Responses are deterministic for a given prompt and config, but the model behind a name changes
+        ttl_seconds = ttl_seconds or float(os.getenv("GENERATION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+        self.memory = SizedLRUCache(max_bytes, ttl_seconds=ttl_seconds)
+        self.store = SQLiteGenerationStore(db_path, db_max_bytes, ttl_seconds) if db_path else None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(prompt: str, generation_config: Dict, model_name: str = "") -> str:
+        fingerprint = json.dumps(
+            {"model": model_name, "config": generation_config, "prompt": prompt},
+            sort_keys=True
+        )
+        return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value.decode()
+
+        if self.store is not None:
+            response = await asyncio.to_thread(self.store.get, key)
+            if response is not None:
+                self.memory.set(key, response.encode())
+                self.hits += 1
+                return response
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, response: str) -> None:
+        self.memory.set(key, response.encode())
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, key, response)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.current_bytes,
+            "persistent_entries": self.store.count() if self.store is not None else 0
+        }
+
+
+# Shared generation cache
+generation_cache = GenerationCache()
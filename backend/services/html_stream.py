@@ -0,0 +1,159 @@
+import re
+from typing import Dict, List
+
+FENCE_PATTERN = re.compile(r'```(?:html)?\n?')
+DOCUMENT_STARTS = ('<!DOCTYPE html>', '<html>')
+DOCUMENT_END = '</html>'
+
+
+class IncrementalHtmlCleaner:
+    """Streaming counterpart of LayoutAwareCloner._extract_clean_html
+
+    Strips markdown code fences, drops any chatter before the document
+    starts and stops emitting once </html> has been seen. A few characters
+    are held back between chunks so markers split across chunks are still
+    recognised.
+
+    One difference: when the document starts but </html> never arrives (a
+    truncated response), _extract_clean_html returns the whole response,
+    chatter included, while the cleaner has already emitted the document
+    from its start and keeps the chatter out.
+    """
+
+    # Longest marker we need to recognise across a chunk boundary
+    HOLDBACK = max(len('```html\n'), len('<!DOCTYPE html>'), len(DOCUMENT_END)) - 1
+
+    def __init__(self):
+        self._pending = ""
+        self._started = False
+        self._finished = False
+        self._preamble: List[str] = []
+
+    def feed(self, text: str) -> str:
+        """Add raw model output and return the cleaned HTML that is now safe to emit"""
+        if self._finished:
+            return ""
+        self._pending += text
+        return self._drain(final=False)
+
+    def flush(self) -> str:
+        """Emit whatever is left once the model has finished"""
+        if self._finished:
+            return ""
+        emitted = self._drain(final=True)
+        if not self._started:
+            # No document marker ever appeared; fall back to the whole cleaned response
+            self._started = True
+            self._finished = True
+            return "".join(self._preamble).strip()
+        return emitted
+
+    def _drain(self, final: bool) -> str:
+        raw, carry = self._pending, ""
+        if not final:
+            # A fence that may still be growing ("`", "```ht") waits for the next chunk
+            fence = raw.find('`', max(0, len(raw) - len('```html\n') + 1))
+            if fence != -1:
+                while fence > 0 and raw[fence - 1] == '`':
+                    fence -= 1
+                raw, carry = raw[:fence], raw[fence:]
+        text = FENCE_PATTERN.sub('', raw)
+        keep = 0 if final else min(len(text), self.HOLDBACK)
+
+        if not self._started:
+            starts = [text.find(marker) for marker in DOCUMENT_STARTS if marker in text]
+            if not starts:
+                self._preamble.append(text[:len(text) - keep])
+                self._pending = text[len(text) - keep:] + carry
+                return ""
+            self._started = True
+            text = text[min(starts):]
+            keep = 0 if final else min(len(text), self.HOLDBACK)
+
+        end = text.find(DOCUMENT_END)
+        if end != -1:
+            self._finished = True
+            self._pending = ""
+            return text[:end + len(DOCUMENT_END)]
+
+        # A closing tag split across chunks is only recognised once more text arrives
+        self._pending = text[len(text) - keep:] + carry
+        return text[:len(text) - keep]
+
+
+class IncrementalStructureCheck:
+    """Streaming counterpart of LayoutAwareCloner._is_well_structured_html
+
+    Keeps only flags, a character count and a short overlap window, so the
+    check costs the same whether it sees the HTML in one piece or in many.
+    """
+
+    MARKERS = (
+        '<!DOCTYPE html>', '<html>', '</html>', '<head>', '</head>', '<body>', '</body>',
+        '<header>', '<nav>', '<main>', '<section>', '<style>', 'display:', 'flex', 'grid'
+    )
+
+    # Opening tags also count with attributes, like <html lang="en"> or <section id="pricing">
+    TAG_PATTERNS = {
+        marker: re.compile(re.escape(marker[:-1]) + r'[\s>]')
+        for marker in MARKERS if marker.startswith('<') and marker[1] not in '/!'
+    }
+
+    def __init__(self, structured_content: Dict):
+        self.length = 0
+        self.tag_opens = 0
+        self.found = {marker: False for marker in self.MARKERS}
+
+        main_heading = structured_content.get('main_heading', '')
+        self.heading = main_heading.lower()[:30] if main_heading else None
+        buttons = structured_content.get('buttons', [])
+        self.button_texts = [b.get('text', '')[:20].lower() for b in buttons[:2]] if buttons else None
+        self.heading_found = False
+        self.button_found = False
+
+        needles = [*self.MARKERS, self.heading or "", *(self.button_texts or [])]
+        self._overlap = max(len(needle) for needle in needles)
+        self._tail = ""
+
+    def feed(self, chunk: str) -> None:
+        self.length += len(chunk)
+        self.tag_opens += chunk.count('<')
+
+        window = self._tail + chunk
+        for marker, seen in self.found.items():
+            if seen:
+                continue
+            pattern = self.TAG_PATTERNS.get(marker)
+            if pattern.search(window) if pattern else marker in window:
+                self.found[marker] = True
+
+        lowered = window.lower()
+        if self.heading is not None and not self.heading_found:
+            self.heading_found = self.heading in lowered
+        if self.button_texts is not None and not self.button_found:
+            self.button_found = any(text in lowered for text in self.button_texts if text)
+
+        self._tail = window[-self._overlap:]
+
+    def passed(self) -> bool:
+        if self.length < 2000:  # Minimum length for substantial content
+            return False
+
+        found = self.found
+        quality_checks = [
+            found['<!DOCTYPE html>'],
+            found['<html>'] and found['</html>'],
+            found['<head>'] and found['</head>'],
+            found['<body>'] and found['</body>'],
+            found['<header>'] or found['<nav>'],  # Has navigation
+            found['<main>'] or found['<section>'],  # Has main content
+            found['<style>'],  # Has styling
+            found['display:'] or found['flex'] or found['grid'],  # Uses modern layout
+            self.tag_opens > 40,  # Multiple elements
+        ]
+        if self.heading is not None:
+            quality_checks.append(self.heading_found)
+        if self.button_texts is not None:
+            quality_checks.append(self.button_found)
+
+        return sum(quality_checks) >= 8
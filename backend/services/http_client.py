@@ -0,0 +1,121 @@
+import codecs
+import os
+import re
+from typing import Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+
+# Browsers look for a <meta> charset in the first 1024 bytes when the headers don't name one
+CHARSET_SNIFF_BYTES = 1024
+META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+
+
+def sniff_charset(head: bytes) -> Optional[str]:
+    """Charset declared by a <meta> tag at the start of an HTML document"""
+    match = META_CHARSET.search(head[:CHARSET_SNIFF_BYTES])
+    return match.group(1).decode("ascii") if match else None
+
+
+def make_decoder(encoding: Optional[str]) -> codecs.IncrementalDecoder:
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+class ResponseTooLargeError(Exception):
+    """Raised when a response body exceeds the configured size cap"""
+
+
+class AsyncHttpClient:
+    """Shared keep-alive HTTP client for non-browser fetches"""
+
+    def __init__(self, max_response_bytes: Optional[int] = None, connect_timeout: Optional[float] = None,
+                 read_timeout: Optional[float] = None, max_connections: Optional[int] = None):
+        self.max_response_bytes = max_response_bytes or int(os.getenv("HTTP_MAX_RESPONSE_BYTES", str(5 * 1024 * 1024)))
+        self.connect_timeout = connect_timeout or float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+        self.read_timeout = read_timeout or float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+        self.max_connections = max_connections or int(os.getenv("HTTP_MAX_CONNECTIONS", "50"))
+        self._client: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                follow_redirects=True,
+                headers=DEFAULT_HEADERS,
+                timeout=httpx.Timeout(
+                    connect=self.connect_timeout,
+                    read=self.read_timeout,
+                    write=self.read_timeout,
+                    pool=self.connect_timeout
+                ),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections // 2,
+                    keepalive_expiry=30
+                )
+            )
+
+    async def stop(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch_text(self, url: str, headers: Optional[Dict] = None) -> Dict:
+        """GET a URL and decode the body incrementally, enforcing the size cap"""
+        await self.start()
+
+        async with self._client.stream("GET", url, headers=headers) as response:
+            response.raise_for_status()
+
+            declared_length = response.headers.get("content-length")
+            if declared_length and declared_length.isdigit() and int(declared_length) > self.max_response_bytes:
+                raise ResponseTooLargeError(f"Response is {declared_length} bytes, limit is {self.max_response_bytes}")
+
+            # Without a charset header the start of the body is held back until its <meta> tags are seen
+            decoder = make_decoder(response.charset_encoding) if response.charset_encoding else None
+            head = b""
+            chunks = []
+            received = 0
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                if received > self.max_response_bytes:
+                    raise ResponseTooLargeError(f"Response exceeded {self.max_response_bytes} bytes")
+                if decoder is None:
+                    head += chunk
+                    if len(head) < CHARSET_SNIFF_BYTES:
+                        continue
+                    decoder = make_decoder(sniff_charset(head))
+                    chunk, head = head, b""
+                chunks.append(decoder.decode(chunk))
+            if decoder is None:
+                decoder = make_decoder(sniff_charset(head))
+                chunks.append(decoder.decode(head))
+            chunks.append(decoder.decode(b"", final=True))
+
+            return {
+                "url": str(response.url),
+                "status": response.status_code,
+                "http_version": response.http_version,
+                "bytes": received,
+                "text": "".join(chunks)
+            }
+
+
+# Shared client, opened and closed with the FastAPI app lifespan
+http_client = AsyncHttpClient()
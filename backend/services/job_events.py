@@ -0,0 +1,81 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Set
+
+# Progress stages in the order a clone job moves through them; "upgraded" follows "completed"
+# when a fallback served under the latency SLO is replaced by the AI result
+PROGRESS_STAGES = ["queued", "scraping", "extracting", "generating", "validating", "completed", "upgraded"]
+TERMINAL_STAGES = {"completed", "failed"}
+
+
+def latest_stage(stage_times: Dict) -> str:
+    """Most recent progress stage recorded for a job"""
+    stage_times = {
+        ("queued" if stage == "pending" else stage): at
+        for stage, at in (stage_times or {}).items()
+        if stage in PROGRESS_STAGES or stage in TERMINAL_STAGES or stage == "pending"
+    }
+    if not stage_times:
+        return "queued"
+    return max(stage_times, key=stage_times.get)
+
+
+def format_sse(event: str, data: Dict, event_id: Optional[str] = None) -> str:
+    """Encode one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class JobEventBus:
+    """In-process fan-out of job progress events to streaming subscribers"""
+
+    def __init__(self, max_pending_events: int = 1000):
+        self.max_pending_events = max_pending_events
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        # HTML streamed so far for jobs still generating, replayed to late subscribers
+        self._partial_html: Dict[str, List[str]] = {}
+
+    def publish(self, job_id: str, event: str, data: Optional[Dict] = None) -> None:
+        for queue in self._subscribers.get(job_id, ()):
+            try:
+                queue.put_nowait((event, data or {}))
+            except asyncio.QueueFull:
+                # A stalled client only misses intermediate events; its preview is
+                # replaced by the final result, which is re-read from the job store
+                # if the result event itself is dropped
+                pass
+
+    def append_html(self, job_id: str, chunk: str) -> None:
+        self._partial_html.setdefault(job_id, []).append(chunk)
+        self.publish(job_id, "html", {"html": chunk})
+
+    def partial_html(self, job_id: str) -> str:
+        return "".join(self._partial_html.get(job_id, ()))
+
+    def clear_html(self, job_id: str) -> None:
+        self._partial_html.pop(job_id, None)
+
+    @asynccontextmanager
+    async def subscribe(self, job_id: str):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending_events)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[job_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+
+# Shared event bus
+job_events = JobEventBus()
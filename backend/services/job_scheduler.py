@@ -0,0 +1,141 @@
+import asyncio
+import math
+import os
+import time
+import traceback
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from services.metrics import observe_stage
+
+load_dotenv()
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobScheduler:
+    """Bounded FIFO job queue in front of the clone pipeline
+
+    stage_limits size the pipeline's scrape and generate worker pools; the pipeline enforces them
+    and reports how busy each stage is.
+    """
+
+    def __init__(self, max_queue_size: Optional[int] = None, max_active_jobs: Optional[int] = None,
+                 stage_limits: Optional[Dict[str, int]] = None):
+        self.max_queue_size = max_queue_size or int(os.getenv("CLONE_QUEUE_SIZE", "50"))
+        self.stage_limits = stage_limits or {
+            "scrape": int(os.getenv("SCRAPE_CONCURRENCY", "2")),
+            "generate": int(os.getenv("GENERATE_CONCURRENCY", "2"))
+        }
+        # Enough workers to keep every stage busy at the same time, plus a few jobs waiting
+        # between pipeline stages so scraping can run ahead while the model is saturated
+        self.max_active_jobs = max_active_jobs or int(os.getenv(
+            "CLONE_MAX_ACTIVE_JOBS",
+            str(sum(self.stage_limits.values()) + int(os.getenv("PIPELINE_QUEUE_SIZE", "2")))
+        ))
+
+        self._queue: Optional[asyncio.Queue] = None
+        # job_id -> monotonic time it was queued
+        self._waiting: "OrderedDict[str, float]" = OrderedDict()
+        self._running: Dict[str, float] = {}
+        self._workers: List[asyncio.Task] = []
+        self._avg_job_seconds = 30.0
+        self.completed_jobs = 0
+        self.rejected_jobs = 0
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self) -> None:
+        if self.started:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_active_jobs)]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, job_id: str, runner: Callable[[], Awaitable]) -> int:
+        """Queue a job and return its 1-based queue position"""
+        if not self.started:
+            raise RuntimeError("Job scheduler is not started")
+        try:
+            self._queue.put_nowait((job_id, runner))
+        except asyncio.QueueFull:
+            self.rejected_jobs += 1
+            raise QueueFullError(self.retry_after())
+        self._waiting[job_id] = time.monotonic()
+        return len(self._waiting)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based position in the queue, or None once the job has started"""
+        if job_id not in self._waiting:
+            return None
+        return list(self._waiting).index(job_id) + 1
+
+    def active_job_ids(self) -> List[str]:
+        """Jobs this process is responsible for, queued or running"""
+        return [*self._waiting, *self._running]
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiting)
+
+    @property
+    def free_slots(self) -> int:
+        return max(0, self.max_queue_size - self.queue_depth)
+
+    def retry_after(self) -> int:
+        """Rough number of seconds until a queue slot frees up"""
+        backlog = self.queue_depth + len(self._running)
+        return max(1, math.ceil(backlog * self._avg_job_seconds / self.max_active_jobs))
+
+    def stats(self) -> Dict:
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_size": self.max_queue_size,
+            "running_jobs": len(self._running),
+            "max_active_jobs": self.max_active_jobs,
+            "completed_jobs": self.completed_jobs,
+            "rejected_jobs": self.rejected_jobs,
+            "avg_job_seconds": round(self._avg_job_seconds, 2)
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job_id, runner = await self._queue.get()
+            queued_at = self._waiting.pop(job_id, None)
+            started = time.monotonic()
+            if queued_at is not None:
+                observe_stage("queue_wait", started - queued_at)
+            self._running[job_id] = started
+            try:
+                await runner()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Scheduled job {job_id} crashed: {e}")
+                traceback.print_exc()
+            finally:
+                self._running.pop(job_id, None)
+                self._queue.task_done()
+                self.completed_jobs += 1
+                elapsed = time.monotonic() - started
+                observe_stage("job_total", elapsed)
+                self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+
+
+# Shared scheduler, started with the FastAPI app lifespan
+job_scheduler = JobScheduler()
@@ -0,0 +1,526 @@
+import hashlib
+import json
+import os
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from dotenv import load_dotenv
+
+from services.compression import compress_variants
+
+load_dotenv()
+
+FINISHED_STATUSES = {"completed", "failed"}
+UNFINISHED_STATUSES = {"pending", "processing"}
+
+
+def _status_value(status) -> str:
+    """Accept CloneStatus members or plain strings"""
+    return getattr(status, "value", status)
+
+
+class BlobStore:
+    """Raw bytes for large job payloads, one directory per job"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, job_id: str, name: str) -> Path:
+        return self.directory / job_id / name
+
+    def put(self, job_id: str, name: str, data: bytes) -> int:
+        path = self._path(job_id, name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return len(data)
+
+    def get(self, job_id: str, name: str) -> Optional[bytes]:
+        try:
+            return self._path(job_id, name).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def delete_job(self, job_id: str) -> None:
+        shutil.rmtree(self.directory / job_id, ignore_errors=True)
+
+
+def summarize_scraped_data(scraped_data: Dict) -> Dict:
+    """Small summary kept in memory so debug endpoints never load the full payload"""
+    content = scraped_data.get("content", {}) or {}
+    colors = scraped_data.get("colors", {}) or {}
+    summary = {
+        "scraping_method": scraped_data.get("method", "unknown"),
+        "scraping_success": scraped_data.get("success", False),
+        "data_summary": {
+            "has_content": bool(content),
+            "has_colors": bool(colors),
+            "has_visual": bool(scraped_data.get("visual")),
+            "has_screenshot": bool(scraped_data.get("screenshot"))
+        }
+    }
+    if scraped_data.get("screenshot_info"):
+        summary["screenshot"] = scraped_data["screenshot_info"]
+    if scraped_data.get("design_system_source"):
+        summary["design_system_source"] = scraped_data["design_system_source"]
+    if scraped_data.get("interception"):
+        summary["interception"] = scraped_data["interception"]
+    if content:
+        summary["content_summary"] = {
+            "title": content.get("title", ""),
+            "headings_count": len(content.get("headings", [])),
+            "paragraphs_count": len(content.get("paragraphs", []))
+        }
+    if colors:
+        summary["color_summary"] = {
+            "background_colors": colors.get("backgrounds", [])[:3],
+            "text_colors": colors.get("texts", [])[:3],
+            "accent_colors": colors.get("accents", [])[:3]
+        }
+    return summary
+
+
+class JobStore(ABC):
+    """Job metadata store; scraped payloads, screenshots and HTML always live in the blob store"""
+
+    def __init__(self, blob_dir: Optional[str] = None, max_jobs: Optional[int] = None,
+                 max_age_seconds: Optional[float] = None, lease_seconds: Optional[float] = None):
+        self.blobs = BlobStore(blob_dir or os.getenv("JOB_BLOB_DIR", ".cache/jobs"))
+        self.max_jobs = max_jobs or int(os.getenv("JOB_RETENTION_MAX_JOBS", "1000"))
+        self.max_age_seconds = max_age_seconds or float(os.getenv("JOB_RETENTION_MAX_AGE_SECONDS", "86400"))
+        # A job whose owner has not heartbeated within the lease is considered interrupted
+        self.lease_seconds = lease_seconds or float(os.getenv("JOB_LEASE_SECONDS", "60"))
+        # host:pid:nonce, so a restarted process can tell its earlier life's jobs from a live sibling's
+        self.hostname = socket.gethostname()
+        self.worker_id = f"{self.hostname}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    # ---- Metadata backend ----
+
+    @abstractmethod
+    def _insert(self, job_id: str, job: Dict) -> None: ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]: ...
+
+    @abstractmethod
+    def _write(self, job_id: str, fields: Dict, stage: Optional[str], stage_time: float) -> None: ...
+
+    @abstractmethod
+    def _delete_record(self, job_id: str) -> None: ...
+
+    @abstractmethod
+    def list_jobs(self) -> List[Dict]: ...
+
+    @abstractmethod
+    def count(self, status: Optional[str] = None) -> int: ...
+
+    @abstractmethod
+    def list_batch(self, batch_id: str) -> List[Dict]:
+        """Jobs submitted together in one batch, oldest first"""
+
+    @abstractmethod
+    def _evictable_job_ids(self, finished_before: float, overflow: int) -> List[str]: ...
+
+    @abstractmethod
+    def heartbeat(self, job_ids: Iterable[str]) -> None:
+        """Renew this worker's lease on the given jobs"""
+
+    @abstractmethod
+    def claim_interrupted_jobs(self) -> List[Dict]:
+        """Take ownership of unfinished jobs whose owner's lease has expired"""
+
+    def close(self) -> None:
+        pass
+
+    def _owner_gone(self, worker_id: Optional[str]) -> bool:
+        """True when a job's owner ran on this host and its process is no longer running it
+
+        Such jobs are taken over at once instead of after the lease. Owners on other hosts,
+        or whose process can't be checked, are only judged by their heartbeat.
+        """
+        parts = (worker_id or "").rsplit(":", 2)
+        own_host, own_pid, _ = self.worker_id.rsplit(":", 2)
+        if len(parts) != 3 or parts[0] != own_host or worker_id == self.worker_id or os.name == "nt":
+            return False
+        try:
+            pid = int(parts[1])
+        except ValueError:
+            return False
+        if pid == int(own_pid):
+            # Same pid, different nonce: an earlier life of this process (pid 1 in a restarted container, say)
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+        return False
+
+    # ---- Shared behaviour ----
+
+    def create(self, job_id: str, original_url: str, options: Optional[Dict] = None,
+               batch_id: Optional[str] = None) -> Dict:
+        self.evict()
+        now = time.time()
+        job = {
+            "status": "pending",
+            "original_url": original_url,
+            "options": options or {},
+            "error_message": None,
+            "cache_hit": False,
+            "provisional": False,
+            "has_html": False,
+            "html_length": 0,
+            "has_scraped_data": False,
+            "scrape_summary": {},
+            "prompt_summary": {},
+            "created_at": now,
+            "finished_at": None,
+            "stage_times": {"pending": now},
+            "result_etag": None,
+            "batch_id": batch_id,
+            "worker_id": self.worker_id,
+            "heartbeat_at": now
+        }
+        self._insert(job_id, job)
+        return dict(job)
+
+    def __contains__(self, job_id: str) -> bool:
+        return self.get(job_id) is not None
+
+    def update(self, job_id: str, **fields) -> None:
+        """Update metadata; status changes also record a per-stage timestamp"""
+        now = time.time()
+        stage = None
+        if "status" in fields:
+            fields["status"] = _status_value(fields["status"])
+            stage = fields["status"]
+            if stage in FINISHED_STATUSES:
+                fields.setdefault("finished_at", now)
+        self._write(job_id, fields, stage, now)
+
+    def mark_stage(self, job_id: str, stage: str) -> None:
+        """Record when a job reached a pipeline stage without changing its status"""
+        self._write(job_id, {}, stage, time.time())
+
+    def delete(self, job_id: str) -> None:
+        self._delete_record(job_id)
+        self.blobs.delete_job(job_id)
+
+    def clear(self) -> int:
+        job_ids = [job["job_id"] for job in self.list_jobs()]
+        for job_id in job_ids:
+            self.delete(job_id)
+        return len(job_ids)
+
+    def save_scraped_data(self, job_id: str, scraped_data: Dict) -> None:
+        payload = dict(scraped_data)
+        screenshot = payload.pop("screenshot", None)
+        if screenshot:
+            self.blobs.put(job_id, "screenshot", screenshot)
+        self.blobs.put(job_id, "scraped_data.json", json.dumps(payload).encode())
+        self.update(job_id, has_scraped_data=True, scrape_summary=summarize_scraped_data(scraped_data))
+
+    def load_scraped_data(self, job_id: str) -> Optional[Dict]:
+        data = self.blobs.get(job_id, "scraped_data.json")
+        if data is None:
+            return None
+        scraped_data = json.loads(data)
+        scraped_data["screenshot"] = self.blobs.get(job_id, "screenshot") or b""
+        return scraped_data
+
+    def load_screenshot(self, job_id: str) -> Optional[bytes]:
+        return self.blobs.get(job_id, "screenshot")
+
+    def save_html(self, job_id: str, html: str) -> None:
+        self.blobs.put(job_id, "cloned.html", html.encode())
+        self.update(job_id, has_html=True, html_length=len(html))
+
+    def load_html(self, job_id: str) -> Optional[str]:
+        data = self.blobs.get(job_id, "cloned.html")
+        return data.decode() if data is not None else None
+
+    def save_result(self, job_id: str, body: bytes) -> str:
+        """Store a finished job's serialized result with its compressed variants; returns the ETag"""
+        self.blobs.put(job_id, "result.json", body)
+        for encoding, compressed in compress_variants(body).items():
+            self.blobs.put(job_id, f"result.json.{encoding}", compressed)
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.update(job_id, result_etag=etag)
+        return etag
+
+    def load_result(self, job_id: str, encoding: Optional[str] = None) -> Optional[bytes]:
+        name = f"result.json.{encoding}" if encoding else "result.json"
+        return self.blobs.get(job_id, name)
+
+    def evict(self) -> int:
+        """Drop finished jobs past the retention age, then the oldest past the count limit"""
+        finished_before = time.time() - self.max_age_seconds
+        overflow = self.count() - self.max_jobs + 1
+        job_ids = self._evictable_job_ids(finished_before, max(0, overflow))
+        for job_id in job_ids:
+            self.delete(job_id)
+        return len(job_ids)
+
+
+class MemoryJobStore(JobStore):
+    """Metadata in a process-local dict; nothing survives a restart"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._jobs: "OrderedDict[str, Dict]" = OrderedDict()
+
+    def _insert(self, job_id: str, job: Dict) -> None:
+        self._jobs[job_id] = job
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        job = self._jobs.get(job_id)
+        return {"job_id": job_id, **job} if job is not None else None
+
+    def _write(self, job_id: str, fields: Dict, stage: Optional[str], stage_time: float) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        job.update(fields)
+        if stage:
+            job["stage_times"] = {**job["stage_times"], stage: stage_time}
+
+    def _delete_record(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+
+    def list_jobs(self) -> List[Dict]:
+        return [{"job_id": job_id, **job} for job_id, job in self._jobs.items()]
+
+    def count(self, status: Optional[str] = None) -> int:
+        if status is None:
+            return len(self._jobs)
+        return sum(1 for job in self._jobs.values() if job["status"] == _status_value(status))
+
+    def list_batch(self, batch_id: str) -> List[Dict]:
+        return [{"job_id": job_id, **job} for job_id, job in self._jobs.items() if job.get("batch_id") == batch_id]
+
+    def _evictable_job_ids(self, finished_before: float, overflow: int) -> List[str]:
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.get("finished_at") and job["finished_at"] < finished_before
+        ]
+        overflow -= len(expired)
+        for job_id, job in self._jobs.items():
+            if overflow <= 0:
+                break
+            if job["status"] in FINISHED_STATUSES and job_id not in expired:
+                expired.append(job_id)
+                overflow -= 1
+        return expired
+
+    def heartbeat(self, job_ids: Iterable[str]) -> None:
+        pass
+
+    def claim_interrupted_jobs(self) -> List[Dict]:
+        return []
+
+
+class SQLiteJobStore(JobStore):
+    """Durable metadata in SQLite (WAL), shareable by several worker processes"""
+
+    JSON_FIELDS = {"options", "scrape_summary", "prompt_summary", "stage_times"}
+    BOOL_FIELDS = {"cache_hit", "provisional", "has_html", "has_scraped_data"}
+
+    def __init__(self, db_path: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = Path(db_path or os.getenv("JOB_STORE_DB", ".cache/jobs.sqlite3"))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                original_url TEXT NOT NULL,
+                options TEXT NOT NULL DEFAULT '{}',
+                error_message TEXT,
+                cache_hit INTEGER NOT NULL DEFAULT 0,
+                provisional INTEGER NOT NULL DEFAULT 0,
+                has_html INTEGER NOT NULL DEFAULT 0,
+                html_length INTEGER NOT NULL DEFAULT 0,
+                has_scraped_data INTEGER NOT NULL DEFAULT 0,
+                scrape_summary TEXT NOT NULL DEFAULT '{}',
+                prompt_summary TEXT NOT NULL DEFAULT '{}',
+                created_at REAL NOT NULL,
+                finished_at REAL,
+                stage_times TEXT NOT NULL DEFAULT '{}',
+                worker_id TEXT,
+                heartbeat_at REAL,
+                result_etag TEXT,
+                batch_id TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+            CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at);
+            CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs (finished_at);
+        """)
+        self._add_missing_columns()
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_batch_id ON jobs (batch_id)")
+        self._conn.commit()
+
+    # Columns added after the table was first created, with their definitions
+    ADDED_COLUMNS = {
+        "result_etag": "TEXT",
+        "batch_id": "TEXT",
+        "prompt_summary": "TEXT NOT NULL DEFAULT '{}'",
+        "provisional": "INTEGER NOT NULL DEFAULT 0"
+    }
+
+    def _add_missing_columns(self) -> None:
+        existing = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, definition in self.ADDED_COLUMNS.items():
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+
+    def _encode(self, fields: Dict) -> Dict:
+        encoded = {}
+        for key, value in fields.items():
+            if key in self.JSON_FIELDS:
+                value = json.dumps(value)
+            elif key in self.BOOL_FIELDS:
+                value = int(bool(value))
+            encoded[key] = value
+        return encoded
+
+    def _decode(self, row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        for key in self.JSON_FIELDS:
+            job[key] = json.loads(job[key]) if job.get(key) else {}
+        for key in self.BOOL_FIELDS:
+            job[key] = bool(job[key])
+        return job
+
+    def _insert(self, job_id: str, job: Dict) -> None:
+        row = self._encode({"job_id": job_id, **job})
+        columns = ", ".join(row)
+        placeholders = ", ".join("?" for _ in row)
+        with self._lock:
+            self._conn.execute(f"INSERT INTO jobs ({columns}) VALUES ({placeholders})", tuple(row.values()))
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._decode(row) if row is not None else None
+
+    def _write(self, job_id: str, fields: Dict, stage: Optional[str], stage_time: float) -> None:
+        row = self._encode(fields)
+        assignments = [f"{column} = ?" for column in row]
+        values = list(row.values())
+        if stage:
+            assignments.append("stage_times = json_set(stage_times, '$.' || ?, ?)")
+            values.extend([stage, stage_time])
+        if not assignments:
+            return
+        values.append(job_id)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {', '.join(assignments)} WHERE job_id = ?", values)
+            self._conn.commit()
+
+    def _delete_record(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            self._conn.commit()
+
+    def list_jobs(self) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM jobs ORDER BY created_at").fetchall()
+        return [self._decode(row) for row in rows]
+
+    def count(self, status: Optional[str] = None) -> int:
+        with self._lock:
+            if status is None:
+                return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ?", (_status_value(status),)
+            ).fetchone()[0]
+
+    def list_batch(self, batch_id: str) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE batch_id = ? ORDER BY created_at", (batch_id,)
+            ).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def _evictable_job_ids(self, finished_before: float, overflow: int) -> List[str]:
+        with self._lock:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT job_id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (finished_before,)
+            )]
+            overflow -= len(expired)
+            if overflow > 0:
+                expired.extend(row[0] for row in self._conn.execute(
+                    "SELECT job_id FROM jobs WHERE status IN ('completed', 'failed') AND finished_at >= ? "
+                    "ORDER BY created_at LIMIT ?", (finished_before, overflow)
+                ))
+        return expired
+
+    def heartbeat(self, job_ids: Iterable[str]) -> None:
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        placeholders = ", ".join("?" for _ in job_ids)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET heartbeat_at = ? WHERE worker_id = ? AND job_id IN ({placeholders})",
+                [time.time(), self.worker_id, *job_ids]
+            )
+            self._conn.commit()
+
+    def claim_interrupted_jobs(self) -> List[Dict]:
+        stale_before = time.time() - self.lease_seconds
+        claimed = []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_id, worker_id, heartbeat_at FROM jobs WHERE status IN ('pending', 'processing') "
+                "AND worker_id IS NOT ? ORDER BY created_at",
+                (self.worker_id,)
+            ).fetchall()
+            for row in rows:
+                expired = row["heartbeat_at"] is None or row["heartbeat_at"] < stale_before
+                if not expired and not self._owner_gone(row["worker_id"]):
+                    continue
+                # Conditional update so only one worker wins each job
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET worker_id = ?, heartbeat_at = ?, status = 'pending' "
+                    "WHERE job_id = ? AND worker_id IS ? AND heartbeat_at IS ?",
+                    (self.worker_id, time.time(), row["job_id"], row["worker_id"], row["heartbeat_at"])
+                )
+                if cursor.rowcount == 1:
+                    claimed.append(row["job_id"])
+            self._conn.commit()
+        return [job for job in (self.get(job_id) for job_id in claimed) if job is not None]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def create_job_store() -> JobStore:
+    """Pick the job store backend from JOB_STORE (sqlite or memory)"""
+    backend = os.getenv("JOB_STORE", "sqlite").lower()
+    if backend == "memory":
+        return MemoryJobStore()
+    return SQLiteJobStore()
+
+
+# Shared job store
+job_store = create_job_store()
@@ -0,0 +1,372 @@
+import asyncio
+import functools
+import os
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from services.metrics import metrics, observe_stage
+
+load_dotenv()
+
+# HTTP statuses the model API answers with when it is overloaded or briefly broken
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+MODEL_REQUESTS = metrics.counter(
+    "clone_model_requests_total", "Model requests by outcome, retries and hedges included", ["outcome"]
+)
+MODEL_HEDGES = metrics.counter(
+    "clone_model_hedges_total", "Duplicate model requests sent after the hedge deadline, by which answered first",
+    ["kind", "winner"]
+)
+CIRCUIT_TRANSITIONS = metrics.counter(
+    "clone_model_circuit_transitions_total", "Times the model circuit breaker changed state, by new state", ["state"]
+)
+
+
+class ModelUnavailableError(Exception):
+    """The circuit breaker is open, so the model is not called at all"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Overload and transient faults are worth another try; bad prompts and blocked responses are not"""
+    if isinstance(error, ConnectionError):
+        return True
+    # google.api_core errors carry the HTTP status as .code, HTTP clients as .status_code
+    for attribute in ("code", "status_code"):
+        status = getattr(error, attribute, None)
+        if isinstance(status, int) and status in RETRYABLE_STATUS_CODES:
+            return True
+    return False
+
+
+def _optional_float(name: str) -> Optional[float]:
+    return float(os.getenv(name, "0")) or None
+
+
+async def _close(chunks) -> None:
+    aclose = getattr(chunks, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+async def _open_stream(open_stream: Callable[[], AsyncIterator[str]]):
+    """(chunks, first chunk) for a new stream; the first chunk is None when the stream is empty"""
+    chunks = open_stream().__aiter__()
+    try:
+        return chunks, await chunks.__anext__()
+    except StopAsyncIteration:
+        return chunks, None
+    except BaseException:
+        await _close(chunks)
+        raise
+
+
+class TokenBucket:
+    """Allows `rate` units per second on average, in bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, amount: float = 1) -> bool:
+        """Take `amount` now if it is there, without waiting"""
+        amount = min(amount, self.capacity)
+        if self._lock.locked():
+            # Someone is already waiting; jumping the queue would starve them
+            return False
+        self._refill()
+        if self.tokens < amount:
+            return False
+        self.tokens -= amount
+        return True
+
+    async def acquire(self, amount: float = 1) -> None:
+        # A single request larger than the bucket could never fit, so it waits for a full bucket instead
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+
+class ModelClient:
+    """Retries, hedging, a circuit breaker and rate limits around calls to the generation model
+
+    Every request first passes the breaker and the rate limits. A retryable failure is retried with
+    jittered exponential backoff while the caller's timeout allows. A request still running at the
+    hedge deadline (the p95 of recent latencies) gets a duplicate, and whichever answers first wins;
+    streams are hedged on their first chunk, against the p95 of recent times to first chunk.
+    After enough consecutive failures the breaker opens and calls fail at once with
+    ModelUnavailableError, so jobs go straight to the fallback until a probe request succeeds again.
+    """
+
+    def __init__(self, max_retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                 backoff_max: Optional[float] = None, hedge_percentile: Optional[float] = None,
+                 hedge_min_samples: Optional[int] = None, failure_threshold: Optional[int] = None,
+                 reset_seconds: Optional[float] = None, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None):
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("MODEL_MAX_RETRIES", "2"))
+        self.backoff_base = backoff_base or float(os.getenv("MODEL_BACKOFF_BASE_SECONDS", "0.5"))
+        self.backoff_max = backoff_max or float(os.getenv("MODEL_BACKOFF_MAX_SECONDS", "8"))
+        # 0 turns hedging off
+        self.hedge_percentile = hedge_percentile if hedge_percentile is not None else float(
+            os.getenv("MODEL_HEDGE_PERCENTILE", "95")
+        )
+        # Hedging waits for this many successful calls, so the deadline isn't set from a handful of samples
+        self.hedge_min_samples = hedge_min_samples or int(os.getenv("MODEL_HEDGE_MIN_SAMPLES", "20"))
+        self.failure_threshold = failure_threshold or int(os.getenv("MODEL_CIRCUIT_FAILURES", "5"))
+        self.reset_seconds = reset_seconds or float(os.getenv("MODEL_CIRCUIT_RESET_SECONDS", "30"))
+        requests_per_minute = requests_per_minute or _optional_float("MODEL_REQUESTS_PER_MINUTE")
+        tokens_per_minute = tokens_per_minute or _optional_float("MODEL_TOKENS_PER_MINUTE")
+        # Buckets hold ten seconds of quota, so a quiet spell allows a short burst
+        self.request_bucket = (
+            TokenBucket(requests_per_minute / 60, max(1.0, requests_per_minute / 6)) if requests_per_minute else None
+        )
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, tokens_per_minute / 6) if tokens_per_minute else None
+
+        # Whole-response latency of buffered calls, time to first chunk of streams
+        self.latencies: Dict[str, deque] = {"call": deque(maxlen=200), "stream": deque(maxlen=200)}
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.retries = 0
+        self.hedges = 0
+        self.rejected = 0
+
+    def available(self) -> bool:
+        """False while the breaker is open and its cool-down hasn't run out"""
+        return self.state != OPEN or time.monotonic() - self.opened_at >= self.reset_seconds
+
+    def hedge_delay(self, kind: str = "call") -> Optional[float]:
+        latencies = self.latencies[kind]
+        if not self.hedge_percentile or len(latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))]
+
+    def stats(self) -> Dict:
+        hedge_delays = {kind: self.hedge_delay(kind) for kind in self.latencies}
+        return {
+            "circuit": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "hedge_delay_seconds": {
+                kind: round(delay, 3) if delay is not None else None for kind, delay in hedge_delays.items()
+            },
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "rejected_while_open": self.rejected,
+            "rate_limited": self.request_bucket is not None or self.token_bucket is not None
+        }
+
+    async def call(self, request: Callable[[], Awaitable[Any]], timeout: float, tokens: int = 0) -> Any:
+        """Await request() with retries and hedging; the timeout covers every attempt and backoff"""
+        deadline = time.monotonic() + timeout
+        for attempt in range(self.max_retries + 1):
+            probe = await self._admit(tokens, deadline)
+            started = time.monotonic()
+            try:
+                result = await self._hedged(request, tokens, deadline, hedge=not probe)
+            except asyncio.CancelledError:
+                self._release(probe)
+                raise
+            except Exception as error:
+                self._record_failure(error, probe)
+                await self._backoff(error, attempt, deadline)
+                continue
+            self.latencies["call"].append(time.monotonic() - started)
+            self._record_success()
+            return result
+
+    async def stream(self, open_stream: Callable[[], AsyncIterator[str]], timeout: float,
+                     tokens: int = 0) -> AsyncIterator[str]:
+        """Yield from open_stream(), retrying and hedging a stream until it produces its first chunk
+
+        Once text has been handed on, a failure can't be undone by starting over, so it is raised.
+        """
+        deadline = time.monotonic() + timeout
+        for attempt in range(self.max_retries + 1):
+            probe = await self._admit(tokens, deadline)
+            started = time.monotonic()
+            try:
+                chunks, first = await self._hedged(
+                    functools.partial(_open_stream, open_stream), tokens, deadline, hedge=not probe,
+                    kind="stream", discard=lambda opened: _close(opened[0])
+                )
+            except asyncio.CancelledError:
+                self._release(probe)
+                raise
+            except Exception as error:
+                self._record_failure(error, probe)
+                await self._backoff(error, attempt, deadline)
+                continue
+            self.latencies["stream"].append(time.monotonic() - started)
+
+            try:
+                if first is not None:
+                    yield first
+                    async for text in chunks:
+                        yield text
+            except GeneratorExit:
+                # The consumer stopped reading; that says nothing about the model
+                self._release(probe)
+                raise
+            except asyncio.CancelledError:
+                self._release(probe)
+                raise
+            except Exception as error:
+                self._record_failure(error, probe)
+                raise
+            finally:
+                await _close(chunks)
+            self._record_success()
+            return
+
+    async def _admit(self, tokens: int, deadline: float) -> bool:
+        """Pass the breaker and the rate limits; True when this request is the half-open probe"""
+        probe = False
+        if self.state == OPEN:
+            if not self.available():
+                self.rejected += 1
+                MODEL_REQUESTS.inc(outcome="rejected")
+                raise ModelUnavailableError("Model circuit breaker is open after repeated failures")
+            self._set_state(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                self.rejected += 1
+                MODEL_REQUESTS.inc(outcome="rejected")
+                raise ModelUnavailableError("Model circuit breaker is waiting on a probe request")
+            self._probe_in_flight = probe = True
+
+        started = time.monotonic()
+        try:
+            for bucket, amount in ((self.request_bucket, 1), (self.token_bucket, tokens)):
+                if bucket is not None and amount:
+                    await asyncio.wait_for(bucket.acquire(amount), timeout=max(0.0, deadline - time.monotonic()))
+        except BaseException:
+            self._release(probe)
+            raise
+        observe_stage("model_rate_limit_wait", time.monotonic() - started)
+        return probe
+
+    def _try_admit_hedge(self, tokens: int) -> bool:
+        if self.state != CLOSED:
+            return False
+        if self.request_bucket is not None and not self.request_bucket.try_acquire(1):
+            return False
+        # A hedge is a nice-to-have, so it never waits for quota (and a spent request token is not returned)
+        return self.token_bucket is None or not tokens or self.token_bucket.try_acquire(tokens)
+
+    async def _hedged(self, request: Callable[[], Awaitable[Any]], tokens: int, deadline: float, hedge: bool,
+                      kind: str = "call", discard: Optional[Callable[[Any], Awaitable]] = None) -> Any:
+        """First successful result of request(), sending a duplicate if it runs past the hedge delay
+
+        discard releases a result that lost the race but finished anyway (an open stream, say).
+        """
+        primary = asyncio.ensure_future(request())
+        pending = {primary}
+        hedge_delay = self.hedge_delay(kind) if hedge else None
+        errors = []
+        hedged = False
+        winner = None
+        try:
+            if hedge_delay is not None and hedge_delay < deadline - time.monotonic():
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+                if not done and self._try_admit_hedge(tokens):
+                    self.hedges += 1
+                    print(f"🪃 No model response after {hedge_delay:.2f}s, sending a hedged duplicate")
+                    pending.add(asyncio.ensure_future(request()))
+                    hedged = True
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise asyncio.TimeoutError()
+                for future in done:
+                    if future.exception() is None:
+                        winner = future
+                        break
+                    errors.append(future.exception())
+                if winner is not None:
+                    if hedged:
+                        MODEL_HEDGES.inc(kind=kind, winner="primary" if winner is primary else "hedge")
+                    MODEL_REQUESTS.inc(outcome="success")
+                    if discard is not None:
+                        for future in done:
+                            if future is not winner and future.exception() is None:
+                                await discard(future.result())
+                    return winner.result()
+            # Every copy failed; the primary's error is the one worth reporting
+            raise errors[0]
+        finally:
+            for future in pending:
+                future.cancel()
+            if pending:
+                # Let the losers run their cleanup (closing streams, releasing threads) before moving on;
+                # one that finished before it could be cancelled is discarded like any other loser
+                results = await asyncio.gather(*pending, return_exceptions=True)
+                if discard is not None:
+                    for result in results:
+                        if not isinstance(result, BaseException):
+                            await discard(result)
+
+    async def _backoff(self, error: Exception, attempt: int, deadline: float) -> None:
+        """Sleep before the next attempt, or re-raise when the error isn't retryable or time is up"""
+        if not is_retryable(error) or attempt >= self.max_retries:
+            raise error
+        # Full jitter keeps jobs that failed together from retrying together
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if time.monotonic() + delay >= deadline:
+            raise error
+        self.retries += 1
+        print(f"🔁 Model request failed ({error}), retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    def _record_success(self) -> None:
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        if self.state != CLOSED:
+            print("✅ Model is answering again, closing the circuit breaker")
+            self._set_state(CLOSED)
+
+    def _record_failure(self, error: Exception, probe: bool) -> None:
+        unhealthy = is_retryable(error) or isinstance(error, asyncio.TimeoutError)
+        MODEL_REQUESTS.inc(outcome="timeout" if isinstance(error, asyncio.TimeoutError)
+                           else "retryable_error" if unhealthy else "error")
+        self._release(probe)
+        if not unhealthy:
+            # A rejected prompt or blocked response is about the request, not the model's health
+            return
+        self.consecutive_failures += 1
+        if probe or (self.state == CLOSED and self.consecutive_failures >= self.failure_threshold):
+            print(f"🔌 Model failed {self.consecutive_failures} times in a row, "
+                  f"sending jobs to the fallback for {self.reset_seconds:g}s")
+            self.opened_at = time.monotonic()
+            self._set_state(OPEN)
+
+    def _release(self, probe: bool) -> None:
+        if probe:
+            self._probe_in_flight = False
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            CIRCUIT_TRANSITIONS.inc(state=state)
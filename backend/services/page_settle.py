@@ -0,0 +1,153 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+DEFAULT_SETTLE_OPTIONS = {
+    "max_wait_ms": 5000,
+    "network_idle_ms": 500,
+    "max_inflight_requests": 2,
+    "dom_quiet_ms": 300,
+    "layout_stable_ms": 300,
+    "wait_for_fonts": True,
+    "wait_for_images": True
+}
+
+# Resolves once the DOM stops mutating, layout stops shifting and fonts/images
+# have finished loading, or when max_wait_ms runs out.
+SETTLE_SCRIPT = """
+    (opts) => new Promise((resolve) => {
+        const start = performance.now();
+        let lastMutation = start;
+        let lastShift = start;
+        let shiftTotal = 0;
+
+        const mutationObserver = new MutationObserver(() => {
+            lastMutation = performance.now();
+        });
+        mutationObserver.observe(document.documentElement || document, {
+            childList: true,
+            subtree: true,
+            attributes: true,
+            characterData: true
+        });
+
+        let shiftObserver = null;
+        try {
+            shiftObserver = new PerformanceObserver((list) => {
+                list.getEntries().forEach(entry => {
+                    if (!entry.hadRecentInput) {
+                        lastShift = performance.now();
+                        shiftTotal += entry.value;
+                    }
+                });
+            });
+            shiftObserver.observe({ type: 'layout-shift', buffered: false });
+        } catch (e) {
+            // Layout Instability API not available
+        }
+
+        let fontsReady = !opts.wait_for_fonts || !document.fonts;
+        if (!fontsReady) {
+            document.fonts.ready.then(() => { fontsReady = true; });
+        }
+
+        const pendingImages = () => {
+            if (!opts.wait_for_images) return 0;
+            return Array.from(document.images).filter(img => !img.complete && img.loading !== 'lazy').length;
+        };
+
+        const finish = (reason) => {
+            mutationObserver.disconnect();
+            if (shiftObserver) shiftObserver.disconnect();
+            resolve({
+                reason: reason,
+                elapsed_ms: Math.round(performance.now() - start),
+                layout_shift: shiftTotal,
+                pending_images: pendingImages(),
+                fonts_ready: fontsReady
+            });
+        };
+
+        const check = () => {
+            const now = performance.now();
+            if (now - start >= opts.max_wait_ms) {
+                return finish('timeout');
+            }
+            if (fontsReady && pendingImages() === 0 &&
+                now - lastMutation >= opts.dom_quiet_ms &&
+                now - lastShift >= opts.layout_stable_ms) {
+                return finish('stable');
+            }
+            setTimeout(check, 50);
+        };
+        check();
+    })
+"""
+
+
+class NetworkIdleTracker:
+    """Counts in-flight requests on a page; attach before navigating"""
+
+    def __init__(self, page):
+        self.page = page
+        self.inflight = 0
+        self.last_activity = time.monotonic()
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_request_done)
+        page.on("requestfailed", self._on_request_done)
+
+    def _on_request(self, _request) -> None:
+        self.inflight += 1
+        self.last_activity = time.monotonic()
+
+    def _on_request_done(self, _request) -> None:
+        self.inflight = max(0, self.inflight - 1)
+        self.last_activity = time.monotonic()
+
+    def detach(self) -> None:
+        self.page.remove_listener("request", self._on_request)
+        self.page.remove_listener("requestfinished", self._on_request_done)
+        self.page.remove_listener("requestfailed", self._on_request_done)
+
+    async def wait_for_idle(self, idle_ms: int, max_inflight: int, deadline: float) -> bool:
+        """Wait until at most max_inflight requests have been open for idle_ms"""
+        while time.monotonic() < deadline:
+            quiet_for = time.monotonic() - self.last_activity
+            if self.inflight <= max_inflight and quiet_for * 1000 >= idle_ms:
+                return True
+            await asyncio.sleep(0.05)
+        return False
+
+
+async def wait_for_page_settle(page, tracker: Optional[NetworkIdleTracker] = None,
+                               options: Optional[Dict] = None) -> Dict:
+    """Return as soon as the page looks stable, never later than max_wait_ms"""
+
+    opts = {**DEFAULT_SETTLE_OPTIONS, **{k: v for k, v in (options or {}).items() if v is not None}}
+    started = time.monotonic()
+    deadline = started + opts["max_wait_ms"] / 1000
+
+    async def dom_settled() -> Dict:
+        try:
+            return await asyncio.wait_for(
+                page.evaluate(SETTLE_SCRIPT, opts),
+                timeout=opts["max_wait_ms"] / 1000 + 1
+            )
+        except Exception as e:
+            # Usually a client-side redirect destroyed the execution context
+            return {"reason": "error", "error": str(e)}
+
+    async def network_settled() -> bool:
+        if tracker is None:
+            return True
+        return await tracker.wait_for_idle(opts["network_idle_ms"], opts["max_inflight_requests"], deadline)
+
+    dom_report, network_idle = await asyncio.gather(dom_settled(), network_settled())
+
+    report = {
+        "elapsed_ms": round((time.monotonic() - started) * 1000),
+        "network_idle": network_idle,
+        "dom": dom_report
+    }
+    report["settled"] = network_idle and dom_report.get("reason") == "stable"
+    return report
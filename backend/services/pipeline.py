@@ -0,0 +1,144 @@
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from dotenv import load_dotenv
+
+from services.metrics import observe_stage
+
+load_dotenv()
+
+# Works on one job in one stage; returning False finishes the job without running later stages
+StageHandler = Callable[[Dict], Awaitable[bool]]
+
+
+class PipelineStage:
+    def __init__(self, name: str, handler: StageHandler, workers: int):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.queue: Optional[asyncio.Queue] = None
+        self.active = 0
+        self.processed = 0
+
+
+class StagedPipeline:
+    """Jobs pass through stages over bounded queues, and each stage has its own worker pool
+
+    A stage whose next queue is full stops taking new work, so a slow stage (e.g. the model)
+    holds back the stages before it instead of letting finished work pile up. Meanwhile
+    every stage keeps working on what it has, so Chromium and the model run side by side.
+    """
+
+    def __init__(self, queue_size: Optional[int] = None, default_workers: Optional[int] = None):
+        self.queue_size = queue_size or int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))
+        self.default_workers = default_workers or int(os.getenv("PIPELINE_WORKERS", "1"))
+        self.stages: List[PipelineStage] = []
+        self._workers: List[asyncio.Task] = []
+        self._in_flight: Set[asyncio.Future] = set()
+
+    @property
+    def started(self) -> bool:
+        return bool(self._workers)
+
+    def add_stage(self, name: str, handler: StageHandler, workers: Optional[int] = None) -> None:
+        if self.started:
+            raise RuntimeError("Stages can't be added to a running pipeline")
+        self.stages.append(PipelineStage(name, handler, workers or self.default_workers))
+
+    def set_workers(self, name: str, workers: int) -> None:
+        """Resize a stage's worker pool; takes effect the next time the pipeline starts"""
+        if self.started:
+            raise RuntimeError("Workers can't be resized on a running pipeline")
+        next(stage for stage in self.stages if stage.name == name).workers = workers
+
+    async def start(self) -> None:
+        if self.started:
+            return
+        for stage in self.stages:
+            stage.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(index))
+            for index, stage in enumerate(self.stages)
+            for _ in range(stage.workers)
+        ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for future in self._in_flight:
+            future.cancel()
+        self._in_flight.clear()
+
+    async def run(self, job: Dict) -> Dict:
+        """Send a job through every stage and return it once it leaves the pipeline"""
+        if not self.started:
+            # Outside the app (scripts, benchmarks) the stages simply run one after another
+            for stage in self.stages:
+                if not await self._handle(stage, job):
+                    break
+            return job
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight.add(future)
+        try:
+            await self.stages[0].queue.put((job, future, time.monotonic()))
+            return await future
+        finally:
+            self._in_flight.discard(future)
+
+    def stats(self) -> Dict:
+        return {
+            "queue_size": self.queue_size,
+            "jobs_in_flight": len(self._in_flight),
+            "stages": {
+                stage.name: {
+                    "workers": stage.workers,
+                    "active": stage.active,
+                    "queued": stage.queue.qsize() if stage.queue else 0,
+                    "processed": stage.processed
+                }
+                for stage in self.stages
+            }
+        }
+
+    async def _handle(self, stage: PipelineStage, job: Dict) -> bool:
+        stage.active += 1
+        started = time.monotonic()
+        try:
+            return await stage.handler(job) is not False
+        finally:
+            stage.active -= 1
+            stage.processed += 1
+            observe_stage(stage.name, time.monotonic() - started)
+
+    async def _worker(self, index: int) -> None:
+        stage = self.stages[index]
+        next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            job, future, queued_at = await stage.queue.get()
+            try:
+                if future.done():
+                    # Whoever submitted the job stopped waiting for it
+                    continue
+                observe_stage(f"{stage.name}_queue_wait", time.monotonic() - queued_at)
+                try:
+                    proceed = await self._handle(stage, job)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+                if proceed and next_stage is not None:
+                    # Blocks while the next stage is backed up; that is the backpressure
+                    await next_stage.queue.put((job, future, time.monotonic()))
+                elif not future.done():
+                    future.set_result(job)
+            finally:
+                stage.queue.task_done()
+
+
+# Shared clone pipeline; its stages are registered by the clone router
+clone_pipeline = StagedPipeline()
@@ -0,0 +1,172 @@
+import math
+import re
+from typing import Dict, List, Optional
+
+from services.metrics import metrics
+
+# Longest text kept from one paragraph, button or link
+MAX_ITEM_CHARS = 240
+# Browser viewport height the scraper renders with; used when the page did not report one
+DEFAULT_FOLD_PX = 720
+
+PROMPT_TOKENS = metrics.histogram(
+    "clone_prompt_tokens", "Estimated tokens in each generation prompt",
+    buckets=(250, 500, 1000, 1500, 2000, 3000, 4000, 6000, 8000, 12000, 16000)
+)
+
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Importance of each kind of content; higher is kept first when the budget runs short
+HEADING_PRIORITY = {"h1": 1.0, "h2": 0.85, "h3": 0.75, "h4": 0.65}
+NAV_PRIORITY = 0.9
+BUTTON_PRIORITY = 0.6
+SECTION_TEXT_PRIORITY = 0.55
+BREADCRUMB_PRIORITY = 0.5
+FOOTER_NAV_PRIORITY = 0.4
+EXTRA_TEXT_PRIORITY = 0.35
+ABOVE_FOLD_BONUS = 0.3
+
+# Block headings, in the order the blocks appear in the prompt
+CONTENT_GROUPS = [
+    ("sections", "CONTENT SECTIONS (in order):"),
+    ("text", "ADDITIONAL TEXT CONTENT:"),
+    ("buttons", "BUTTONS/ACTIONS:")
+]
+NAVIGATION_GROUPS = [
+    ("primary_nav", "PRIMARY NAVIGATION:"),
+    ("breadcrumbs", None),
+    ("footer_nav", "FOOTER NAVIGATION:")
+]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough local token count: about four characters per token, more for symbol-heavy text like CSS"""
+    if not text:
+        return 0
+    return math.ceil(max(len(text) / 4, len(TOKEN_PATTERN.findall(text)) * 0.8))
+
+
+def _clip(text: str, limit: int = MAX_ITEM_CHARS) -> str:
+    text = WHITESPACE_PATTERN.sub(" ", text or "").strip()
+    return text if len(text) <= limit else text[:limit].rstrip() + "..."
+
+
+def _dedupe_key(text: str) -> str:
+    return WHITESPACE_PATTERN.sub(" ", (text or "").lower()).strip(" .,:;!?-–—")[:120]
+
+
+def compact_page_content(content_sections: Dict, structured_content: Dict, navigation_analysis: Dict,
+                         token_budget: int, fold_px: Optional[float] = None) -> Dict:
+    """Content and navigation blocks for the prompt, filled by importance up to token_budget
+
+    Headings, above-the-fold sections and navigation are kept first. Text already used elsewhere
+    on the page is dropped. Returns {"content": str, "navigation": str, "report": {...}}.
+    """
+    fold_px = fold_px or DEFAULT_FOLD_PX
+    candidates: List[Dict] = []
+
+    def candidate(group: str, order: tuple, priority: float, line: str, text: str, **extra) -> None:
+        candidates.append({"group": group, "order": order, "priority": priority, "line": line,
+                           "key": _dedupe_key(text), **extra})
+
+    sections = (content_sections.get("main_content") or {}).get("sections") or []
+    for index, section in enumerate(sections):
+        bounds = section.get("bounds") or {}
+        above_fold = bounds.get("y") is not None and bounds["y"] < fold_px
+        bonus = (ABOVE_FOLD_BONUS if above_fold else 0.0) - 0.01 * index
+        heading = section.get("heading") or {}
+        if heading.get("text"):
+            level = heading.get("level", "h2")
+            candidate("sections", (index, -1), HEADING_PRIORITY.get(level, 0.6) + bonus,
+                      f"{level.upper()}: {_clip(heading['text'], 120)}", heading["text"], numbered=True)
+        for item_index, text in enumerate(section.get("content") or []):
+            if len(text.strip()) < 20:
+                continue
+            candidate("sections", (index, item_index), SECTION_TEXT_PRIORITY - 0.1 * item_index + bonus,
+                      f"     Content: {_clip(text)}", text)
+
+    for index, text in enumerate(structured_content.get("text_content") or []):
+        candidate("text", (index,), EXTRA_TEXT_PRIORITY - 0.01 * index, f"  - {_clip(text)}", text)
+    for index, button in enumerate(structured_content.get("buttons") or []):
+        text = button.get("text") or "Button"
+        candidate("buttons", (index,), BUTTON_PRIORITY - 0.02 * index, f"  - {_clip(text, 80)}", text)
+
+    for index, item in enumerate(navigation_analysis.get("primary_nav") or []):
+        text = item.get("text") or "Link"
+        current = " (CURRENT)" if item.get("is_current") else ""
+        # Navigation labels repeat across menus on purpose, so they are not deduplicated
+        candidates.append({"group": "primary_nav", "order": (index,), "priority": NAV_PRIORITY - 0.01 * index,
+                           "line": f"  - {_clip(text, 80)}{current}", "key": None})
+    breadcrumbs = navigation_analysis.get("breadcrumbs") or []
+    if breadcrumbs:
+        candidates.append({"group": "breadcrumbs", "order": (0,), "priority": BREADCRUMB_PRIORITY,
+                           "line": f"Breadcrumbs: {' > '.join(_clip(crumb, 60) for crumb in breadcrumbs)}",
+                           "key": None})
+    for index, item in enumerate(navigation_analysis.get("footer_nav") or []):
+        text = item.get("text") or "Footer Link"
+        candidates.append({"group": "footer_nav", "order": (index,), "priority": FOOTER_NAV_PRIORITY - 0.01 * index,
+                           "line": f"  - {_clip(text, 80)}", "key": None})
+
+    # Always present, whatever the budget
+    page_title = structured_content.get("page_title") or "Website"
+    content_lines = [f"Page Title: {_clip(page_title, 120)}",
+                     f"Main Heading: {_clip(structured_content.get('main_heading') or page_title, 120)}"]
+    if structured_content.get("meta_description"):
+        content_lines.append(f"Description: {_clip(structured_content['meta_description'])}")
+    style_line = f"Navigation Style: {navigation_analysis.get('nav_style', 'horizontal')}"
+    used = estimate_tokens("\n".join(content_lines)) + estimate_tokens(style_line)
+
+    group_titles = dict(CONTENT_GROUPS + NAVIGATION_GROUPS)
+    seen = set()
+    kept: List[Dict] = []
+    opened = set()
+    duplicates = over_budget = 0
+    for item in sorted(candidates, key=lambda item: (-item["priority"], item["group"], item["order"])):
+        if item["key"] is not None and item["key"] in seen:
+            duplicates += 1
+            continue
+        # Numbered lines get their "  N. " prefix when rendered
+        cost = estimate_tokens(item["line"]) + (2 if item.get("numbered") else 0)
+        if item["group"] not in opened and group_titles.get(item["group"]):
+            cost += estimate_tokens(group_titles[item["group"]])
+        if used + cost > token_budget:
+            over_budget += 1
+            continue
+        used += cost
+        opened.add(item["group"])
+        kept.append(item)
+        if item["key"] is not None:
+            seen.add(item["key"])
+
+    def render(groups, lines: List[str]) -> List[str]:
+        for group, title in groups:
+            items = sorted((item for item in kept if item["group"] == group), key=lambda item: item["order"])
+            if not items:
+                continue
+            if title:
+                lines.append(title)
+            number = 0
+            for item in items:
+                if item.get("numbered"):
+                    number += 1
+                    lines.append(f"  {number}. {item['line']}")
+                else:
+                    lines.append(item["line"])
+        return lines
+
+    navigation_lines = render(NAVIGATION_GROUPS[:1], [])
+    navigation_lines.append(style_line)
+    render(NAVIGATION_GROUPS[1:], navigation_lines)
+
+    return {
+        "content": "\n".join(render(CONTENT_GROUPS, content_lines)),
+        "navigation": "\n".join(navigation_lines),
+        "report": {
+            "content_tokens": used,
+            "items_available": len(candidates),
+            "items_kept": len(kept),
+            "duplicates_dropped": duplicates,
+            "items_over_budget": over_budget
+        }
+    }
@@ -0,0 +1,169 @@
+import os
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from dotenv import load_dotenv
+
+from services.metrics import metrics
+
+load_dotenv()
+
+# Resource types each profile aborts; stylesheets and scripts stay wherever computed styles matter
+INTERCEPTION_PROFILES = {
+    "structure-only": {
+        "block_types": {"image", "media", "font", "stylesheet", "texttrack", "manifest", "eventsource", "websocket"},
+        "block_trackers": True,
+        "block_downloads": True
+    },
+    "styles": {
+        "block_types": {"image", "media", "font", "texttrack", "manifest", "eventsource", "websocket"},
+        "block_trackers": True,
+        "block_downloads": True
+    },
+    "full": {
+        "block_types": set(),
+        "block_trackers": False,
+        "block_downloads": False
+    }
+}
+
+DEFAULT_INTERCEPTION_PROFILE = os.getenv("SCRAPE_INTERCEPTION_PROFILE", "styles")
+
+# Analytics, tag managers and ad networks; a request matches when its host ends with one of these
+TRACKER_DOMAINS = (
+    "google-analytics.com", "googletagmanager.com", "googletagservices.com", "googlesyndication.com",
+    "doubleclick.net", "adservice.google.com", "facebook.net", "connect.facebook.com", "analytics.tiktok.com",
+    "bat.bing.com", "clarity.ms", "hotjar.com", "hotjar.io", "segment.com", "segment.io", "mixpanel.com",
+    "fullstory.com", "heap.io", "heapanalytics.com", "amplitude.com", "hs-analytics.net", "hs-scripts.com",
+    "px.ads.linkedin.com", "snap.licdn.com", "ads-twitter.com", "static.ads-twitter.com", "criteo.com",
+    "criteo.net", "taboola.com", "outbrain.com", "amazon-adsystem.com", "adnxs.com", "quantserve.com",
+    "scorecardresearch.com", "newrelic.com", "nr-data.net", "optimizely.com", "crazyegg.com", "mouseflow.com"
+)
+
+# File types that are never part of a page's structure
+DOWNLOAD_EXTENSIONS = (
+    ".zip", ".gz", ".tgz", ".rar", ".7z", ".dmg", ".exe", ".msi", ".pkg", ".apk", ".iso", ".pdf",
+    ".mp4", ".webm", ".mov", ".m4v", ".avi", ".mkv", ".mp3", ".wav", ".ogg", ".flac", ".m3u8"
+)
+
+# Typical transfer size per blocked request (HTTP Archive medians, rounded); aborted
+# requests never report their real size, so savings are estimated from these
+TYPICAL_BYTES = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 35_000,
+    "stylesheet": 15_000,
+    "script": 25_000,
+    "download": 500_000
+}
+DEFAULT_TYPICAL_BYTES = 10_000
+
+BLOCKED_REQUESTS = metrics.counter(
+    "scrape_blocked_requests_total", "Browser requests aborted by the interception profile", ["profile", "reason"]
+)
+BYTES_SAVED = metrics.counter(
+    "scrape_bytes_saved_estimate_total", "Estimated bytes not downloaded because requests were blocked", ["profile"]
+)
+
+
+def resolve_profile(profile: Optional[str]) -> str:
+    if profile in INTERCEPTION_PROFILES:
+        return profile
+    return DEFAULT_INTERCEPTION_PROFILE if DEFAULT_INTERCEPTION_PROFILE in INTERCEPTION_PROFILES else "styles"
+
+
+def _is_tracker(host: str) -> bool:
+    return any(host == domain or host.endswith("." + domain) for domain in TRACKER_DOMAINS)
+
+
+class RequestBlocker:
+    """Aborts requests the extraction passes do not need and keeps a per-job tally"""
+
+    def __init__(self, profile: Optional[str] = None):
+        self.profile = resolve_profile(profile)
+        self.rules = INTERCEPTION_PROFILES[self.profile]
+        self.allowed_requests = 0
+        self.blocked_requests = 0
+        self.blocked_by_reason: Dict[str, int] = {}
+        self.blocked_by_type: Dict[str, int] = {}
+        self.bytes_saved_estimate = 0
+        self._target = None
+
+    @property
+    def enabled(self) -> bool:
+        rules = self.rules
+        return bool(rules["block_types"] or rules["block_trackers"] or rules["block_downloads"])
+
+    async def attach(self, target) -> None:
+        """Route a page (or a whole context) through this profile"""
+        # Routing costs a round trip per request, so "full" skips it entirely
+        if not self.enabled:
+            return
+        self._target = target
+        await target.route("**/*", self._handle)
+
+    async def detach(self) -> None:
+        if self._target is None:
+            return
+        try:
+            await self._target.unroute("**/*", self._handle)
+        except Exception:
+            # The page may already be closing
+            pass
+        self._target = None
+
+    def block_reason(self, request) -> Optional[str]:
+        """Why a request should be aborted, or None to let it through"""
+        if request.is_navigation_request():
+            try:
+                if request.frame.parent_frame is None:
+                    return None
+            except Exception:
+                pass
+
+        parts = urlsplit(request.url)
+        if parts.scheme not in ("http", "https"):
+            return None
+        if self.rules["block_trackers"] and _is_tracker((parts.hostname or "").lower()):
+            return "tracker"
+        if request.resource_type in self.rules["block_types"]:
+            return "type"
+        if self.rules["block_downloads"] and parts.path.lower().endswith(DOWNLOAD_EXTENSIONS):
+            return "download"
+        return None
+
+    async def _handle(self, route) -> None:
+        request = route.request
+        reason = self.block_reason(request)
+        if reason is None:
+            self.allowed_requests += 1
+            await self._settle_route(route.continue_())
+            return
+
+        resource_type = "download" if reason == "download" else request.resource_type
+        saved = TYPICAL_BYTES.get(resource_type, DEFAULT_TYPICAL_BYTES)
+        self.blocked_requests += 1
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+        self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+        self.bytes_saved_estimate += saved
+        BLOCKED_REQUESTS.inc(profile=self.profile, reason=reason)
+        BYTES_SAVED.inc(saved, profile=self.profile)
+        await self._settle_route(route.abort("blockedbyclient"))
+
+    @staticmethod
+    async def _settle_route(action) -> None:
+        try:
+            await action
+        except Exception:
+            # The page closed while the request was in flight
+            pass
+
+    def report(self) -> Dict:
+        return {
+            "profile": self.profile,
+            "allowed_requests": self.allowed_requests,
+            "blocked_requests": self.blocked_requests,
+            "blocked_by_reason": dict(self.blocked_by_reason),
+            "blocked_by_type": dict(self.blocked_by_type),
+            "bytes_saved_estimate": self.bytes_saved_estimate
+        }
@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from dotenv import load_dotenv
+
+from services.extraction_bundle import EXTRACTION_VERSION
+from services.lru_cache import SizedLRUCache
+from services.ai_cloner import PROMPT_VERSION
+
+load_dotenv()
+
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "mc_cid", "mc_eid"}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL so trivially different spellings share a cache entry"""
+    url = url.strip()
+    if not url.lower().startswith(('http://', 'https://')):
+        url = 'https://' + url
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.startswith("utm_") and key not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+class DiskCacheBackend:
+    """One file per entry; file mtime doubles as the LRU clock
+
+    The directory is scanned once at startup; after that a running byte total
+    and an access-ordered index decide what to evict, so a put never has to
+    stat the whole directory. Calls block on disk, so callers run them off the
+    event loop.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl_seconds: float):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.current_bytes = 0
+        self._lock = threading.Lock()
+        self._sizes: "OrderedDict[str, int]" = OrderedDict()
+        self._scan()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _scan(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        # Oldest access first
+        for _, key, size in sorted(entries):
+            self._sizes[key] = size
+            self.current_bytes += size
+
+    def _forget(self, key: str) -> None:
+        size = self._sizes.pop(key, None)
+        if size is not None:
+            self.current_bytes -= size
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        with self._lock:
+            try:
+                stat = path.stat()
+                if stat.st_mtime + self.ttl_seconds < time.time():
+                    path.unlink(missing_ok=True)
+                    self._forget(key)
+                    return None
+                value = path.read_bytes()
+                os.utime(path)
+            except FileNotFoundError:
+                self._forget(key)
+                return None
+            if key in self._sizes:
+                self._sizes.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        with self._lock:
+            tmp_path.write_bytes(value)
+            os.replace(tmp_path, path)
+            self._forget(key)
+            self._sizes[key] = len(value)
+            self.current_bytes += len(value)
+            self._evict()
+
+    def _evict(self) -> None:
+        while self.current_bytes > self.max_bytes and self._sizes:
+            key, size = self._sizes.popitem(last=False)
+            self._path(key).unlink(missing_ok=True)
+            self.current_bytes -= size
+
+
+class ResultCache:
+    """Caches scraped data and generated HTML per normalized URL"""
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_bytes: Optional[int] = None,
+                 disk_dir: Optional[str] = None, disk_max_bytes: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds or float(os.getenv("RESULT_CACHE_TTL_SECONDS", "3600"))
+        max_bytes = max_bytes or int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+        disk_dir = disk_dir or os.getenv("RESULT_CACHE_DIR")
+        disk_max_bytes = disk_max_bytes or int(os.getenv("RESULT_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024)))
+
+        self.memory = SizedLRUCache(max_bytes, self.ttl_seconds)
+        self.disk = DiskCacheBackend(disk_dir, disk_max_bytes, self.ttl_seconds) if disk_dir else None
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, url: str, variant: Optional[Dict] = None) -> str:
+        """Key for a URL plus whatever else shaped the result (interception profile, generation mode)"""
+        fingerprint = f"{normalize_url(url)}|extraction={EXTRACTION_VERSION}|prompt={PROMPT_VERSION}"
+        if variant:
+            fingerprint += f"|{json.dumps(variant, sort_keys=True)}"
+        return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+    async def get(self, url: str, variant: Optional[Dict] = None) -> Optional[Dict]:
+        key = self.make_key(url, variant)
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not None:
+                self.memory.set(key, value)
+
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    async def put(self, url: str, scraped_data: Dict, cloned_html: str, variant: Optional[Dict] = None) -> None:
+        # The screenshot is never used for generation, so it is not worth the space
+        cacheable_data = {k: v for k, v in scraped_data.items() if k not in ("screenshot", "screenshot_info")}
+        value = json.dumps({"scraped_data": cacheable_data, "cloned_html": cloned_html}).encode()
+
+        key = self.make_key(url, variant)
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self.memory),
+            "memory_bytes": self.memory.current_bytes,
+            "disk_enabled": self.disk is not None,
+            "disk_bytes": self.disk.current_bytes if self.disk is not None else 0
+        }
+
+
+# Shared result cache
+result_cache = ResultCache()
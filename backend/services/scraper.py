@@ -1,41 +1,63 @@
 import asyncio
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup
-import requests
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List, Tuple
 import base64
 import re
 import json
+import logging
+from urllib.parse import urlsplit
+
+from services.browser_pool import BrowserPool, browser_pool, CHROMIUM_ARGS, DEFAULT_CONTEXT_OPTIONS
+from services.page_settle import NetworkIdleTracker, wait_for_page_settle
+from services.screenshot import capture_screenshot
+from services.request_blocking import RequestBlocker
+from services.design_system_cache import STYLESHEET_FINGERPRINT_SCRIPT, design_system_cache
+from services.extraction_bundle import EXTRACTION_BUNDLE_SCRIPT
+from services.http_client import http_client
+from services.metrics import span
+
+logger = logging.getLogger(__name__)
 
 class LayoutAwareScraper:
-    def __init__(self):
+    def __init__(self, pool: Optional[BrowserPool] = None, context=None):
+        self.pool = pool
+        self.playwright = None
         self.browser = None
+        # A context passed in is shared with other scrapers (e.g. a batch) and outlives this one
+        self.context = context
+        self._owns_context = context is None
         self.page = None
+        self._context_lease = None
 
     async def __aenter__(self):
-        self.playwright = await async_playwright().start()
-        self.browser = await self.playwright.chromium.launch(
-            headless=True,
-            args=[
-                '--no-sandbox',
-                '--disable-setuid-sandbox',
-                '--disable-dev-shm-usage',
-                '--disable-accelerated-2d-canvas',
-                '--no-first-run',
-                '--no-zygote',
-                '--disable-gpu'
-            ]
-        )
-        self.context = await self.browser.new_context(
-            viewport={'width': 1280, 'height': 720},
-            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        )
+        if not self._owns_context:
+            # Only the page is ours; cookies and cache are shared with the context's other pages
+            self.page = await self.context.new_page()
+            return self
+        if self.pool is not None:
+            # Borrow an isolated context from the shared pool
+            self._context_lease = self.pool.context()
+            self.context = await self._context_lease.__aenter__()
+        else:
+            self.playwright = await async_playwright().start()
+            self.browser = await self.playwright.chromium.launch(
+                headless=True,
+                args=CHROMIUM_ARGS
+            )
+            self.context = await self.browser.new_context(**DEFAULT_CONTEXT_OPTIONS)
         self.page = await self.context.new_page()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.page:
             await self.page.close()
+        if not self._owns_context:
+            return
+        if self._context_lease:
+            # Closing the lease closes the context and returns the browser to the pool
+            await self._context_lease.__aexit__(exc_type, exc_val, exc_tb)
+            return
         if self.context:
             await self.context.close()
         if self.browser:
@@ -43,627 +65,166 @@ class LayoutAwareScraper:
         if self.playwright:
             await self.playwright.stop()
 
-    async def scrape_website(self, url: str) -> Dict:
-        """Layout-aware scraping that understands website structure and flow"""
+    async def scrape_website(self, url: str, settle_options: Optional[Dict] = None,
+                             on_stage: Optional[Callable[[str], None]] = None,
+                             screenshot_options: Optional[Dict] = None,
+                             interception_profile: Optional[str] = None,
+                             design_system: Optional[Dict] = None) -> Dict:
+        """Layout-aware scraping that understands website structure and flow
+        
+        Passing a design system (e.g. from another page of the same site) skips the computed-style pass,
+        as does a design-system cache hit for the page's origin and stylesheets.
+        """
         
-        print(f"🏗️ Starting layout-aware scrape for: {url}")
+        logger.debug(f"Starting layout-aware scrape for: {url}")
         
         # Normalize URL
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
         
+        # Screenshots need the page as a visitor sees it, so they load everything unless told otherwise
+        if interception_profile is None and screenshot_options is not None:
+            interception_profile = "full"
+        blocker = RequestBlocker(interception_profile)
+        tracker = NetworkIdleTracker(self.page)
         try:
-            # Navigate to page
-            await self.page.goto(url, wait_until="domcontentloaded", timeout=15000)
-            await asyncio.sleep(4)  # Allow all content to load
-            
-            print("📸 Capturing visual reference...")
-            screenshot = await self._capture_screenshot()
+            await blocker.attach(self.page)
             
-            print("🏗️ Analyzing layout structure...")
-            layout_structure = await self._analyze_layout_structure()
+            # Navigate to page
+            with span("navigation"):
+                await self.page.goto(url, wait_until="domcontentloaded", timeout=15000)
             
-            print("📐 Mapping content sections...")
-            content_sections = await self._map_content_sections()
+            # Wait only as long as the page is still changing
+            with span("settle"):
+                settle_report = await wait_for_page_settle(self.page, tracker, settle_options)
             
-            print("🎨 Extracting visual design...")
-            design_system = await self._extract_design_system()
+            # Screenshots are opt-in; generation never looks at them
+            screenshot, screenshot_info = b"", None
+            if screenshot_options is not None:
+                with span("screenshot"):
+                    screenshot, screenshot_info = await self._capture_screenshot(screenshot_options)
             
-            print("📝 Getting structured content...")
-            structured_content = await self._extract_structured_content()
+            if on_stage:
+                on_stage("extracting")
+            design_key = None
+            design_system_source = "shared"
+            if design_system is None:
+                with span("design_fingerprint"):
+                    design_key = await self._design_system_key()
+                design_system = design_system_cache.get(design_key)
+                design_system_source = "cache" if design_system is not None else "extracted"
+            with span("evaluate_bundle"):
+                extracted = await self._extract_page_bundle(skip_design_system=design_system is not None)
+            layout_structure = extracted["layout_structure"]
+            content_sections = extracted["content_sections"]
+            if design_system is None:
+                design_system = extracted["design_system"]
+                design_system_cache.put(design_key, design_system)
+            structured_content = extracted["structured_content"]
+            navigation_analysis = extracted["navigation_analysis"]
             
-            print("🔗 Analyzing navigation...")
-            navigation_analysis = await self._analyze_navigation_structure()
+            with span("page_content"):
+                html = await self.page.content()
             
             return {
                 "success": True,
                 "url": url,
                 "method": "layout_aware",
                 "screenshot": screenshot,
+                "screenshot_info": screenshot_info,
                 "layout_structure": layout_structure,
                 "content_sections": content_sections,
                 "design_system": design_system,
                 "structured_content": structured_content,
                 "navigation_analysis": navigation_analysis,
-                "html": await self.page.content(),
+                "html": html,
                 "css": {},
-                "layout": layout_structure
+                "layout": layout_structure,
+                "settle": settle_report,
+                "interception": blocker.report(),
+                "design_system_source": design_system_source
             }
             
         except Exception as e:
-            print(f"❌ Layout-aware scraping failed: {e}")
+            logger.debug(f"Layout-aware scraping failed: {e}")
             return await self._fallback_scrape(url)
+        finally:
+            tracker.detach()
+            await blocker.detach()
 
-    async def _analyze_layout_structure(self) -> Dict:
-        """Analyze the overall layout structure and flow"""
-        
-        layout_data = await self.page.evaluate("""
-            () => {
-                const layout = {
-                    page_type: 'unknown',
-                    main_sections: [],
-                    layout_flow: 'vertical',
-                    container_info: {},
-                    viewport: {
-                        width: window.innerWidth,
-                        height: window.innerHeight
-                    }
-                };
-                
-                // Detect main layout containers
-                const body = document.body;
-                const main = document.querySelector('main, .main, #main, [role="main"]') || body;
-                const header = document.querySelector('header, .header, #header, [role="banner"]');
-                const nav = document.querySelector('nav, .nav, .navigation, [role="navigation"]');
-                const footer = document.querySelector('footer, .footer, #footer, [role="contentinfo"]');
-                const sidebar = document.querySelector('aside, .sidebar, [role="complementary"]');
-                
-                // Determine page type based on structure
-                if (header && nav && main && footer) {
-                    layout.page_type = 'full_layout';
-                } else if (main) {
-                    layout.page_type = 'content_focused';
-                } else {
-                    layout.page_type = 'simple';
-                }
-                
-                // Analyze main container
-                const mainRect = main.getBoundingClientRect();
-                const mainStyles = window.getComputedStyle(main);
-                
-                layout.container_info = {
-                    width: mainRect.width,
-                    maxWidth: mainStyles.maxWidth,
-                    margin: mainStyles.margin,
-                    padding: mainStyles.padding,
-                    display: mainStyles.display,
-                    flexDirection: mainStyles.flexDirection,
-                    gridTemplateColumns: mainStyles.gridTemplateColumns
-                };
-                
-                // Detect layout flow
-                if (mainStyles.display === 'flex' && mainStyles.flexDirection === 'row') {
-                    layout.layout_flow = 'horizontal';
-                } else if (mainStyles.display === 'grid' && mainStyles.gridTemplateColumns !== 'none') {
-                    layout.layout_flow = 'grid';
-                } else {
-                    layout.layout_flow = 'vertical';
-                }
-                
-                // Identify main sections in order
-                const sections = [];
-                if (header) {
-                    const headerRect = header.getBoundingClientRect();
-                    sections.push({
-                        type: 'header',
-                        bounds: {
-                            x: headerRect.x,
-                            y: headerRect.y,
-                            width: headerRect.width,
-                            height: headerRect.height
-                        },
-                        styles: {
-                            background: window.getComputedStyle(header).backgroundColor,
-                            position: window.getComputedStyle(header).position
-                        }
-                    });
-                }
-                
-                if (nav && nav !== header) {
-                    const navRect = nav.getBoundingClientRect();
-                    sections.push({
-                        type: 'navigation',
-                        bounds: {
-                            x: navRect.x,
-                            y: navRect.y,
-                            width: navRect.width,
-                            height: navRect.height
-                        }
-                    });
-                }
-                
-                // Find main content sections
-                const contentSections = main.querySelectorAll('section, article, .section, .content-section');
-                contentSections.forEach((section, index) => {
-                    const rect = section.getBoundingClientRect();
-                    if (rect.height > 50) { // Only significant sections
-                        sections.push({
-                            type: 'content',
-                            index: index,
-                            bounds: {
-                                x: rect.x,
-                                y: rect.y,
-                                width: rect.width,
-                                height: rect.height
-                            }
-                        });
-                    }
-                });
-                
-                if (sidebar) {
-                    const sidebarRect = sidebar.getBoundingClientRect();
-                    sections.push({
-                        type: 'sidebar',
-                        bounds: {
-                            x: sidebarRect.x,
-                            y: sidebarRect.y,
-                            width: sidebarRect.width,
-                            height: sidebarRect.height
-                        }
-                    });
-                }
-                
-                if (footer) {
-                    const footerRect = footer.getBoundingClientRect();
-                    sections.push({
-                        type: 'footer',
-                        bounds: {
-                            x: footerRect.x,
-                            y: footerRect.y,
-                            width: footerRect.width,
-                            height: footerRect.height
-                        }
-                    });
-                }
-                
-                layout.main_sections = sections;
-                return layout;
-            }
-        """)
-        
-        return layout_data
-
-    async def _map_content_sections(self) -> Dict:
-        """Map content sections in their proper hierarchical order"""
-        
-        sections_data = await self.page.evaluate("""
-            () => {
-                const sections = {
-                    header_content: {},
-                    navigation_content: {},
-                    main_content: {},
-                    sidebar_content: {},
-                    footer_content: {}
-                };
-                
-                // Header content
-                const header = document.querySelector('header, .header, #header, [role="banner"]');
-                if (header) {
-                    const headerTitle = header.querySelector('h1, .logo, .brand');
-                    const headerNav = header.querySelector('nav, .nav');
-                    
-                    sections.header_content = {
-                        title: headerTitle ? headerTitle.textContent.trim() : '',
-                        has_navigation: !!headerNav,
-                        background_color: window.getComputedStyle(header).backgroundColor
-                    };
-                }
-                
-                // Navigation content
-                const nav = document.querySelector('nav, .nav, .navigation, [role="navigation"]');
-                if (nav) {
-                    const navLinks = Array.from(nav.querySelectorAll('a')).map(link => ({
-                        text: link.textContent.trim(),
-                        href: link.href,
-                        is_active: link.classList.contains('active') || link.getAttribute('aria-current') === 'page'
-                    })).filter(link => link.text);
-                    
-                    sections.navigation_content = {
-                        links: navLinks,
-                        layout: window.getComputedStyle(nav).display,
-                        position: window.getComputedStyle(nav).position
-                    };
-                }
-                
-                // Main content sections
-                const main = document.querySelector('main, .main, #main, [role="main"]') || document.body;
-                const mainSections = [];
-                
-                // Find content blocks in order
-                const contentElements = main.querySelectorAll('h1, h2, h3, section, article, .section, .content-block, .hero');
-                let currentSection = null;
-                
-                contentElements.forEach(element => {
-                    const rect = element.getBoundingClientRect();
-                    if (rect.height < 20) return; // Skip tiny elements
-                    
-                    if (element.matches('h1, h2, h3')) {
-                        // Start new section with heading
-                        if (currentSection) {
-                            mainSections.push(currentSection);
-                        }
-                        currentSection = {
-                            type: 'text_section',
-                            heading: {
-                                level: element.tagName.toLowerCase(),
-                                text: element.textContent.trim(),
-                                styles: {
-                                    fontSize: window.getComputedStyle(element).fontSize,
-                                    color: window.getComputedStyle(element).color,
-                                    fontWeight: window.getComputedStyle(element).fontWeight
-                                }
-                            },
-                            content: [],
-                            bounds: {
-                                y: rect.y,
-                                height: rect.height
-                            }
-                        };
-                    } else if (element.matches('section, article, .section')) {
-                        // Standalone section
-                        const sectionHeading = element.querySelector('h1, h2, h3, h4');
-                        const sectionContent = Array.from(element.querySelectorAll('p, div')).map(p => p.textContent.trim()).filter(text => text && text.length > 20);
-                        
-                        mainSections.push({
-                            type: 'content_section',
-                            heading: sectionHeading ? {
-                                level: sectionHeading.tagName.toLowerCase(),
-                                text: sectionHeading.textContent.trim()
-                            } : null,
-                            content: sectionContent.slice(0, 3), // Limit content
-                            bounds: {
-                                y: rect.y,
-                                height: rect.height
-                            }
-                        });
-                    }
-                });
-                
-                // Add last section if exists
-                if (currentSection) {
-                    mainSections.push(currentSection);
-                }
-                
-                // Sort sections by vertical position
-                mainSections.sort((a, b) => a.bounds.y - b.bounds.y);
-                
-                sections.main_content = {
-                    sections: mainSections,
-                    total_sections: mainSections.length
-                };
-                
-                return sections;
-            }
-        """)
-        
-        return sections_data
-
-    async def _extract_design_system(self) -> Dict:
-        """Extract the website's design system and visual patterns"""
-        
-        design_data = await self.page.evaluate("""
-            () => {
-                const design = {
-                    colors: {},
-                    typography: {},
-                    spacing: {},
-                    components: {}
-                };
-                
-                // Extract color palette
-                const body = document.body;
-                const bodyStyles = window.getComputedStyle(body);
-                
-                design.colors.primary = {
-                    background: bodyStyles.backgroundColor,
-                    text: bodyStyles.color,
-                    font_family: bodyStyles.fontFamily
-                };
-                
-                // Extract heading styles
-                const headingStyles = {};
-                ['h1', 'h2', 'h3', 'h4'].forEach(tag => {
-                    const element = document.querySelector(tag);
-                    if (element) {
-                        const styles = window.getComputedStyle(element);
-                        headingStyles[tag] = {
-                            fontSize: styles.fontSize,
-                            fontWeight: styles.fontWeight,
-                            color: styles.color,
-                            marginTop: styles.marginTop,
-                            marginBottom: styles.marginBottom,
-                            lineHeight: styles.lineHeight
-                        };
-                    }
-                });
-                design.typography.headings = headingStyles;
-                
-                // Extract button styles
-                const buttons = document.querySelectorAll('button, .btn, .button, input[type="button"], a[class*="btn"]');
-                if (buttons.length > 0) {
-                    const buttonStyles = window.getComputedStyle(buttons[0]);
-                    design.components.button = {
-                        backgroundColor: buttonStyles.backgroundColor,
-                        color: buttonStyles.color,
-                        border: buttonStyles.border,
-                        borderRadius: buttonStyles.borderRadius,
-                        padding: buttonStyles.padding,
-                        fontSize: buttonStyles.fontSize,
-                        fontWeight: buttonStyles.fontWeight
-                    };
-                }
-                
-                // Extract link styles
-                const links = document.querySelectorAll('a:not([class*="btn"])');
-                if (links.length > 0) {
-                    const linkStyles = window.getComputedStyle(links[0]);
-                    design.components.link = {
-                        color: linkStyles.color,
-                        textDecoration: linkStyles.textDecoration,
-                        fontWeight: linkStyles.fontWeight
-                    };
-                }
-                
-                // Extract spacing patterns
-                const spacingElements = document.querySelectorAll('section, article, .section, h1, h2, h3, p');
-                const margins = [];
-                const paddings = [];
-                
-                spacingElements.forEach(element => {
-                    const styles = window.getComputedStyle(element);
-                    const marginTop = parseInt(styles.marginTop) || 0;
-                    const marginBottom = parseInt(styles.marginBottom) || 0;
-                    const paddingTop = parseInt(styles.paddingTop) || 0;
-                    const paddingBottom = parseInt(styles.paddingBottom) || 0;
-                    
-                    if (marginTop > 0) margins.push(marginTop);
-                    if (marginBottom > 0) margins.push(marginBottom);
-                    if (paddingTop > 0) paddings.push(paddingTop);
-                    if (paddingBottom > 0) paddings.push(paddingBottom);
-                });
-                
-                // Find most common spacing values
-                const marginCounts = {};
-                const paddingCounts = {};
-                
-                margins.forEach(margin => {
-                    marginCounts[margin] = (marginCounts[margin] || 0) + 1;
-                });
-                
-                paddings.forEach(padding => {
-                    paddingCounts[padding] = (paddingCounts[padding] || 0) + 1;
-                });
-                
-                design.spacing = {
-                    common_margins: Object.keys(marginCounts).sort((a, b) => marginCounts[b] - marginCounts[a]).slice(0, 3),
-                    common_paddings: Object.keys(paddingCounts).sort((a, b) => paddingCounts[b] - paddingCounts[a]).slice(0, 3)
-                };
-                
-                return design;
-            }
-        """)
-        
-        return design_data
+    async def _design_system_key(self) -> Optional[str]:
+        """Design-system cache key for the loaded page, from its origin and stylesheets"""
+        try:
+            stylesheets = await self.page.evaluate(STYLESHEET_FINGERPRINT_SCRIPT)
+        except Exception as e:
+            logger.debug(f"Stylesheet fingerprint failed: {e}")
+            return None
+        parts = urlsplit(self.page.url)
+        return design_system_cache.make_key(f"{parts.scheme}://{parts.netloc}", stylesheets)
 
-    async def _extract_structured_content(self) -> Dict:
-        """Extract content in its structured form"""
-        
-        content_data = await self.page.evaluate("""
-            () => {
-                const content = {
-                    page_title: document.title,
-                    meta_description: '',
-                    main_heading: '',
-                    headings_hierarchy: [],
-                    text_content: [],
-                    buttons: [],
-                    images: [],
-                    lists: []
-                };
-                
-                // Meta description
-                const metaDesc = document.querySelector('meta[name="description"]');
-                if (metaDesc) {
-                    content.meta_description = metaDesc.getAttribute('content');
-                }
-                
-                // Main heading
-                const h1 = document.querySelector('h1');
-                if (h1) {
-                    content.main_heading = h1.textContent.trim();
-                }
-                
-                // Headings hierarchy
-                const headings = document.querySelectorAll('h1, h2, h3, h4, h5, h6');
-                headings.forEach((heading, index) => {
-                    const text = heading.textContent.trim();
-                    if (text) {
-                        content.headings_hierarchy.push({
-                            level: parseInt(heading.tagName.substring(1)),
-                            text: text,
-                            order: index
-                        });
-                    }
-                });
-                
-                // Text content in order
-                const textElements = document.querySelectorAll('p, div[class*="text"], div[class*="content"]');
-                textElements.forEach(element => {
-                    const text = element.textContent.trim();
-                    if (text && text.length > 30 && text.length < 500) {
-                        // Check if it's not just container with other elements
-                        const hasBlockChildren = element.querySelector('div, p, h1, h2, h3, h4, h5, h6');
-                        if (!hasBlockChildren) {
-                            content.text_content.push(text);
-                        }
-                    }
-                });
-                
-                // Buttons with context
-                const buttons = document.querySelectorAll('button, .btn, .button, input[type="button"], input[type="submit"], a[class*="btn"]');
-                buttons.forEach(button => {
-                    const text = button.textContent.trim() || button.value || button.getAttribute('aria-label');
-                    if (text) {
-                        content.buttons.push({
-                            text: text,
-                            type: button.tagName.toLowerCase(),
-                            href: button.href || '',
-                            classes: button.className || ''
-                        });
-                    }
-                });
-                
-                // Images with context
-                const images = document.querySelectorAll('img');
-                images.forEach(img => {
-                    if (img.src && img.alt) {
-                        content.images.push({
-                            alt: img.alt,
-                            src: img.src,
-                            width: img.naturalWidth || img.width,
-                            height: img.naturalHeight || img.height
-                        });
-                    }
-                });
-                
-                // Lists
-                const lists = document.querySelectorAll('ul, ol');
-                lists.forEach(list => {
-                    const items = Array.from(list.querySelectorAll('li')).map(li => li.textContent.trim()).filter(text => text);
-                    if (items.length > 0) {
-                        content.lists.push({
-                            type: list.tagName.toLowerCase(),
-                            items: items
-                        });
-                    }
-                });
-                
-                return content;
-            }
-        """)
-        
-        return content_data
+    async def _extract_page_bundle(self, skip_design_system: bool = False) -> Dict:
+        """Run all five analysis passes in a single page.evaluate round trip"""
+        return await self.page.evaluate(EXTRACTION_BUNDLE_SCRIPT, {"skip_design_system": skip_design_system})
 
-    async def _analyze_navigation_structure(self) -> Dict:
-        """Analyze navigation structure and patterns"""
-        
-        nav_data = await self.page.evaluate("""
-            () => {
-                const navigation = {
-                    primary_nav: [],
-                    secondary_nav: [],
-                    breadcrumbs: [],
-                    footer_nav: [],
-                    nav_style: 'horizontal'
-                };
-                
-                // Primary navigation
-                const primaryNav = document.querySelector('nav, .nav, .navigation, header nav');
-                if (primaryNav) {
-                    const navLinks = Array.from(primaryNav.querySelectorAll('a')).map(link => ({
-                        text: link.textContent.trim(),
-                        href: link.href,
-                        is_current: link.getAttribute('aria-current') === 'page' || link.classList.contains('active')
-                    })).filter(link => link.text && link.text.length < 50);
-                    
-                    navigation.primary_nav = navLinks;
-                    
-                    // Determine nav style
-                    const navStyles = window.getComputedStyle(primaryNav);
-                    if (navStyles.flexDirection === 'column' || navStyles.display === 'block') {
-                        navigation.nav_style = 'vertical';
-                    } else {
-                        navigation.nav_style = 'horizontal';
-                    }
-                }
-                
-                // Breadcrumbs
-                const breadcrumbs = document.querySelector('.breadcrumbs, .breadcrumb, nav[aria-label*="breadcrumb"]');
-                if (breadcrumbs) {
-                    const crumbs = Array.from(breadcrumbs.querySelectorAll('a, span')).map(crumb => crumb.textContent.trim());
-                    navigation.breadcrumbs = crumbs;
-                }
-                
-                // Footer navigation
-                const footer = document.querySelector('footer');
-                if (footer) {
-                    const footerLinks = Array.from(footer.querySelectorAll('a')).map(link => ({
-                        text: link.textContent.trim(),
-                        href: link.href
-                    })).filter(link => link.text && link.text.length < 50);
-                    
-                    navigation.footer_nav = footerLinks.slice(0, 10); // Limit footer links
-                }
-                
-                return navigation;
-            }
-        """)
-        
-        return nav_data
-
-    async def _capture_screenshot(self) -> str:
-        """Capture high-quality screenshot"""
+    async def _capture_screenshot(self, options: Dict) -> Tuple[bytes, Optional[Dict]]:
+        """Capture a size-bounded screenshot; returns the image bytes and its metadata"""
         try:
-            screenshot_bytes = await self.page.screenshot(
-                full_page=True,
-                type="png",
-                quality=90
-            )
-            return base64.b64encode(screenshot_bytes).decode()
+            shot = await capture_screenshot(self.page, options)
         except Exception as e:
-            print(f"⚠️ Screenshot failed: {e}")
-            return ""
+            logger.debug(f"Screenshot failed: {e}")
+            return b"", None
+        data = shot.pop("data")
+        return data, shot
 
     async def _fallback_scrape(self, url: str) -> Dict:
         """Fallback scraping method"""
         try:
-            print(f"📄 Fallback scraping for: {url}")
+            logger.debug(f"Fallback scraping for: {url}")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+            with span("fallback_fetch"):
+                response = await http_client.fetch_text(url)
             
             return {
                 "success": True,
                 "url": url,
                 "method": "fallback",
-                "screenshot": "",
+                "screenshot": b"",
+                "screenshot_info": None,
                 "layout_structure": {"page_type": "simple", "main_sections": []},
                 "content_sections": {},
                 "design_system": {},
                 "structured_content": {"page_title": "Website", "headings_hierarchy": []},
                 "navigation_analysis": {"primary_nav": []},
-                "html": response.text,
+                "html": response["text"],
                 "css": {},
                 "layout": {}
             }
             
         except Exception as e:
-            print(f"❌ Fallback scraping failed: {e}")
+            logger.debug(f"Fallback scraping failed: {e}")
             return {"success": False, "error": str(e), "url": url}
 
 # Utility function
-async def scrape_website_data(url: str) -> Dict:
+async def scrape_website_data(url: str, settle_options: Optional[Dict] = None,
+                              on_stage: Optional[Callable[[str], None]] = None,
+                              screenshot_options: Optional[Dict] = None,
+                              interception_profile: Optional[str] = None, context=None,
+                              design_system: Optional[Dict] = None) -> Dict:
     """Layout-aware website scraping utility"""
     try:
-        async with LayoutAwareScraper() as scraper:
-            result = await scraper.scrape_website(url)
+        pool = browser_pool if browser_pool.started else None
+        async with LayoutAwareScraper(pool=pool, context=context) as scraper:
+            result = await scraper.scrape_website(
+                url,
+                settle_options=settle_options,
+                on_stage=on_stage,
+                screenshot_options=screenshot_options,
+                interception_profile=interception_profile,
+                design_system=design_system
+            )
             return result
     except Exception as e:
-        print(f"❌ Scraper utility error: {e}")
+        logger.debug(f"Scraper utility error: {e}")
         return {
             "success": False,
             "error": f"Scraper initialization failed: {str(e)}",
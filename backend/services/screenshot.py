@@ -0,0 +1,98 @@
+import asyncio
+import io
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+DEFAULT_SCREENSHOT_OPTIONS = {
+    "mode": "viewport",
+    "format": "jpeg",
+    "quality": 80,
+    "max_height": 4000,
+    "clip": None
+}
+
+# Chromium cannot paint a taller capture in one go; longer pages are cut here
+MAX_CAPTURE_HEIGHT = 16384
+
+PAGE_HEIGHT_SCRIPT = """
+    () => Math.max(
+        document.documentElement ? document.documentElement.scrollHeight : 0,
+        document.body ? document.body.scrollHeight : 0
+    )
+"""
+
+
+def _transcode(raw: bytes, image_format: str, quality: int, max_height: Optional[int]) -> Tuple[bytes, int, int]:
+    """Downscale to max_height and encode in the requested format (CPU-bound, run off the event loop)"""
+    image = Image.open(io.BytesIO(raw))
+    if max_height and image.height > max_height:
+        # thumbnail() lets the JPEG decoder shrink while decoding, so huge captures are never fully inflated
+        image.thumbnail((image.width, max_height), Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    if image_format == "png":
+        image.save(output, format="PNG")
+    else:
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        image.save(output, format=image_format.upper(), quality=quality)
+    return output.getvalue(), image.width, image.height
+
+
+def _image_size(data: bytes) -> Tuple[int, int]:
+    # Only the header is parsed
+    return Image.open(io.BytesIO(data)).size
+
+
+async def capture_screenshot(page, options: Optional[Dict] = None) -> Dict:
+    """Capture the viewport, the full page or a clip, no taller than max_height pixels"""
+
+    opts = {**DEFAULT_SCREENSHOT_OPTIONS, **{k: v for k, v in (options or {}).items() if v is not None}}
+    image_format = opts["format"]
+    quality = opts["quality"]
+    max_height = opts["max_height"]
+    viewport = page.viewport_size or {"width": 1280, "height": 720}
+
+    kwargs = {}
+    if opts["mode"] == "clip" and opts["clip"]:
+        clip = opts["clip"]
+        kwargs["clip"] = clip
+        # Clips may reach below the fold
+        kwargs["full_page"] = True
+        height = clip["height"]
+    elif opts["mode"] == "full":
+        kwargs["full_page"] = True
+        height = await page.evaluate(PAGE_HEIGHT_SCRIPT)
+        if height > MAX_CAPTURE_HEIGHT:
+            kwargs["clip"] = {"x": 0, "y": 0, "width": viewport["width"], "height": MAX_CAPTURE_HEIGHT}
+            height = MAX_CAPTURE_HEIGHT
+    else:
+        height = viewport["height"]
+
+    # Playwright only encodes PNG and JPEG; WebP output and downscaling go through Pillow.
+    # Lossy targets are captured as near-lossless JPEG, which Chromium encodes far faster than PNG.
+    needs_transcode = image_format == "webp" or bool(max_height and height > max_height)
+    if needs_transcode:
+        capture_type = "png" if image_format == "png" else "jpeg"
+        capture_quality = 95
+    else:
+        capture_type = image_format
+        capture_quality = quality
+    if capture_type == "jpeg":
+        kwargs["quality"] = capture_quality
+
+    raw = await page.screenshot(type=capture_type, **kwargs)
+    if needs_transcode:
+        data, width, height = await asyncio.to_thread(_transcode, raw, image_format, quality, max_height)
+    else:
+        data = raw
+        width, height = _image_size(raw)
+
+    return {
+        "data": data,
+        "format": image_format,
+        "width": width,
+        "height": height,
+        "bytes": len(data)
+    }
@@ -0,0 +1,213 @@
+import html
+import math
+import re
+from typing import Dict, List, Tuple
+
+from services.metrics import metrics
+
+SECTION_PARTS = metrics.counter(
+    "clone_section_parts_total", "Page parts of section-parallel generation, by who produced them", ["source"]
+)
+
+STYLE_PATTERN = re.compile(r"<style[^>]*>(.*?)</style>", re.IGNORECASE | re.DOTALL)
+HEAD_PATTERN = re.compile(r"<head[^>]*>.*?</head>", re.IGNORECASE | re.DOTALL)
+BODY_PATTERN = re.compile(r"<body[^>]*>(.*?)</body>", re.IGNORECASE | re.DOTALL)
+FENCE_PATTERN = re.compile(r"```[a-z]*\n?", re.IGNORECASE)
+DOCUMENT_TAG_PATTERN = re.compile(r"</?(?:!doctype|html|head|body|meta|title|link)\b[^>]*>", re.IGNORECASE)
+CSS_COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.DOTALL)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def section_count(scraped_data: Dict) -> int:
+    return len(((scraped_data.get("content_sections") or {}).get("main_content") or {}).get("sections") or [])
+
+
+def plan_parts(scraped_data: Dict, sections_per_part: int, max_parts: int) -> List[Dict]:
+    """Header, groups of consecutive sections and footer; groups grow so the page never needs more than max_parts"""
+    sections = ((scraped_data.get("content_sections") or {}).get("main_content") or {}).get("sections") or []
+    per_part = max(1, sections_per_part, math.ceil(len(sections) / max(1, max_parts - 2)))
+    parts = [{"name": "header", "kind": "header", "sections": []}]
+    for number, start in enumerate(range(0, len(sections), per_part), start=1):
+        parts.append({"name": f"sections-{number}", "kind": "sections", "sections": sections[start:start + per_part]})
+    parts.append({"name": "footer", "kind": "footer", "sections": []})
+    return parts
+
+
+def part_inputs(part: Dict, scraped_data: Dict) -> Tuple[Dict, Dict, Dict]:
+    """Content sections, structured content and navigation one part's prompt is built from"""
+    structured_content = scraped_data.get("structured_content") or {}
+    navigation_analysis = scraped_data.get("navigation_analysis") or {}
+    page = {key: structured_content.get(key) for key in ("page_title", "main_heading")}
+    nav_style = navigation_analysis.get("nav_style", "horizontal")
+
+    if part["kind"] == "header":
+        return {}, page, {"primary_nav": navigation_analysis.get("primary_nav") or [], "nav_style": nav_style,
+                          "breadcrumbs": navigation_analysis.get("breadcrumbs") or []}
+    if part["kind"] == "footer":
+        return {}, page, {"footer_nav": navigation_analysis.get("footer_nav") or [], "nav_style": nav_style}
+    if part["name"] == "sections-1":
+        # The first group holds the hero, which is where the page's calls to action belong
+        page["buttons"] = structured_content.get("buttons") or []
+    return {"main_content": {"sections": part["sections"]}}, page, {}
+
+
+def split_fragment(response: str) -> Tuple[str, str]:
+    """(css, html) from a model response, whether it sent a fragment or a whole document"""
+    text = FENCE_PATTERN.sub("", response or "").strip()
+    css = "\n".join(STYLE_PATTERN.findall(text))
+    text = STYLE_PATTERN.sub("", text)
+    body = BODY_PATTERN.search(text)
+    if body:
+        text = body.group(1)
+    text = DOCUMENT_TAG_PATTERN.sub("", HEAD_PATTERN.sub("", text))
+    return css.strip(), text.strip()
+
+
+def css_statements(css: str) -> List[str]:
+    """Top-level CSS statements: rules and @-blocks whole, plus @import-style one-liners"""
+    css = CSS_COMMENT_PATTERN.sub("", css)
+    statements = []
+    depth = start = 0
+    for index, char in enumerate(css):
+        if char == "{":
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                statements.append(css[start:index + 1].strip())
+                start = index + 1
+        elif char == ";" and depth == 0:
+            statements.append(css[start:index + 1].strip())
+            start = index + 1
+    # Whatever is left was cut off mid-rule and is dropped
+    return [statement for statement in statements if statement and statement != ";"]
+
+
+PAGE_WIDE_SELECTORS = {"html", "body", ":root", "*", "*::before", "*::after"}
+
+
+def drop_page_wide_rules(css: str) -> str:
+    """A part's CSS without rules that only target the whole page, which the base stylesheet owns"""
+    kept = []
+    for statement in css_statements(css):
+        selectors = {selector.strip() for selector in statement.split("{", 1)[0].split(",")}
+        if not statement.startswith("@") and selectors <= PAGE_WIDE_SELECTORS:
+            continue
+        kept.append(statement)
+    return "\n".join(kept)
+
+
+def merge_stylesheets(sheets: List[str]) -> str:
+    """One stylesheet from several; repeated rules are kept once and @import/@charset go first"""
+    seen = set()
+    imports, rules = [], []
+    for sheet in sheets:
+        for statement in css_statements(sheet or ""):
+            key = WHITESPACE_PATTERN.sub(" ", statement)
+            if key in seen:
+                continue
+            seen.add(key)
+            (imports if statement.startswith(("@import", "@charset")) else rules).append(statement)
+    return "\n".join(imports + rules)
+
+
+def base_stylesheet(design_system: Dict, container_width: str = "1200px") -> str:
+    """Page-wide styles from the design system, shared by every generated part"""
+    primary = (design_system.get("colors") or {}).get("primary") or {}
+    headings = (design_system.get("typography") or {}).get("headings") or {}
+    components = design_system.get("components") or {}
+    button = components.get("button") or {}
+    link = components.get("link") or {}
+    if not container_width or container_width == "none":
+        container_width = "1200px"
+
+    rules = [
+        "*, *::before, *::after { box-sizing: border-box; }",
+        f"body {{ margin: 0; background: {primary.get('background', '#ffffff')}; color: {primary.get('text', '#333333')}; "
+        f"font-family: {primary.get('font_family', 'system-ui, -apple-system, sans-serif')}; line-height: 1.6; }}",
+        f".page-container {{ max-width: {container_width}; margin: 0 auto; padding: 0 1.5rem; }}",
+        "main .page-container { display: flex; flex-direction: column; gap: 2.5rem; padding-top: 2rem; padding-bottom: 2rem; }",
+        "img { max-width: 100%; height: auto; }"
+    ]
+    for tag, styles in headings.items():
+        rules.append(f"{tag} {{ font-size: {styles.get('fontSize', 'inherit')}; font-weight: {styles.get('fontWeight', 'bold')}; "
+                     f"color: {styles.get('color', 'inherit')}; }}")
+    if link:
+        rules.append(f"a {{ color: {link.get('color', 'inherit')}; text-decoration: {link.get('textDecoration', 'none')}; }}")
+    if button:
+        rules.append(f"button, .btn {{ background: {button.get('backgroundColor', '#0066cc')}; color: {button.get('color', '#ffffff')}; "
+                     f"border: {button.get('border', 'none')}; border-radius: {button.get('borderRadius', '6px')}; "
+                     f"padding: {button.get('padding', '12px 24px')}; cursor: pointer; }}")
+    return "\n".join(rules)
+
+
+def fallback_fragment(part: Dict, scraped_data: Dict) -> str:
+    """Plain markup for a part the model could not produce, straight from the scraped data"""
+    structured_content = scraped_data.get("structured_content") or {}
+    navigation_analysis = scraped_data.get("navigation_analysis") or {}
+    escape = html.escape
+
+    def links(items: List[Dict]) -> str:
+        return "".join(
+            f'<a href="{escape(item.get("href") or "#", quote=True)}">{escape(item.get("text") or "Link")}</a>'
+            for item in items
+        )
+
+    if part["kind"] == "header":
+        title = escape(structured_content.get("page_title") or "Website")
+        return (f'<div style="display: flex; justify-content: space-between; align-items: center; gap: 1rem; padding: 1rem 0;">'
+                f'<strong>{title}</strong><nav style="display: flex; gap: 1rem;">'
+                f'{links(navigation_analysis.get("primary_nav") or [])}</nav></div>')
+    if part["kind"] == "footer":
+        title = escape(structured_content.get("page_title") or "Website")
+        return (f'<div style="display: flex; flex-wrap: wrap; gap: 1rem; padding: 2rem 0;">'
+                f'{links(navigation_analysis.get("footer_nav") or [])}<span>{title}</span></div>')
+
+    blocks = []
+    for section in part["sections"]:
+        heading = section.get("heading") or {}
+        level = heading.get("level", "h2") if heading.get("level") in ("h1", "h2", "h3", "h4") else "h2"
+        inner = f"<{level}>{escape(heading['text'])}</{level}>" if heading.get("text") else ""
+        inner += "".join(f"<p>{escape(text)}</p>" for text in section.get("content") or [])
+        blocks.append(f"<section>{inner}</section>")
+    return "\n".join(blocks)
+
+
+def stitch_document(scraped_data: Dict, parts: List[Dict], fragments: Dict[str, str], stylesheet: str) -> str:
+    """One page from the generated parts: header, the section groups in page order, footer"""
+    structured_content = scraped_data.get("structured_content") or {}
+    title = html.escape(structured_content.get("page_title") or "Website")
+    description = structured_content.get("meta_description")
+    meta_description = f'\n    <meta name="description" content="{html.escape(description, quote=True)}">' if description else ""
+    groups = "\n".join(
+        f'<div class="part-{part["name"]}">\n{fragments[part["name"]]}\n</div>'
+        for part in parts if part["kind"] == "sections"
+    )
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">{meta_description}
+    <title>{title}</title>
+    <style>
+{stylesheet}
+    </style>
+</head>
+<body>
+<header>
+<div class="page-container">
+{fragments.get("header", "")}
+</div>
+</header>
+<main>
+<div class="page-container">
+{groups}
+</div>
+</main>
+<footer>
+<div class="page-container">
+{fragments.get("footer", "")}
+</div>
+</footer>
+</body>
+</html>"""
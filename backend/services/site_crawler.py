@@ -0,0 +1,254 @@
+import asyncio
+import hashlib
+import os
+import re
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+from urllib.parse import urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+from dotenv import load_dotenv
+
+from services.batch_runner import RateLimiter, origin_of, shared_browser_context
+from services.browser_pool import BrowserPool, browser_pool
+from services.http_client import http_client
+from services.job_scheduler import JobScheduler, QueueFullError, job_scheduler
+from services.job_store import JobStore, job_store
+from services.request_blocking import DOWNLOAD_EXTENSIONS
+
+load_dotenv()
+
+# Runs one page: (job_id, url, options, shared context, design system to reuse, scraped-data callback)
+CrawlPageRunner = Callable[[str, str, Dict, Optional[object], Optional[Dict], Callable[[Dict], None]], Awaitable]
+
+ROBOTS_AGENT = os.getenv("CRAWL_USER_AGENT", "*")
+
+
+def normalize_link(href: str, base_url: str) -> Optional[str]:
+    """Absolute http(s) URL without its fragment, or None for links that are not pages"""
+    if not href:
+        return None
+    parts = urlsplit(urljoin(base_url, href.strip()))
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    if parts.path.lower().endswith(DOWNLOAD_EXTENSIONS):
+        return None
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or "/", parts.query, ""))
+
+
+def nav_links(scraped_data: Dict, include_footer: bool = True) -> List[Dict]:
+    navigation = scraped_data.get("navigation_analysis") or {}
+    links = list(navigation.get("primary_nav") or [])
+    if include_footer:
+        links.extend(navigation.get("footer_nav") or [])
+    return links
+
+
+def page_file_name(url: str, root_url: str, taken: Set[str]) -> str:
+    """Flat, stable file name for a crawled page; the root page is index.html"""
+    if normalize_link(url, url) == normalize_link(root_url, root_url):
+        name = "index"
+    else:
+        parts = urlsplit(url)
+        name = re.sub(r"[^a-z0-9]+", "-", parts.path.lower()).strip("-") or "page"
+        if parts.query:
+            name += "-" + hashlib.sha1(parts.query.encode()).hexdigest()[:6]
+    candidate, suffix = f"{name}.html", 2
+    while candidate in taken:
+        candidate = f"{name}-{suffix}.html"
+        suffix += 1
+    taken.add(candidate)
+    return candidate
+
+
+ANCHOR_PATTERN = re.compile(r"<a\b([^>]*)>(.*?)</a>", re.IGNORECASE | re.DOTALL)
+HREF_PATTERN = re.compile(r"""\bhref\s*=\s*(["'])(.*?)\1""", re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
+def link_pages(html: str, page_url: str, page_files: Dict[str, str], link_texts: Dict[str, str]) -> str:
+    """Point links in a generated page at the other pages of the cloned site
+
+    A link is matched by its href, or by its text when the model did not keep the original href.
+    """
+
+    def rewrite(match: re.Match) -> str:
+        attributes, inner = match.group(1), match.group(2)
+        href_match = HREF_PATTERN.search(attributes)
+        target = None
+        # "#" and other in-page anchors are placeholders, not links to this page
+        if href_match and not href_match.group(2).strip().startswith("#"):
+            target = page_files.get(normalize_link(href_match.group(2), page_url) or "")
+        if target is None:
+            text = " ".join(TAG_PATTERN.sub(" ", inner).split()).lower()
+            target = page_files.get(link_texts.get(text, ""))
+        if target is None:
+            return match.group(0)
+        if href_match:
+            attributes = attributes[:href_match.start()] + f'href="{target}"' + attributes[href_match.end():]
+        else:
+            attributes = f' href="{target}"' + attributes
+        return f"<a{attributes}>{inner}</a>"
+
+    return ANCHOR_PATTERN.sub(rewrite, html)
+
+
+async def load_robots(origin: str) -> RobotFileParser:
+    """robots.txt for an origin; a missing or unreadable file allows everything"""
+    parser = RobotFileParser()
+    try:
+        response = await http_client.fetch_text(f"{origin}/robots.txt")
+        parser.parse(response["text"].splitlines())
+    except Exception:
+        parser.parse([])
+    return parser
+
+
+class SiteCrawl:
+    """One crawl: breadth-first over same-origin navigation links within a depth and page budget"""
+
+    def __init__(self, crawl_id: str, root_url: str, options: Dict, max_depth: int, max_pages: int,
+                 concurrency: int, delay_seconds: float, respect_robots: bool = True,
+                 include_footer: bool = True, store: Optional[JobStore] = None):
+        self.crawl_id = crawl_id
+        self.root_url = normalize_link(root_url, root_url) or root_url
+        self.origin = origin_of(self.root_url)
+        self.options = options
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+        self.delay_seconds = delay_seconds
+        self.respect_robots = respect_robots
+        self.include_footer = include_footer
+        self.store = store or job_store
+        self.root_job_id = str(uuid.uuid4())
+        # url -> job_id, in discovery order
+        self.pages: Dict[str, str] = {}
+        self.pending: Set[str] = set()
+        self.design_system: Optional[Dict] = None
+        self.robots: Optional[RobotFileParser] = None
+
+    def create_root_job(self) -> str:
+        """Record the root page up front so the crawl is visible before it starts running"""
+        self._create_job(self.root_job_id, self.root_url, 0)
+        return self.root_job_id
+
+    def _create_job(self, job_id: str, url: str, depth: int) -> None:
+        options = {**self.options, "crawl": {**self.options.get("crawl", {}), "depth": depth}}
+        self.store.create(job_id, url, options=options, batch_id=self.crawl_id)
+        self.pages[url] = job_id
+        self.pending.add(job_id)
+
+    def _allowed(self, url: str) -> bool:
+        return self.robots is None or self.robots.can_fetch(ROBOTS_AGENT, url)
+
+    async def run(self, run_page: CrawlPageRunner, pool: Optional[BrowserPool] = None,
+                  limiter: Optional[RateLimiter] = None) -> None:
+        """Crawl the site; a limiter shared with other crawls of the same host keeps their page loads apart too"""
+        if self.respect_robots:
+            self.robots = await load_robots(self.origin)
+            crawl_delay = self.robots.crawl_delay(ROBOTS_AGENT)
+            if crawl_delay:
+                self.delay_seconds = max(self.delay_seconds, float(crawl_delay))
+
+        # Politeness: page loads on this host start at least delay_seconds apart
+        limiter = limiter or RateLimiter()
+        slots = asyncio.Semaphore(self.concurrency)
+        design_ready = asyncio.Event()
+        tasks: Set[asyncio.Task] = set()
+
+        def discover(scraped_data: Dict, page_url: str, depth: int) -> None:
+            if depth >= self.max_depth:
+                return
+            for link in nav_links(scraped_data, self.include_footer):
+                url = normalize_link(link.get("href", ""), page_url)
+                if url is None or origin_of(url) != self.origin or url in self.pages:
+                    continue
+                if len(self.pages) >= self.max_pages:
+                    return
+                if not self._allowed(url):
+                    continue
+                job_id = str(uuid.uuid4())
+                self._create_job(job_id, url, depth + 1)
+                tasks.add(asyncio.create_task(crawl_page(job_id, url, depth + 1)))
+
+        async def crawl_page(job_id: str, url: str, depth: int) -> None:
+            def on_scraped(scraped_data: Dict) -> None:
+                if depth == 0:
+                    # Fallback scrapes have no real design system; later pages then extract their own
+                    self.design_system = scraped_data.get("design_system") or None
+                    design_ready.set()
+                discover(scraped_data, url, depth)
+
+            try:
+                if depth > 0:
+                    await design_ready.wait()
+                async with slots:
+                    await limiter.wait(max(self.delay_seconds, 0.0))
+                    await run_page(job_id, url, self.options, context, self.design_system if depth else None,
+                                   on_scraped)
+            finally:
+                if depth == 0:
+                    design_ready.set()
+                self.pending.discard(job_id)
+
+        async with shared_browser_context(pool or browser_pool) as context:
+            if not self._allowed(self.root_url):
+                self.store.update(self.root_job_id, status="failed", error_message="Blocked by robots.txt")
+                self.pending.discard(self.root_job_id)
+                return
+            tasks.add(asyncio.create_task(crawl_page(self.root_job_id, self.root_url, 0)))
+            while tasks:
+                done, _ = await asyncio.wait(tasks)
+                tasks.difference_update(done)
+
+        print(f"🕸️ Crawl {self.crawl_id} finished with {len(self.pages)} page(s)")
+
+
+class CrawlManager:
+    """Crawls running in this process, so their jobs' leases are renewed"""
+
+    def __init__(self, scheduler: Optional[JobScheduler] = None):
+        self.scheduler = scheduler or job_scheduler
+        self.default_max_pages = int(os.getenv("CRAWL_MAX_PAGES", "10"))
+        self.default_concurrency = int(os.getenv("CRAWL_CONCURRENCY", "2"))
+        self.default_delay_seconds = float(os.getenv("CRAWL_DELAY_MS", "1000")) / 1000
+        self._crawls: Dict[str, SiteCrawl] = {}
+        # origin -> politeness limiter shared by every crawl of that host in this process
+        self._host_limiters: Dict[str, RateLimiter] = {}
+
+    def active_job_ids(self) -> List[str]:
+        return [job_id for crawl in self._crawls.values() for job_id in crawl.pending]
+
+    def active_crawls(self) -> int:
+        return len(self._crawls)
+
+    def running_crawl_ids(self) -> List[str]:
+        return list(self._crawls)
+
+    def submit(self, crawl: SiteCrawl, run_page: CrawlPageRunner) -> int:
+        """Queue the crawl as one scheduler job and return its queue position"""
+        self._crawls[crawl.crawl_id] = crawl
+        try:
+            return self.scheduler.submit(f"crawl:{crawl.crawl_id}", lambda: self._run(crawl, run_page))
+        except QueueFullError:
+            self._crawls.pop(crawl.crawl_id, None)
+            raise
+
+    def host_limiter(self, origin: str) -> RateLimiter:
+        """The limiter every crawl of this origin waits on before loading a page"""
+        # Hosts no crawl is queued or running for, once their last delay is over, would otherwise pile up
+        crawling = {crawl.origin for crawl in self._crawls.values()} | {origin}
+        for stale in [key for key, limiter in self._host_limiters.items() if key not in crawling and limiter.idle()]:
+            del self._host_limiters[stale]
+        return self._host_limiters.setdefault(origin, RateLimiter())
+
+    async def _run(self, crawl: SiteCrawl, run_page: CrawlPageRunner) -> None:
+        try:
+            await crawl.run(run_page, limiter=self.host_limiter(crawl.origin))
+        finally:
+            self._crawls.pop(crawl.crawl_id, None)
+
+
+# Shared registry of running crawls
+crawl_manager = CrawlManager()
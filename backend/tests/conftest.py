@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# Module-level singletons read their settings on import, so keep them in memory and out of the tree
+os.environ.setdefault("JOB_STORE", "memory")
+os.environ.setdefault("JOB_BLOB_DIR", tempfile.mkdtemp(prefix="clone-test-jobs-"))
+os.environ["GENERATION_CACHE_DB"] = ""
+os.environ.pop("RESULT_CACHE_DIR", None)
+os.environ.pop("GEMINI_API_KEY", None)
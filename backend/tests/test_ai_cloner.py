@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.stub_model import StubModel
+from services.ai_cloner import LayoutAwareCloner
+from services.generation_cache import GenerationCache
+from services.model_client import ModelClient
+
+
+class BlockingModel:
+    """The stub without its async API, like a client library that only blocks"""
+    model_name = "blocking-stub"
+
+    def __init__(self, **kwargs):
+        self.stub = StubModel(**kwargs)
+
+    def generate_content(self, *args, **kwargs):
+        return self.stub.generate_content(*args, **kwargs)
+
+
+def make_cloner(model) -> LayoutAwareCloner:
+    return LayoutAwareCloner(model=model, cache=GenerationCache(db_path=""), client=ModelClient(hedge_percentile=0))
+
+
+async def count_ticks(until: asyncio.Future) -> int:
+    ticks = 0
+    while not until.done():
+        await asyncio.sleep(0.01)
+        ticks += 1
+    return ticks
+
+
+def test_blocking_model_runs_off_the_event_loop():
+    async def main():
+        cloner = make_cloner(BlockingModel(first_token_ms=200, total_ms=250))
+        try:
+            generation = asyncio.ensure_future(cloner._generate("prompt", timeout=5))
+            ticks = await count_ticks(generation)
+            return await generation, ticks
+        finally:
+            cloner.shutdown()
+
+    text, ticks = asyncio.run(main())
+    assert "</html>" in text
+    # The loop kept running while the model call blocked its thread
+    assert ticks >= 10
+
+
+def test_blocking_model_streams_from_the_executor():
+    async def main():
+        cloner = make_cloner(BlockingModel(first_token_ms=10, total_ms=50, chunk_chars=200))
+        try:
+            return [chunk async for chunk in cloner._generate_stream("prompt", timeout=5)]
+        finally:
+            cloner.shutdown()
+
+    chunks = asyncio.run(main())
+    assert len(chunks) > 1
+    assert "".join(chunks) == StubModel().render("prompt")
+
+
+def test_generation_timeout_cancels_the_call():
+    async def main():
+        cloner = make_cloner(StubModel(first_token_ms=2000, total_ms=2100))
+        started = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await cloner._generate("prompt", timeout=0.1)
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) < 1
+
+
+def test_clone_website_falls_back_after_a_timeout():
+    async def main():
+        cloner = make_cloner(StubModel(first_token_ms=2000, total_ms=2100))
+        return cloner, await cloner.clone_website({"structured_content": {}}, "https://example.com", timeout=0.1)
+
+    cloner, html = asyncio.run(main())
+    assert "<html" in html.lower()
+    assert cloner.fallbacks_built == 1
@@ -0,0 +1,191 @@
+import asyncio
+import gzip
+import json
+import types
+import uuid
+
+import pytest
+from fastapi import Request
+
+import routers.clone as clone_router
+from services.compression import BROTLI_AVAILABLE, choose_encoding
+from services.job_store import job_store
+
+if BROTLI_AVAILABLE:
+    import brotli
+
+URL = "https://example.com/"
+FALLBACK_HTML = "<!DOCTYPE html><html><body>" + "Layout-aware fallback. " * 10 + "</body></html>"
+AI_HTML = "<!DOCTYPE html><html><body>" + "Generated by the model. " * 10 + "</body></html>"
+
+
+class ConnectedRequest:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def parse_sse(message: str):
+    fields = dict(line.split(": ", 1) for line in message.strip().split("\n") if not line.startswith(":"))
+    return (fields["event"], json.loads(fields["data"])) if fields else None
+
+
+def run_slo_race(monkeypatch, generation, while_provisional=None):
+    """Run a job's generate stage against a model that misses its SLO; returns the streamed events"""
+    monkeypatch.setattr(clone_router.website_cloner, "model", "test-model")
+    monkeypatch.setattr(clone_router.website_cloner, "client", types.SimpleNamespace(available=lambda: True))
+    monkeypatch.setattr(clone_router.website_cloner, "build_fallback", lambda scraped_data, url: FALLBACK_HTML)
+    monkeypatch.setattr(clone_router, "run_generation", generation)
+    job_id = str(uuid.uuid4())
+    job_store.create(job_id, URL)
+    job = {"job_id": job_id, "url": URL, "scraped_data": {}, "prompt": None, "parts": None,
+           "options": {"latency_slo_seconds": 0.01}}
+    events = []
+
+    async def wait_for_event(name):
+        while not any(event == name for event, _ in events):
+            await asyncio.sleep(0.005)
+
+    async def scenario():
+        response = await clone_router.stream_clone_events(job_id, ConnectedRequest())
+
+        async def read():
+            async for message in response.body_iterator:
+                if parse_sse(message):
+                    events.append(parse_sse(message))
+
+        reader = asyncio.create_task(read())
+        await asyncio.wait_for(wait_for_event("stage"), timeout=1)
+        stage = asyncio.create_task(clone_router.generate_stage(job))
+        await asyncio.wait_for(wait_for_event("result"), timeout=1)
+        if while_provisional:
+            await while_provisional(job_id)
+        # The fallback went out already, so the pipeline has nothing left to validate
+        assert await stage is False
+        await asyncio.wait_for(reader, timeout=1)
+
+    asyncio.run(scenario())
+    return job_id, events
+
+
+def test_fallback_is_served_provisionally_when_the_model_misses_its_slo(monkeypatch):
+    release = asyncio.Event()
+
+    async def slow_generation(*args):
+        await release.wait()
+        return {"html": AI_HTML, "fallback": False, "cacheable": True}
+
+    async def check_provisional(job_id):
+        status = clone_router.build_job_status(job_id, job_store.get(job_id))
+        assert status.status == "completed" and status.provisional
+        stored = json.loads(job_store.load_result(job_id))
+        assert stored["provisional"] and stored["cloned_html"] == FALLBACK_HTML
+        release.set()
+
+    _, events = run_slo_race(monkeypatch, slow_generation, check_provisional)
+    result = next(data for event, data in events if event == "result")
+    assert result["provisional"] and result["cloned_html"] == FALLBACK_HTML
+
+
+def test_upgrade_ends_the_stream_with_the_ai_result(monkeypatch):
+    async def slow_generation(*args):
+        await asyncio.sleep(0.05)
+        return {"html": AI_HTML, "fallback": False, "cacheable": True}
+
+    job_id, events = run_slo_race(monkeypatch, slow_generation)
+    names = [event for event, _ in events]
+    assert names[-1] == "upgraded" and "final" not in names
+    assert events[-1][1]["cloned_html"] == AI_HTML and not events[-1][1]["provisional"]
+    assert not job_store.get(job_id)["provisional"]
+    assert json.loads(job_store.load_result(job_id))["cloned_html"] == AI_HTML
+
+
+def test_late_failure_keeps_the_fallback_and_ends_the_stream(monkeypatch):
+    async def failing_generation(*args):
+        await asyncio.sleep(0.05)
+        raise RuntimeError("model went away")
+
+    job_id, events = run_slo_race(monkeypatch, failing_generation)
+    assert events[-1][0] == "final"
+    assert events[-1][1]["cloned_html"] == FALLBACK_HTML and not events[-1][1]["provisional"]
+    job_data = job_store.get(job_id)
+    assert job_data["status"] == "completed" and not job_data["provisional"]
+    # The frozen result is refrozen, so clients holding the provisional body see a new ETag
+    assert not json.loads(job_store.load_result(job_id))["provisional"]
+
+
+def finished_job() -> str:
+    job_id = str(uuid.uuid4())
+    job_store.create(job_id, URL)
+    job_store.save_html(job_id, AI_HTML)
+    job_store.update(job_id, status="completed")
+    return job_id
+
+
+def get_result(job_id: str, **headers):
+    scope = {"type": "http", "headers": [(name.replace("_", "-").encode(), value.encode())
+                                         for name, value in headers.items()]}
+    return asyncio.run(clone_router.get_clone_result(job_id, Request(scope)))
+
+
+def test_matching_if_none_match_gets_a_304():
+    job_id = finished_job()
+    etag = get_result(job_id).headers["etag"]
+    bare = etag.strip('"')
+
+    for if_none_match in (etag, f"W/{etag}", f'"stale", {etag}', f'W/"stale" ,W/{etag}', "*"):
+        response = get_result(job_id, if_none_match=if_none_match)
+        assert response.status_code == 304 and response.headers["etag"] == etag, if_none_match
+        assert response.body == b""
+    for if_none_match in ('"stale"', bare, f'"{bare[:-1]}"', ""):
+        assert get_result(job_id, if_none_match=if_none_match).status_code == 200, if_none_match
+
+
+def test_etag_matches():
+    assert clone_router.etag_matches('W/"abc"', '"abc"')
+    assert clone_router.etag_matches(' "x" , "abc" ', '"abc"')
+    assert clone_router.etag_matches(" * ", '"abc"')
+    assert not clone_router.etag_matches(None, '"abc"')
+    assert not clone_router.etag_matches('"abcd"', '"abc"')
+
+
+@pytest.mark.skipif(not BROTLI_AVAILABLE, reason="brotli is not installed")
+def test_etag_is_the_same_for_every_encoding():
+    job_id = finished_job()
+    identity = get_result(job_id)
+    gzipped = get_result(job_id, accept_encoding="gzip")
+    brotlied = get_result(job_id, accept_encoding="gzip, deflate, br")
+
+    assert "content-encoding" not in identity.headers
+    assert gzipped.headers["content-encoding"] == "gzip" and brotlied.headers["content-encoding"] == "br"
+    assert identity.headers["etag"] == gzipped.headers["etag"] == brotlied.headers["etag"]
+    assert all(response.headers["vary"] == "Accept-Encoding" for response in (identity, gzipped, brotlied))
+    assert gzip.decompress(gzipped.body) == brotli.decompress(brotlied.body) == identity.body
+    assert json.loads(identity.body)["cloned_html"] == AI_HTML
+    # A 304 for one encoding holds for the others
+    assert get_result(job_id, accept_encoding="br", if_none_match=gzipped.headers["etag"]).status_code == 304
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("GZIP, deflate", "gzip"),
+    ("br, gzip", "br"),
+    ("gzip, br", "br"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("br; q = 0, gzip;level=1;q=0.8", "gzip"),
+    ("br;q=0, gzip;q=0", None),
+    ("*", "br"),
+    ("*;q=0, identity", None),
+    ("gzip;q=0, *", "br"),
+    ("br;q=bogus, gzip", "gzip")
+])
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding, available=("br", "gzip")) == expected
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [("br", None), ("br, gzip", "gzip"), ("*", "gzip"), ("gzip;q=0", None)])
+def test_choose_encoding_without_brotli(accept_encoding, expected):
+    assert choose_encoding(accept_encoding, available=("gzip",)) == expected
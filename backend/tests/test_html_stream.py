@@ -0,0 +1,100 @@
+import pytest
+
+from services.ai_cloner import LayoutAwareCloner
+from services.html_stream import IncrementalHtmlCleaner, IncrementalStructureCheck
+
+cloner = LayoutAwareCloner(model=None)
+
+PAGE = (
+    "<!DOCTYPE html>\n<html>\n<head><title>Acme</title><style>body { display: flex; }</style></head>\n<body>\n"
+    "<header><nav><a href=\"/\">Home</a></nav></header>\n<main>\n"
+    + "".join(f"<section><h2>Welcome to Acme {index}</h2><p>{'Copy ' * 40}</p><a>Sign up</a></section>\n"
+              for index in range(12))
+    + "</main>\n</body>\n</html>"
+)
+STRUCTURED_CONTENT = {"main_heading": "Welcome to Acme", "buttons": [{"text": "Sign up"}]}
+
+RESPONSES = [
+    f"```html\n{PAGE}\n```",
+    f"Here is the page you asked for:\n\n```html\n{PAGE}\n```\nLet me know if you need changes.",
+    f"Sure!\n{PAGE.replace('<!DOCTYPE html>', '')}\nDone.",
+    PAGE,
+    "```html\n<div>No document markers at all</div>\n```"
+]
+
+
+def chunked(text: str, size: int):
+    return [text[index:index + size] for index in range(0, len(text), size)]
+
+
+def clean(chunks) -> str:
+    cleaner = IncrementalHtmlCleaner()
+    return "".join(cleaner.feed(chunk) for chunk in chunks) + cleaner.flush()
+
+
+def legacy_is_well_structured_html(html: str, structured_content: dict) -> bool:
+    """The check as it was before it ran chunk by chunk"""
+    if len(html) < 2000:
+        return False
+    quality_checks = [
+        '<!DOCTYPE html>' in html,
+        '<html>' in html and '</html>' in html,
+        '<head>' in html and '</head>' in html,
+        '<body>' in html and '</body>' in html,
+        '<header>' in html or '<nav>' in html,
+        '<main>' in html or '<section>' in html,
+        '<style>' in html,
+        'display:' in html or 'flex' in html or 'grid' in html,
+        html.count('<') > 40,
+    ]
+    main_heading = structured_content.get('main_heading', '')
+    if main_heading:
+        quality_checks.append(main_heading.lower()[:30] in html.lower())
+    buttons = structured_content.get('buttons', [])
+    if buttons:
+        button_texts = [b.get('text', '')[:20] for b in buttons[:2]]
+        quality_checks.append(any(text.lower() in html.lower() for text in button_texts if text))
+    return sum(quality_checks) >= 8
+
+
+@pytest.mark.parametrize("response", RESPONSES)
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 100_000])
+def test_cleaner_matches_the_one_shot_extractor_however_the_response_is_split(response, size):
+    # Fences, <!DOCTYPE html>, <html> and </html> all end up split across chunks at size 1
+    assert clean(chunked(response, size)).strip() == cloner._extract_clean_html(response).strip()
+
+
+def test_cleaner_stops_at_the_end_of_the_document():
+    cleaner = IncrementalHtmlCleaner()
+    emitted = "".join(cleaner.feed(char) for char in f"{PAGE}\n```\nTrailing chatter <p>")
+    assert emitted + cleaner.flush() == PAGE
+    assert cleaner.feed("more") == ""
+
+
+def test_truncated_document_drops_the_chatter_before_it():
+    # The old extractor keeps the chatter when </html> never arrives; the cleaner has
+    # already emitted the document from its start by the time that is known
+    response = "Here is the page:\n```html\n" + PAGE[:len(PAGE) // 2]
+    assert cloner._extract_clean_html(response).startswith("Here is the page:")
+    assert clean(chunked(response, 1)) == PAGE[:len(PAGE) // 2]
+
+
+@pytest.mark.parametrize("structured_content", [
+    STRUCTURED_CONTENT,
+    {"main_heading": "A heading the page never mentions", "buttons": [{"text": "Nowhere"}]},
+    {}
+])
+@pytest.mark.parametrize("html", [PAGE, PAGE.replace("<!DOCTYPE html>", "").replace("<style>", "<link>"), PAGE[:1900]])
+def test_structure_check_matches_the_old_check_chunk_by_chunk(html, structured_content):
+    expected = legacy_is_well_structured_html(html, structured_content)
+    assert cloner._is_well_structured_html(html, structured_content) == expected
+    for size in (1, 5, 29):
+        check = IncrementalStructureCheck(structured_content)
+        for chunk in chunked(html, size):
+            check.feed(chunk)
+        assert check.passed() == expected
+
+
+def test_structure_check_results_differ_between_the_sample_pages():
+    assert legacy_is_well_structured_html(PAGE, STRUCTURED_CONTENT)
+    assert not legacy_is_well_structured_html(PAGE[:1900], STRUCTURED_CONTENT)
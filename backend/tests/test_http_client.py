@@ -0,0 +1,139 @@
+import asyncio
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from services.http_client import AsyncHttpClient, ResponseTooLargeError
+
+PAGES = {
+    "/header-charset": ("text/html; charset=iso-8859-1", "<p>Café crème</p>".encode("latin-1")),
+    "/meta-charset": ("text/html", b'<html><head><meta charset="windows-1252"></head><body>' +
+                      "“Naïve” – ok".encode("cp1252") + b"</body></html>"),
+    "/http-equiv-charset": ("text/html", b'<meta http-equiv="Content-Type" content="text/html; charset=ISO-8859-1">' +
+                            b" " * 2000 + "déjà vu".encode("latin-1")),
+    "/no-charset": ("text/html", "<p>ünïcødé</p>".encode("utf-8")),
+    "/large": ("text/html", b"x" * 5000)
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.client_ports.append(self.client_address[1])
+        if self.path == "/slow":
+            time.sleep(0.5)
+        if self.path == "/streamed":
+            # No Content-Length: the body runs until the connection closes
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for _ in range(10):
+                self.wfile.write(b"y" * 500)
+                self.wfile.flush()
+            self.close_connection = True
+            return
+        content_type, body = PAGES.get(self.path, ("text/plain", b"ok"))
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-body is what the size cap and timeout tests do
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = Server(("127.0.0.1", 0), Handler)
+    httpd.client_ports = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def fetch(url: str, client: AsyncHttpClient = None, times: int = 1):
+    client = client or AsyncHttpClient()
+
+    async def main():
+        try:
+            return [await client.fetch_text(url) for _ in range(times)]
+        finally:
+            await client.stop()
+
+    results = asyncio.run(main())
+    return results[0] if times == 1 else results
+
+
+def test_charset_comes_from_the_headers(server):
+    _, base = server
+    assert fetch(f"{base}/header-charset")["text"] == "<p>Café crème</p>"
+
+
+def test_charset_comes_from_meta_tags_without_a_header(server):
+    _, base = server
+    assert "“Naïve” – ok" in fetch(f"{base}/meta-charset")["text"]
+    # The declaration is found even though the body runs past the sniffed prefix
+    assert fetch(f"{base}/http-equiv-charset")["text"].endswith("déjà vu")
+    assert fetch(f"{base}/no-charset")["text"] == "<p>ünïcødé</p>"
+
+
+def test_declared_length_over_the_cap_is_refused(server):
+    _, base = server
+    with pytest.raises(ResponseTooLargeError, match="5000 bytes"):
+        fetch(f"{base}/large", AsyncHttpClient(max_response_bytes=1000))
+
+
+def test_streamed_body_over_the_cap_is_refused(server):
+    _, base = server
+    with pytest.raises(ResponseTooLargeError, match="exceeded 1000 bytes"):
+        fetch(f"{base}/streamed", AsyncHttpClient(max_response_bytes=1000))
+    assert fetch(f"{base}/streamed", AsyncHttpClient(max_response_bytes=5000))["bytes"] == 5000
+
+
+def test_read_timeout(server):
+    _, base = server
+    with pytest.raises(httpx.ReadTimeout):
+        fetch(f"{base}/slow", AsyncHttpClient(read_timeout=0.1))
+
+
+def test_connect_timeout():
+    # A listener whose backlog is full never completes another handshake
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(0)
+    backlog = []
+    for _ in range(4):
+        filler = socket.socket()
+        filler.setblocking(False)
+        filler.connect_ex(listener.getsockname())
+        backlog.append(filler)
+    try:
+        with pytest.raises(httpx.ConnectTimeout):
+            fetch(f"http://127.0.0.1:{listener.getsockname()[1]}/", AsyncHttpClient(connect_timeout=0.2))
+    finally:
+        for filler in backlog:
+            filler.close()
+        listener.close()
+
+
+def test_pooled_connection_is_reused(server):
+    httpd, base = server
+    results = fetch(f"{base}/ok", times=3)
+
+    assert [result["text"] for result in results] == ["ok"] * 3
+    assert len(httpd.client_ports) == 3 and len(set(httpd.client_ports)) == 1
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import app.main as main
+import routers.clone as clone_router
+from services.job_store import MemoryJobStore, SQLiteJobStore
+
+
+def make_worker(tmp_path, host=None, pid=None, **kwargs) -> SQLiteJobStore:
+    """A job store as one worker process sees it; host and pid stand in for another process"""
+    store = SQLiteJobStore(db_path=str(tmp_path / "jobs.sqlite3"), blob_dir=str(tmp_path / "blobs"), **kwargs)
+    if host or pid:
+        store.worker_id = f"{host or store.hostname}:{pid or os.getpid()}:{uuid.uuid4().hex[:8]}"
+    return store
+
+
+def dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def start_jobs(store: SQLiteJobStore) -> None:
+    store.create("queued", "https://example.com/a", options={"generation_mode": "sections"})
+    store.create("running", "https://example.com/b")
+    store.update("running", status="processing")
+    store.create("done", "https://example.com/c")
+    store.update("done", status="completed")
+
+
+def test_jobs_of_a_silent_worker_are_claimed_once_its_lease_runs_out(tmp_path):
+    remote = make_worker(tmp_path, host="other-host", lease_seconds=0.05)
+    start_jobs(remote)
+
+    first = make_worker(tmp_path, lease_seconds=0.05)
+    second = make_worker(tmp_path, host="third-host", lease_seconds=0.05)
+    # Another host can't be checked, so its jobs wait out the lease
+    assert first.claim_interrupted_jobs() == []
+    time.sleep(0.1)
+    claimed = first.claim_interrupted_jobs()
+
+    assert [job["job_id"] for job in claimed] == ["queued", "running"]
+    assert all(job["status"] == "pending" and job["worker_id"] == first.worker_id for job in claimed)
+    # Options come back as submitted, so the job can be requeued unchanged
+    assert claimed[0]["options"] == {"generation_mode": "sections"}
+    assert second.claim_interrupted_jobs() == []
+
+
+def test_heartbeats_keep_a_live_workers_jobs(tmp_path):
+    # The parent process is alive, so only the heartbeat decides
+    live = make_worker(tmp_path, pid=os.getppid(), lease_seconds=0.2)
+    live.create("running", "https://example.com/")
+    live.update("running", status="processing")
+
+    other = make_worker(tmp_path, lease_seconds=0.2)
+    for _ in range(3):
+        time.sleep(0.1)
+        live.heartbeat(["running"])
+        assert other.claim_interrupted_jobs() == []
+
+    time.sleep(0.25)
+    assert [job["job_id"] for job in other.claim_interrupted_jobs()] == ["running"]
+
+
+def test_restarted_worker_takes_back_its_jobs_without_waiting(tmp_path):
+    # Same host and pid with another nonce: this process before a restart
+    before_restart = make_worker(tmp_path, pid=os.getpid(), lease_seconds=60)
+    start_jobs(before_restart)
+
+    after_restart = make_worker(tmp_path, lease_seconds=60)
+    assert [job["job_id"] for job in after_restart.claim_interrupted_jobs()] == ["queued", "running"]
+
+
+def test_jobs_of_a_dead_worker_on_this_host_are_claimed_without_waiting(tmp_path):
+    crashed = make_worker(tmp_path, pid=dead_pid(), lease_seconds=60)
+    start_jobs(crashed)
+
+    survivor = make_worker(tmp_path, lease_seconds=60)
+    assert [job["job_id"] for job in survivor.claim_interrupted_jobs()] == ["queued", "running"]
+
+
+def test_lease_loop_requeues_jobs_of_a_worker_that_dies_later(tmp_path, monkeypatch):
+    remote = make_worker(tmp_path, host="other-host", lease_seconds=0.1)
+    me = make_worker(tmp_path, lease_seconds=0.1)
+    submitted = []
+    monkeypatch.setattr(main, "job_store", me)
+    monkeypatch.setattr(clone_router, "job_store", me)
+    monkeypatch.setattr(clone_router.job_scheduler, "submit", lambda job_id, run: submitted.append(job_id) or 1)
+
+    async def scenario():
+        # Startup recovery has already run and found nothing; the other worker dies afterwards
+        await main.refresh_job_leases()
+        remote.create("running", "https://example.com/")
+        remote.update("running", status="processing")
+        await main.refresh_job_leases()
+        assert submitted == []
+        await asyncio.sleep(0.15)
+        await main.refresh_job_leases()
+
+    asyncio.run(scenario())
+    assert submitted == ["running"]
+    assert me.get("running")["worker_id"] == me.worker_id
+
+
+def test_memory_store_has_nothing_to_recover(tmp_path):
+    store = MemoryJobStore(blob_dir=str(tmp_path / "blobs"))
+    store.create("job", "https://example.com/")
+
+    assert store.claim_interrupted_jobs() == []
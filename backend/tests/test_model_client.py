@@ -0,0 +1,248 @@
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.stub_model import StubModelError
+from services.model_client import (
+    CLOSED, HALF_OPEN, OPEN, ModelClient, ModelUnavailableError, TokenBucket, is_retryable
+)
+
+
+def make_client(**kwargs) -> ModelClient:
+    settings = {"backoff_base": 0.001, "backoff_max": 0.01, "hedge_percentile": 0}
+    settings.update(kwargs)
+    return ModelClient(**settings)
+
+
+class FlakyRequest:
+    """Fails with the given errors in turn, then answers"""
+
+    def __init__(self, *errors, result="ok", delay=0.0):
+        self.errors = list(errors)
+        self.result = result
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+
+def test_is_retryable():
+    assert is_retryable(StubModelError(503))
+    assert is_retryable(StubModelError(429))
+    assert is_retryable(ConnectionResetError())
+    assert not is_retryable(StubModelError(400))
+    assert not is_retryable(ValueError("blocked response"))
+
+
+def test_retries_transient_errors():
+    client = make_client(max_retries=2)
+    request = FlakyRequest(StubModelError(503), StubModelError(500))
+
+    assert asyncio.run(client.call(request, timeout=5)) == "ok"
+    assert request.calls == 3
+    assert client.retries == 2
+    assert client.consecutive_failures == 0
+
+
+def test_gives_up_after_max_retries():
+    client = make_client(max_retries=1, failure_threshold=10)
+    request = FlakyRequest(StubModelError(503), StubModelError(503), StubModelError(503))
+
+    with pytest.raises(StubModelError):
+        asyncio.run(client.call(request, timeout=5))
+    assert request.calls == 2
+
+
+def test_does_not_retry_bad_requests_or_count_them_against_the_model():
+    client = make_client(max_retries=2, failure_threshold=1)
+    request = FlakyRequest(ValueError("blocked response"))
+
+    with pytest.raises(ValueError):
+        asyncio.run(client.call(request, timeout=5))
+    assert request.calls == 1
+    assert client.state == CLOSED
+
+
+def test_breaker_opens_after_consecutive_failures():
+    client = make_client(max_retries=0, failure_threshold=3, reset_seconds=60)
+
+    async def main():
+        for _ in range(3):
+            with pytest.raises(StubModelError):
+                await client.call(FlakyRequest(StubModelError(503)), timeout=5)
+        assert client.state == OPEN
+        assert not client.available()
+
+        request = FlakyRequest()
+        with pytest.raises(ModelUnavailableError):
+            await client.call(request, timeout=5)
+        assert request.calls == 0
+
+    asyncio.run(main())
+    assert client.stats()["rejected_while_open"] == 1
+
+
+def test_half_open_probe_closes_the_breaker():
+    client = make_client(max_retries=0, failure_threshold=1, reset_seconds=0.05)
+
+    async def main():
+        with pytest.raises(StubModelError):
+            await client.call(FlakyRequest(StubModelError(503)), timeout=5)
+        await asyncio.sleep(0.06)
+        assert client.available()
+
+        probe = asyncio.ensure_future(client.call(FlakyRequest(delay=0.05), timeout=5))
+        await asyncio.sleep(0.01)
+        assert client.state == HALF_OPEN
+        # Only the probe goes through while the breaker is half open
+        with pytest.raises(ModelUnavailableError):
+            await client.call(FlakyRequest(), timeout=5)
+        assert await probe == "ok"
+
+    asyncio.run(main())
+    assert client.state == CLOSED
+
+
+def test_failed_probe_reopens_the_breaker():
+    client = make_client(max_retries=0, failure_threshold=1, reset_seconds=0.05)
+
+    async def main():
+        with pytest.raises(StubModelError):
+            await client.call(FlakyRequest(StubModelError(503)), timeout=5)
+        await asyncio.sleep(0.06)
+        with pytest.raises(StubModelError):
+            await client.call(FlakyRequest(StubModelError(503)), timeout=5)
+        assert client.state == OPEN
+        assert not client.available()
+
+    asyncio.run(main())
+
+
+def test_slow_call_is_hedged_and_the_loser_cancelled():
+    client = make_client(hedge_percentile=95, hedge_min_samples=5)
+    client.latencies["call"].extend([0.02] * 5)
+    cancelled = []
+    calls = 0
+
+    async def request():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                await asyncio.sleep(2)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return "slow"
+        return "fast"
+
+    started = time.monotonic()
+    assert asyncio.run(client.call(request, timeout=5)) == "fast"
+    assert time.monotonic() - started < 1
+    assert client.hedges == 1
+    assert cancelled == [True]
+
+
+def test_no_hedge_until_enough_samples():
+    client = make_client(hedge_percentile=95, hedge_min_samples=5)
+    client.latencies["call"].extend([0.02] * 4)
+
+    assert client.hedge_delay() is None
+    assert asyncio.run(client.call(FlakyRequest(delay=0.1), timeout=5)) == "ok"
+    assert client.hedges == 0
+
+
+def test_stream_is_hedged_on_its_first_chunk_and_the_loser_closed():
+    client = make_client(hedge_percentile=95, hedge_min_samples=5)
+    client.latencies["stream"].extend([0.02] * 5)
+    closed = []
+    opened = 0
+
+    def open_stream():
+        nonlocal opened
+        opened += 1
+        name = f"stream-{opened}"
+
+        async def chunks():
+            try:
+                if name == "stream-1":
+                    await asyncio.sleep(2)
+                for text in ("<html>", name, "</html>"):
+                    yield text
+            finally:
+                closed.append(name)
+
+        return chunks()
+
+    async def main():
+        return [text async for text in client.stream(open_stream, timeout=5)]
+
+    started = time.monotonic()
+    assert asyncio.run(main()) == ["<html>", "stream-2", "</html>"]
+    assert time.monotonic() - started < 1
+    assert client.hedges == 1
+    assert sorted(closed) == ["stream-1", "stream-2"]
+
+
+def test_stream_is_retried_only_before_its_first_chunk():
+    client = make_client(max_retries=2)
+    opened = 0
+
+    def open_stream():
+        nonlocal opened
+        opened += 1
+        attempt = opened
+
+        async def chunks():
+            if attempt == 1:
+                raise StubModelError(503)
+            yield "<html>"
+            if attempt == 2:
+                raise StubModelError(503)
+            yield "</html>"
+
+        return chunks()
+
+    async def main():
+        received = []
+        with pytest.raises(StubModelError):
+            async for text in client.stream(open_stream, timeout=5):
+                received.append(text)
+        return received
+
+    # The first attempt failed before any text and was retried; the second failed after "<html>"
+    assert asyncio.run(main()) == ["<html>"]
+    assert opened == 2
+    assert client.retries == 1
+
+
+def test_token_bucket_paces_requests():
+    async def main():
+        bucket = TokenBucket(rate=20, capacity=2)
+        started = time.monotonic()
+        for _ in range(6):
+            await bucket.acquire()
+        elapsed = time.monotonic() - started
+        assert not bucket.try_acquire()
+        return elapsed
+
+    # Two from the burst, then four at 50ms each
+    assert 0.15 < asyncio.run(main()) < 1
+
+
+def test_rate_limit_wait_is_bounded_by_the_timeout():
+    client = make_client(tokens_per_minute=60)
+
+    async def main():
+        # The bucket holds ten seconds of quota: ten tokens
+        assert await client.call(FlakyRequest(), timeout=5, tokens=10) == "ok"
+        with pytest.raises(asyncio.TimeoutError):
+            await client.call(FlakyRequest(), timeout=0.1, tokens=10)
+
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from services.pipeline import StagedPipeline
+
+
+def recording_stage(name, log, delay=0.0, result=True):
+    async def handler(job):
+        log.append((name, job["id"]))
+        await asyncio.sleep(delay)
+        return result
+    return handler
+
+
+def test_runs_stages_in_order_without_workers():
+    log = []
+    pipeline = StagedPipeline()
+    pipeline.add_stage("fetch", recording_stage("fetch", log))
+    pipeline.add_stage("generate", recording_stage("generate", log, result=False))
+    pipeline.add_stage("validate", recording_stage("validate", log))
+
+    asyncio.run(pipeline.run({"id": 1}))
+    # A stage returning False finishes the job early
+    assert log == [("fetch", 1), ("generate", 1)]
+
+
+def test_started_pipeline_overlaps_stages_and_applies_backpressure():
+    log = []
+    pipeline = StagedPipeline(queue_size=1)
+    pipeline.add_stage("fetch", recording_stage("fetch", log, delay=0.01), workers=2)
+    pipeline.add_stage("generate", recording_stage("generate", log, delay=0.1))
+
+    async def main():
+        await pipeline.start()
+        try:
+            jobs = [asyncio.ensure_future(pipeline.run({"id": index})) for index in range(6)]
+            await asyncio.sleep(0.05)
+            # One job generating, one waiting in the generate queue, two fetchers blocked handing off
+            fetched_early = sum(1 for stage, _ in log if stage == "fetch")
+            stats = pipeline.stats()
+            finished = await asyncio.gather(*jobs)
+            return fetched_early, stats, finished
+        finally:
+            await pipeline.stop()
+
+    fetched_early, stats, finished = asyncio.run(main())
+    assert fetched_early == 4
+    assert stats["stages"]["generate"]["active"] == 1
+    assert stats["jobs_in_flight"] == 6
+    assert [job["id"] for job in finished] == list(range(6))
+    assert pipeline.stats()["stages"]["generate"]["processed"] == 6
+
+
+def test_stage_errors_reach_the_caller():
+    async def broken(job):
+        raise ValueError("scrape failed")
+
+    pipeline = StagedPipeline()
+    pipeline.add_stage("fetch", broken)
+
+    async def main():
+        await pipeline.start()
+        try:
+            with pytest.raises(ValueError):
+                await pipeline.run({"id": 1})
+            # The worker survives and takes the next job
+            with pytest.raises(ValueError):
+                await asyncio.wait_for(pipeline.run({"id": 2}), timeout=1)
+        finally:
+            await pipeline.stop()
+
+    asyncio.run(main())
+
+
+def test_workers_can_only_be_resized_while_stopped():
+    pipeline = StagedPipeline()
+    pipeline.add_stage("generate", recording_stage("generate", []))
+    pipeline.set_workers("generate", 3)
+
+    async def main():
+        await pipeline.start()
+        try:
+            assert len(pipeline._workers) == 3
+            with pytest.raises(RuntimeError):
+                pipeline.set_workers("generate", 1)
+        finally:
+            await pipeline.stop()
+
+    asyncio.run(main())
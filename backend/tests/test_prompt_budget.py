@@ -0,0 +1,60 @@
+from services.prompt_budget import compact_page_content, estimate_tokens
+
+
+def make_page(sections: int = 12):
+    content_sections = {"main_content": {"sections": [
+        {
+            "heading": {"level": "h2", "text": f"Section {index} heading"},
+            "bounds": {"y": index * 400},
+            "content": [f"Paragraph {index}.{item} " + "with a fair amount of body copy " * 4 for item in range(3)]
+        }
+        for index in range(sections)
+    ]}}
+    structured_content = {
+        "page_title": "Example",
+        "main_heading": "Welcome",
+        # The first text item repeats section 0's copy and should be dropped as a duplicate
+        "text_content": [content_sections["main_content"]["sections"][0]["content"][0], "Unrelated footer blurb " * 3],
+        "buttons": [{"text": "Sign up"}, {"text": "Learn more"}]
+    }
+    navigation_analysis = {
+        "primary_nav": [{"text": "Home", "is_current": True}, {"text": "Pricing"}],
+        "footer_nav": [{"text": "Privacy"}],
+        "nav_style": "horizontal"
+    }
+    return content_sections, structured_content, navigation_analysis
+
+
+def test_everything_fits_a_generous_budget():
+    result = compact_page_content(*make_page(), token_budget=100_000)
+    report = result["report"]
+
+    assert report["items_over_budget"] == 0
+    assert report["duplicates_dropped"] == 1
+    assert "  1. H2: Section 0 heading" in result["content"]
+    assert "Sign up" in result["content"]
+    assert "  - Home (CURRENT)" in result["navigation"]
+    assert "Privacy" in result["navigation"]
+
+
+def test_tight_budget_keeps_headings_navigation_and_the_fold_first():
+    budget = 300
+    result = compact_page_content(*make_page(), token_budget=budget)
+    report = result["report"]
+
+    assert report["content_tokens"] <= budget
+    assert report["items_over_budget"] > 0
+    # The title lines are always there, then the most important items
+    assert result["content"].startswith("Page Title: Example\nMain Heading: Welcome")
+    assert "H2: Section 0 heading" in result["content"]
+    assert "Paragraph 0.0" in result["content"]
+    assert "Paragraph 11.2" not in result["content"]
+    assert "  - Pricing" in result["navigation"]
+
+
+def test_sections_stay_in_page_order_and_numbered():
+    content = compact_page_content(*make_page(4), token_budget=100_000)["content"]
+    positions = [content.index(f"Section {index} heading") for index in range(4)]
+
+    assert positions == sorted(positions)
+    assert "  4. H2: Section 3 heading" in content
@@ -0,0 +1,97 @@
+import asyncio
+import os
+import time
+
+from routers.clone import cache_variant
+from services.request_blocking import DEFAULT_INTERCEPTION_PROFILE
+from services.result_cache import DiskCacheBackend, ResultCache, normalize_url
+
+STYLES = {"interception_profile": "styles", "generation_mode": "single"}
+STRUCTURE_ONLY = {"interception_profile": "structure-only", "generation_mode": "single"}
+SECTIONS = {"interception_profile": "styles", "generation_mode": "sections"}
+
+
+def test_normalize_url_folds_trivial_differences():
+    assert normalize_url("Example.com/") == "https://example.com/"
+    assert normalize_url("https://EXAMPLE.com:443/docs/?b=2&a=1#top") == "https://example.com/docs?a=1&b=2"
+    assert normalize_url("https://example.com/?utm_source=x&gclid=y&id=3") == "https://example.com/?id=3"
+    assert normalize_url("http://example.com:8080/") != normalize_url("http://example.com/")
+
+
+def test_key_depends_on_the_variant():
+    cache = ResultCache(max_bytes=1 << 20)
+    url = "https://example.com/"
+
+    keys = {cache.make_key(url, variant) for variant in (None, STYLES, STRUCTURE_ONLY, SECTIONS)}
+    assert len(keys) == 4
+    # Same variant in any key order, same URL in any spelling
+    assert cache.make_key("example.com", dict(reversed(list(STYLES.items())))) == cache.make_key(url, STYLES)
+
+
+def test_results_are_only_shared_within_a_variant():
+    cache = ResultCache(max_bytes=1 << 20)
+    url = "https://example.com/"
+
+    async def main():
+        await cache.put(url, {"title": "Example", "screenshot": b"png"}, "<html></html>", STYLES)
+        return (
+            await cache.get(url, STYLES),
+            await cache.get(url, STRUCTURE_ONLY),
+            await cache.get(url, SECTIONS)
+        )
+
+    same, structure_only, sections = asyncio.run(main())
+    assert same == {"scraped_data": {"title": "Example"}, "cloned_html": "<html></html>"}
+    assert structure_only is None
+    assert sections is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_cache_variant_resolves_profile_and_mode():
+    assert cache_variant({"interception_profile": "structure-only", "generation_mode": "sections"}) == {
+        "interception_profile": "structure-only", "generation_mode": "sections"
+    }
+    # Screenshot jobs load everything unless told otherwise, like the scraper does
+    assert cache_variant({"screenshot": {"mode": "viewport"}})["interception_profile"] == "full"
+    assert cache_variant({})["interception_profile"] == DEFAULT_INTERCEPTION_PROFILE
+    assert cache_variant({"interception_profile": "bogus"}) == cache_variant({})
+
+
+def test_disk_backend_keeps_a_running_total_and_evicts_least_recent(tmp_path):
+    disk = DiskCacheBackend(str(tmp_path), max_bytes=250, ttl_seconds=60)
+    for key in ("a", "b"):
+        disk.set(key, b"x" * 100)
+    assert disk.get("a") == b"x" * 100
+
+    # "b" is now the least recently used, so it makes room for "c"
+    disk.set("c", b"y" * 100)
+    assert disk.current_bytes == 200
+    assert disk.get("b") is None
+    assert sorted(os.listdir(tmp_path)) == ["a.json", "c.json"]
+
+    # Overwriting an entry replaces its size rather than adding to it
+    disk.set("a", b"z" * 50)
+    assert disk.current_bytes == 150
+
+
+def test_disk_backend_rebuilds_its_index_from_the_directory(tmp_path):
+    disk = DiskCacheBackend(str(tmp_path), max_bytes=1000, ttl_seconds=60)
+    for key in ("old", "new"):
+        disk.set(key, b"x" * 100)
+        time.sleep(0.01)
+
+    reopened = DiskCacheBackend(str(tmp_path), max_bytes=150, ttl_seconds=60)
+    assert reopened.current_bytes == 200
+    reopened.set("newest", b"y" * 10)
+    assert reopened.get("old") is None
+    assert reopened.get("new") == b"x" * 100
+
+
+def test_disk_backend_expires_entries(tmp_path):
+    disk = DiskCacheBackend(str(tmp_path), max_bytes=1000, ttl_seconds=60)
+    disk.set("a", b"x" * 100)
+    stale = time.time() - 120
+    os.utime(tmp_path / "a.json", (stale, stale))
+
+    assert disk.get("a") is None
+    assert disk.current_bytes == 0
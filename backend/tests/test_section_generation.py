@@ -0,0 +1,112 @@
+import asyncio
+
+from benchmarks.stub_model import StubModel
+from services.ai_cloner import LayoutAwareCloner
+from services.generation_cache import GenerationCache
+from services.html_stream import IncrementalStructureCheck
+from services.model_client import ModelClient
+from services.section_generation import (
+    css_statements, drop_page_wide_rules, merge_stylesheets, plan_parts, split_fragment, stitch_document
+)
+
+SCRAPED_DATA = {
+    "structured_content": {"page_title": "Acme", "main_heading": "Tools for builders", "buttons": [{"text": "Start free"}]},
+    "content_sections": {"main_content": {"sections": [{"heading": {"text": f"Feature {i}"}} for i in range(4)]}}
+}
+
+
+def section_fragments(parts):
+    fragments = {"header": '<nav><a href="/">Acme</a></nav><h1>Tools for builders</h1><a class="cta">Start free</a>',
+                 "footer": "<p>&copy; Acme</p>"}
+    for part in parts:
+        if part["kind"] == "sections":
+            fragments[part["name"]] = "".join(
+                f'<section id="feature-{index}"><h2>Feature</h2><p>{"Copy for the feature. " * 10}</p></section>'
+                for index in range(4)
+            )
+    return fragments
+
+
+def test_css_statements_keeps_blocks_whole_and_drops_cut_off_rules():
+    css = """
+        @import url("fonts.css");
+        /* hero { color: red; } */
+        .hero { color: red; }
+        @media (max-width: 600px) { .hero { padding: 0; } .cta { display: block; } }
+        .cut-off { color:
+    """
+    assert css_statements(css) == [
+        '@import url("fonts.css");',
+        ".hero { color: red; }",
+        "@media (max-width: 600px) { .hero { padding: 0; } .cta { display: block; } }"
+    ]
+
+
+def test_merge_stylesheets_dedupes_and_hoists_imports():
+    merged = merge_stylesheets([
+        ".card { padding: 1rem; }\n.hero  {  color: red; }",
+        ".hero { color: red; }\n@import url(\"b.css\");\n.footer { margin: 0; }",
+        None
+    ])
+    assert merged.split("\n") == [
+        '@import url("b.css");',
+        ".card { padding: 1rem; }",
+        ".hero  {  color: red; }",
+        ".footer { margin: 0; }"
+    ]
+
+
+def test_drop_page_wide_rules_leaves_the_base_stylesheet_in_charge():
+    css = "body { margin: 8px; }\nhtml, :root { font-size: 20px; }\nbody .hero { color: red; }\n" \
+          "@media print { body { color: black; } }"
+    assert drop_page_wide_rules(css).split("\n") == [
+        "body .hero { color: red; }",
+        "@media print { body { color: black; } }"
+    ]
+
+
+def test_split_fragment_accepts_a_whole_document():
+    response = "```html\n<!DOCTYPE html><html><head><title>x</title><style>.a { color: red; }</style></head>" \
+               "<body><section>Hi</section></body></html>\n```"
+    assert split_fragment(response) == (".a { color: red; }", "<section>Hi</section>")
+
+
+def test_plan_parts_grows_groups_to_stay_under_max_parts():
+    scraped_data = {"content_sections": {"main_content": {"sections": [{"heading": {"text": str(i)}} for i in range(10)]}}}
+
+    parts = plan_parts(scraped_data, sections_per_part=2, max_parts=4)
+    assert [part["name"] for part in parts] == ["header", "sections-1", "sections-2", "footer"]
+    assert [len(part["sections"]) for part in parts] == [0, 5, 5, 0]
+
+
+def test_stitched_document_passes_the_structure_check():
+    parts = plan_parts(SCRAPED_DATA, sections_per_part=2, max_parts=4)
+    html = stitch_document(SCRAPED_DATA, parts, section_fragments(parts), ".grid { display: grid; }")
+    assert '<html lang="en">' in html
+
+    check = IncrementalStructureCheck(SCRAPED_DATA["structured_content"])
+    check.feed(html)
+    # <html lang="en"> and <section id=...> count as the tags the check looks for
+    assert check.found["<html>"] and check.found["<section>"]
+    assert LayoutAwareCloner(model=None)._is_well_structured_html(html, SCRAPED_DATA["structured_content"])
+
+
+def test_cancelled_part_is_rendered_from_the_scraped_data():
+    cloner = LayoutAwareCloner(model=StubModel(), cache=GenerationCache(db_path=""), client=ModelClient(hedge_percentile=0))
+    parts = [{**part, "prompt": part["name"]} for part in plan_parts(SCRAPED_DATA, sections_per_part=2, max_parts=4)]
+    fragments = section_fragments(parts)
+
+    async def generate(prompt, timeout=None):
+        if prompt == "sections-1":
+            raise asyncio.CancelledError()
+        return f"```html\n{fragments[prompt]}\n```"
+
+    cloner._generate = generate
+
+    async def main():
+        return [event async for event in cloner.stream_sectioned_clone(SCRAPED_DATA, "https://example.com", parts=parts)]
+
+    events = asyncio.run(main())
+    assert [event["type"] for event in events] == ["done"] and not events[0]["fallback"]
+    # The cancelled group falls back to plain headings from the scraped sections
+    assert fragments["sections-2"] in events[0]["html"] and "Feature 0" in events[0]["html"]
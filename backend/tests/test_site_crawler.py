@@ -0,0 +1,105 @@
+import asyncio
+import io
+import time
+import uuid
+import zipfile
+
+from routers.crawl import build_site_archive
+from services.job_store import job_store
+from services.site_crawler import CrawlManager, SiteCrawl, link_pages, normalize_link, page_file_name
+
+ROOT = "https://example.com/"
+
+
+def test_normalize_link():
+    assert normalize_link("/about#team", "https://Example.com/docs/") == "https://example.com/about"
+    assert normalize_link("pricing?plan=pro", "https://example.com/docs/") == "https://example.com/docs/pricing?plan=pro"
+    assert normalize_link("https://EXAMPLE.com", ROOT) == "https://example.com/"
+    assert normalize_link("mailto:hi@example.com", ROOT) is None
+    assert normalize_link("javascript:void(0)", ROOT) is None
+    assert normalize_link("/files/report.PDF", ROOT) is None
+    assert normalize_link("", ROOT) is None
+
+
+def test_page_file_names_are_flat_and_unique():
+    taken = set()
+    assert page_file_name("https://example.com", ROOT, taken) == "index.html"
+    assert page_file_name("https://example.com/docs/getting-started", ROOT, taken) == "docs-getting-started.html"
+    assert page_file_name("https://example.com/docs/getting_started", ROOT, taken) == "docs-getting-started-2.html"
+    with_query = page_file_name("https://example.com/search?q=a", ROOT, taken)
+    assert with_query.startswith("search-") and with_query != page_file_name(
+        "https://example.com/search?q=b", ROOT, taken
+    )
+
+
+def test_link_pages_rewrites_by_href_then_by_text():
+    page_files = {
+        "https://example.com/": "index.html",
+        "https://example.com/about": "about.html",
+        "https://example.com/pricing": "pricing.html"
+    }
+    link_texts = {"our pricing": "https://example.com/pricing"}
+    html = (
+        '<nav><a class="nav" href="/about#team">About</a>'
+        '<a href="#">Our <b>Pricing</b></a>'
+        '<a>Our  pricing</a>'
+        "<a href='https://other.example/'>Elsewhere</a>"
+        '<a href="/">Home</a>'
+        '<a href="#">Back to top</a></nav>'
+    )
+
+    linked = link_pages(html, "https://example.com/", page_files, link_texts)
+    assert '<a class="nav" href="about.html">About</a>' in linked
+    assert '<a href="pricing.html">Our <b>Pricing</b></a>' in linked
+    assert '<a href="pricing.html">Our  pricing</a>' in linked
+    assert "<a href='https://other.example/'>Elsewhere</a>" in linked
+    assert '<a href="index.html">Home</a>' in linked
+    assert '<a href="#">Back to top</a>' in linked
+
+
+def test_site_archive_links_crawled_pages_together():
+    navigation = {"navigation_analysis": {"primary_nav": [
+        {"text": "Home", "href": "/"},
+        {"text": "About us", "href": "/about"}
+    ]}}
+    pages = []
+    for url, html in (
+        (ROOT, '<a href="#">About us</a>'),
+        ("https://example.com/about", '<a href="https://example.com/">Home</a>')
+    ):
+        job_id = str(uuid.uuid4())
+        job_store.create(job_id, url)
+        job_store.save_scraped_data(job_id, navigation)
+        job_store.save_html(job_id, html)
+        pages.append(job_store.get(job_id))
+
+    with zipfile.ZipFile(io.BytesIO(build_site_archive(ROOT, pages))) as archive:
+        assert sorted(archive.namelist()) == ["about.html", "index.html"]
+        assert archive.read("index.html").decode() == '<a href="about.html">About us</a>'
+        assert archive.read("about.html").decode() == '<a href="index.html">Home</a>'
+
+
+def test_crawls_of_one_host_share_its_politeness_delay():
+    manager = CrawlManager()
+    starts = {}
+
+    async def run_page(job_id, url, options, context, design_system, on_scraped):
+        starts[url] = time.monotonic()
+        on_scraped({})
+
+    def crawl(url: str) -> SiteCrawl:
+        site_crawl = SiteCrawl(str(uuid.uuid4()), url, {}, max_depth=0, max_pages=1, concurrency=1,
+                               delay_seconds=0.3, respect_robots=False)
+        site_crawl.create_root_job()
+        manager._crawls[site_crawl.crawl_id] = site_crawl
+        return site_crawl
+
+    async def main():
+        crawls = [crawl("https://example.com/"), crawl("https://example.com/about"), crawl("https://other.example/")]
+        await asyncio.gather(*(manager._run(site_crawl, run_page) for site_crawl in crawls))
+
+    asyncio.run(main())
+    same_host = sorted([starts["https://example.com/"], starts["https://example.com/about"]])
+    assert same_host[1] - same_host[0] >= 0.29
+    # Another host doesn't wait behind them
+    assert starts["https://other.example/"] - same_host[0] < 0.1
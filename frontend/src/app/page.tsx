@@ -4,62 +4,131 @@ import { useState, useEffect, useRef } from 'react';
 import URLInput from '../components/URLInputs';
 import CloneStatus from '../components/CloneStatus';
 import PreviewPane from '../components/PreviewPane';
-import { CloneResponse, CloneResult, CloneStatus as Status } from '../types';
+import { CloneResponse, CloneResult, CloneStage, CloneStageEvent, CloneStatus as Status } from '../types';
 
 export default function Home() {
   const [cloneResponse, setCloneResponse] = useState<CloneResponse | null>(null);
   const [cloneResult, setCloneResult] = useState<CloneResult | null>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  const [stage, setStage] = useState<CloneStage | null>(null);
   const pollIntervalRef = useRef<NodeJS.Timeout | null>(null);
 
-  // Poll for results when we have a job ID
+  // Follow progress over Server-Sent Events, polling only if the stream fails
   useEffect(() => {
     if (!cloneResponse) return;
 
+    const jobId = cloneResponse.job_id;
+    let closeStream: (() => void) | null = null;
+
+    // Streamed HTML is batched so the preview re-renders a few times a second, not per chunk
+    let streamedHtml = '';
+    let htmlFlushTimer: NodeJS.Timeout | null = null;
+    const flushHtml = () => {
+      htmlFlushTimer = null;
+      const html = streamedHtml;
+      setCloneResult((previous) => previous && { ...previous, cloned_html: html });
+    };
+
+    const stopPolling = () => {
+      if (pollIntervalRef.current) {
+        clearInterval(pollIntervalRef.current);
+        pollIntervalRef.current = null;
+      }
+    };
+
+    const handleResult = (result: CloneResult) => {
+      console.log(`📊 Job status: ${result.status}`);
+      setCloneResult(result);
+      setError(null);
+
+      // Stop polling once completed or failed, unless the AI result may still replace a fallback
+      if ((result.status === Status.COMPLETED || result.status === Status.FAILED) && !result.provisional) {
+        setLoading(false);
+        stopPolling();
+      }
+    };
+
     const pollResult = async () => {
       try {
-        console.log(`🔍 Polling for job: ${cloneResponse.job_id}`);
+        console.log(`🔍 Polling for job: ${jobId}`);
         
         const { api } = await import('../utils/api');
-        const result = await api.getCloneResult(cloneResponse.job_id);
-        
-        console.log(`📊 Job status: ${result.status}`);
-        setCloneResult(result);
-        setError(null);
-
-        // Stop polling if completed or failed
-        if (result.status === Status.COMPLETED || result.status === Status.FAILED) {
-          setLoading(false);
-          if (pollIntervalRef.current) {
-            clearInterval(pollIntervalRef.current);
-            pollIntervalRef.current = null;
-          }
+        const status = await api.getCloneStatus(jobId);
+        if (status.stage) {
+          setStage(status.stage);
+        }
+
+        // The full result (with HTML) is only fetched once the job has finished
+        if (status.status === Status.COMPLETED || status.status === Status.FAILED) {
+          handleResult(await api.getCloneResult(jobId));
+        } else {
+          setCloneResult((previous) => ({ ...status, cloned_html: previous?.cloned_html }));
         }
       } catch (error) {
         console.error('❌ Failed to get clone result:', error);
         setError(error instanceof Error ? error.message : 'Unknown error');
         
         // Stop polling on persistent errors
-        if (pollIntervalRef.current) {
-          clearInterval(pollIntervalRef.current);
-          pollIntervalRef.current = null;
-        }
+        stopPolling();
         setLoading(false);
       }
     };
 
-    // Poll immediately
-    pollResult();
+    const startPolling = () => {
+      if (pollIntervalRef.current) return;
+      pollResult();
+      pollIntervalRef.current = setInterval(pollResult, 3000);
+    };
 
-    // Then poll every 3 seconds until complete
-    pollIntervalRef.current = setInterval(pollResult, 3000);
+    let cancelled = false;
+    import('../utils/api').then(({ api }) => {
+      if (cancelled) return;
+      closeStream = api.subscribeToClone(jobId, {
+        onStage: (event: CloneStageEvent) => {
+          console.log(`📶 Job stage: ${event.stage}`);
+          setStage(event.stage);
+          // The upgraded result follows in its own event
+          if (event.stage === 'upgraded') return;
+          setCloneResult((previous) => ({
+            job_id: jobId,
+            original_url: event.original_url ?? previous?.original_url ?? '',
+            status: event.stage === 'queued' ? Status.PENDING : Status.PROCESSING,
+            cloned_html: previous?.cloned_html,
+            queue_position: event.queue_position,
+            queue_depth: event.queue_depth,
+          }));
+        },
+        onHtml: (chunk: string) => {
+          streamedHtml += chunk;
+          if (!htmlFlushTimer) {
+            htmlFlushTimer = setTimeout(flushHtml, 250);
+          }
+        },
+        onResult: (result: CloneResult) => {
+          if (htmlFlushTimer) {
+            clearTimeout(htmlFlushTimer);
+            htmlFlushTimer = null;
+          }
+          setStage((previous) =>
+            result.status === Status.FAILED ? 'failed' : previous === 'upgraded' ? previous : 'completed'
+          );
+          handleResult(result);
+        },
+        onError: () => {
+          console.warn('⚠️ Progress stream unavailable, falling back to polling');
+          startPolling();
+        },
+      });
+    });
 
     return () => {
-      if (pollIntervalRef.current) {
-        clearInterval(pollIntervalRef.current);
-        pollIntervalRef.current = null;
+      cancelled = true;
+      if (htmlFlushTimer) {
+        clearTimeout(htmlFlushTimer);
       }
+      closeStream?.();
+      stopPolling();
     };
   }, [cloneResponse]);
 
@@ -67,6 +136,7 @@ export default function Home() {
     console.log(`🚀 Clone started with job ID: ${response.job_id}`);
     setCloneResponse(response);
     setCloneResult(null);
+    setStage(null);
     setLoading(true);
     setError(null);
   };
@@ -78,6 +148,7 @@ export default function Home() {
     }
     setCloneResponse(null);
     setCloneResult(null);
+    setStage(null);
     setLoading(false);
     setError(null);
   };
@@ -169,10 +240,11 @@ export default function Home() {
             )}
             
             {cloneResult && (
-              <CloneStatus result={cloneResult} onReset={handleReset} />
+              <CloneStatus result={cloneResult} stage={stage} onReset={handleReset} />
             )}
             
-            {cloneResult && cloneResult.status === Status.COMPLETED && (
+            {/* Also shown while generating, filling in as the HTML streams */}
+            {cloneResult && cloneResult.status !== Status.FAILED && cloneResult.cloned_html && (
               <PreviewPane result={cloneResult} />
             )}
           </div>
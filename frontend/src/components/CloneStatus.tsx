@@ -1,13 +1,23 @@
 'use client';
 
-import { CloneResult, CloneStatus as Status } from '../types';
+import { CloneResult, CloneStage, CloneStatus as Status } from '../types';
 
 interface CloneStatusProps {
   result: CloneResult;
+  stage?: CloneStage | null;
   onReset: () => void;
 }
 
-export default function CloneStatus({ result, onReset }: CloneStatusProps) {
+const PROGRESS_STEPS: { stage: CloneStage; label: string }[] = [
+  { stage: 'scraping', label: '🌐 Loading the website' },
+  { stage: 'extracting', label: '🏗️ Analyzing layout and design' },
+  { stage: 'generating', label: '🤖 Generating beautiful clone' },
+  { stage: 'validating', label: '🎨 Checking the result' },
+];
+
+export default function CloneStatus({ result, stage, onReset }: CloneStatusProps) {
+  const currentStep = PROGRESS_STEPS.findIndex((step) => step.stage === stage);
+
   const getStatusColor = (status: Status) => {
     switch (status) {
       case Status.PENDING:
@@ -130,18 +140,26 @@ export default function CloneStatus({ result, onReset }: CloneStatusProps) {
               
               {/* Progress Steps */}
               <div className="mt-6 space-y-3">
-                <div className="flex items-center text-sm">
-                  <div className="w-2 h-2 bg-green-400 rounded-full mr-3"></div>
-                  <span className="text-gray-600">✓ Website successfully scraped</span>
-                </div>
-                <div className="flex items-center text-sm">
-                  <div className="w-2 h-2 bg-pink-400 rounded-full mr-3 animate-pulse"></div>
-                  <span className="text-gray-600">🤖 AI analyzing layout and design...</span>
-                </div>
-                <div className="flex items-center text-sm">
-                  <div className="w-2 h-2 bg-gray-300 rounded-full mr-3"></div>
-                  <span className="text-gray-400">🎨 Generating beautiful clone...</span>
-                </div>
+                {PROGRESS_STEPS.map((step, index) => (
+                  <div key={step.stage} className="flex items-center text-sm">
+                    {index < currentStep ? (
+                      <>
+                        <div className="w-2 h-2 bg-green-400 rounded-full mr-3"></div>
+                        <span className="text-gray-600">✓ {step.label}</span>
+                      </>
+                    ) : index === currentStep ? (
+                      <>
+                        <div className="w-2 h-2 bg-pink-400 rounded-full mr-3 animate-pulse"></div>
+                        <span className="text-gray-600">{step.label}...</span>
+                      </>
+                    ) : (
+                      <>
+                        <div className="w-2 h-2 bg-gray-300 rounded-full mr-3"></div>
+                        <span className="text-gray-400">{step.label}</span>
+                      </>
+                    )}
+                  </div>
+                ))}
               </div>
             </div>
           )}
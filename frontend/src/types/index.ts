@@ -1,5 +1,28 @@
+export interface SettleOptions {
+  max_wait_ms?: number;
+  network_idle_ms?: number;
+  max_inflight_requests?: number;
+  dom_quiet_ms?: number;
+  layout_stable_ms?: number;
+  wait_for_fonts?: boolean;
+  wait_for_images?: boolean;
+}
+
+export interface ScreenshotOptions {
+  mode?: 'viewport' | 'full' | 'clip';
+  clip?: { x?: number; y?: number; width: number; height: number };
+  format?: 'png' | 'jpeg' | 'webp';
+  quality?: number;
+  max_height?: number;
+}
+
 export interface CloneRequest {
   url: string;
+  settle?: SettleOptions;
+  screenshot?: ScreenshotOptions;
+  interception_profile?: 'structure-only' | 'styles' | 'full';
+  latency_slo_seconds?: number;
+  generation_mode?: 'single' | 'sections' | 'auto';
 }
 
 export interface CloneResponse {
@@ -14,6 +37,44 @@ export interface CloneResult {
   original_url: string;
   cloned_html?: string;
   error_message?: string;
+  // A fallback served under the latency SLO that the AI result may still replace
+  provisional?: boolean;
+  queue_position?: number;
+  queue_depth?: number;
+}
+
+export interface CloneJobStatus {
+  job_id: string;
+  status: CloneStatus;
+  original_url: string;
+  stage?: CloneStage;
+  error_message?: string;
+  has_html: boolean;
+  html_length: number;
+  cache_hit: boolean;
+  provisional: boolean;
+  queue_position?: number;
+  queue_depth?: number;
+  created_at?: number;
+  finished_at?: number;
+}
+
+export type CloneStage =
+  | 'queued'
+  | 'scraping'
+  | 'extracting'
+  | 'generating'
+  | 'validating'
+  | 'completed'
+  | 'upgraded'
+  | 'failed';
+
+export interface CloneStageEvent {
+  job_id: string;
+  stage: CloneStage;
+  original_url?: string;
+  queue_position?: number;
+  queue_depth?: number;
 }
 
 export enum CloneStatus {
@@ -21,4 +82,51 @@ export enum CloneStatus {
   PROCESSING = "processing", 
   COMPLETED = "completed",
   FAILED = "failed"
-}
\ No newline at end of file
+}
+
+export interface BatchCloneRequest extends Omit<CloneRequest, 'url'> {
+  urls: string[];
+  concurrency?: number;
+  rate_per_second?: number;
+}
+
+export interface BatchCloneResponse {
+  batch_id: string;
+  job_ids: string[];
+  total: number;
+  cached: number;
+  message: string;
+}
+
+export interface BatchStatus {
+  batch_id: string;
+  status: CloneStatus;
+  total: number;
+  counts: Record<string, number>;
+  progress: number;
+  cache_hits: number;
+  created_at?: number;
+  finished_at?: number;
+  jobs: CloneJobStatus[];
+}
+
+export interface CrawlRequest extends CloneRequest {
+  max_depth?: number;
+  max_pages?: number;
+  include_footer?: boolean;
+  respect_robots?: boolean;
+  concurrency?: number;
+  delay_ms?: number;
+}
+
+export interface CrawlResponse {
+  crawl_id: string;
+  root_job_id: string;
+  status: CloneStatus;
+  message: string;
+}
+
+export interface CrawlStatus extends BatchStatus {
+  root_url: string;
+  running: boolean;
+}
@@ -1,4 +1,4 @@
-import { CloneRequest, CloneResponse, CloneResult } from '../types';
+import { CloneJobStatus, CloneRequest, CloneResponse, CloneResult, CloneStageEvent } from '../types';
 
 const API_BASE_URL = process.env.NODE_ENV === 'production' 
   ? 'https://your-api-domain.com' 
@@ -46,6 +46,69 @@ export const api = {
     }
   },
 
+  // Metadata only, without the generated HTML
+  async getCloneStatus(jobId: string): Promise<CloneJobStatus> {
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/clone/${jobId}/status`);
+      
+      if (!response.ok) {
+        if (response.status === 404) {
+          throw new Error('Clone job not found');
+        }
+        const errorData = await response.json().catch(() => ({}));
+        throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
+      }
+      
+      return response.json();
+    } catch (error) {
+      console.error('Failed to get clone status:', error);
+      throw new Error(`Failed to get clone status: ${error instanceof Error ? error.message : 'Unknown error'}`);
+    }
+  },
+
+  // Server-pushed progress; returns a function that closes the stream
+  subscribeToClone(
+    jobId: string,
+    handlers: {
+      onStage: (event: CloneStageEvent) => void;
+      onResult: (result: CloneResult) => void;
+      onError: () => void;
+      // Receives generated HTML as the model writes it
+      onHtml?: (chunk: string) => void;
+    }
+  ): () => void {
+    const query = handlers.onHtml ? '?html=true' : '';
+    const source = new EventSource(`${API_BASE_URL}/api/clone/${jobId}/events${query}`);
+
+    source.addEventListener('stage', (event) => {
+      handlers.onStage(JSON.parse((event as MessageEvent).data));
+    });
+    source.addEventListener('html', (event) => {
+      handlers.onHtml?.(JSON.parse((event as MessageEvent).data).html);
+    });
+    source.addEventListener('result', (event) => {
+      const result: CloneResult = JSON.parse((event as MessageEvent).data);
+      // A provisional fallback is followed by an "upgraded" or "final" event
+      if (!result.provisional) {
+        source.close();
+      }
+      handlers.onResult(result);
+    });
+    for (const name of ['upgraded', 'final']) {
+      source.addEventListener(name, (event) => {
+        source.close();
+        handlers.onResult(JSON.parse((event as MessageEvent).data));
+      });
+    }
+    source.onerror = () => {
+      // EventSource reconnects on its own; hand over to polling instead
+      source.close();
+      handlers.onError();
+    };
+
+    return () => source.close();
+  },
+
   async healthCheck(): Promise<boolean> {
     try {
       const response = await fetch(`${API_BASE_URL}/clone/health`);